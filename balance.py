@@ -0,0 +1,261 @@
+"""Monte Carlo combat balance simulator.
+
+Fights many one-on-one duels between the player and each monster, for every
+weapon and player level asked for, using the same rules as Fighter: a d100
+roll above the defender's dodge chance hits, damage dice plus the strength
+(melee) or dexterity (ranged) bonus, armor subtracted with at least 1 damage
+taken. The player strikes first and the duel runs until one side dies or
+max_turns pass. Dice are rolled for whole batches of duels at once with
+NumPy, so millions of duels take seconds. No display is needed.
+
+Reports win rate, turns to kill and HP lost per monster x weapon x level.
+
+Run from the repository root, e.g.  python balance.py --depth 3 --levels 1,5,10
+"""
+import argparse
+import csv
+import time
+
+import numpy as np
+
+from data.monsters import MONSTERS
+from data.items import WEAPONS
+from entities.components.fighter import LEVEL_TABLE
+
+# The player's starting fighter (see create_player in game/player.py)
+PLAYER_HP = 8
+PLAYER_ARMOR = 2
+BASE_DODGE = 10
+
+# Result codes per duel
+LOSS, DRAW, WIN = -1, 0, 1
+
+# Report columns
+COLUMNS = ('monster', 'weapon', 'level', 'duels', 'win_rate', 'loss_rate', 'draw_rate',
+           'turns_mean', 'turns_p10', 'turns_p50', 'turns_p90', 'hp_lost_mean', 'hp_lost_p50', 'hp_lost_p90')
+
+def hit_points_dice(monster_data):
+    """(count, sides) rolled for a monster's hit points, as place_entities rolls them"""
+    if isinstance(monster_data.hit_dice, tuple):
+        return monster_data.hit_dice
+    if monster_data.hit_dice == 0.5:
+        return (1, 4)
+    if monster_data.hit_dice == 0.25:
+        return (1, 3)
+    return (1, 8)
+
+def roll_dice(rng, count, sides, duels):
+    """Roll count dice of sides faces for each of duels duels and sum them.
+    
+    count and sides are numbers, or arrays with one entry per duel.
+    """
+    if np.ndim(count) == 0 and np.ndim(sides) == 0:
+        rolls = rng.integers(1, sides + 1, size=(duels, count), dtype=np.int32)
+    else:
+        count = np.broadcast_to(count, duels)
+        sides = np.broadcast_to(sides, duels)
+        most = int(count.max())
+        rolls = rng.integers(1, sides[:, None] + 1, size=(duels, most), dtype=np.int32)
+        rolls[np.arange(most) >= count[:, None]] = 0
+    return rolls.sum(axis=1, dtype=np.int32)
+
+def roll_stat(rng, value, duels):
+    """An attribute fixed at value, or rolled 5-10 like a new Fighter's"""
+    if value is None:
+        return rng.integers(5, 11, duels, dtype=np.int32)
+    return value
+
+def player_hit_points(rng, level, constitution, duels):
+    """Max HP after levelling up to level: the level table's hit dice plus the constitution bonus"""
+    hp = np.full(duels, PLAYER_HP, dtype=np.int32)
+    con_bonus = np.maximum(0, constitution - 10)
+    for table_level, _, hit_dice, _, _ in LEVEL_TABLE:
+        if 1 < table_level <= level:
+            if isinstance(hit_dice, tuple):
+                count, sides = hit_dice
+                hp += roll_dice(rng, count, sides, duels)
+            else:
+                hp += hit_dice
+            hp += con_bonus
+    return hp
+
+def fight(rng, player, monster, max_turns):
+    """Play out a batch of duels.
+    
+    player and monster are dicts of hp, armor, dodge (the chance to avoid a
+    hit), dice_count, dice_sides and bonus (added to every damage roll), each
+    a number or an array with one entry per duel; hp must be an array.
+    Returns (result, turns, hp_lost) arrays, one entry per duel.
+    """
+    duels = len(player['hp'])
+    result = np.full(duels, DRAW, dtype=np.int8)
+    turns = np.full(duels, max_turns, dtype=np.int32)
+    max_hp = player['hp']
+    hp_lost = np.zeros(duels, dtype=np.int32)
+    
+    # Arrays for the duels still going, compacted as duels end
+    ids = np.arange(duels)
+    player = dict(player)
+    monster = dict(monster)
+    
+    def attack(attacker, defender):
+        count = len(defender['hp'])
+        hits = rng.integers(1, 101, count, dtype=np.int32) > defender['dodge']
+        damage = roll_dice(rng, attacker['dice_count'], attacker['dice_sides'], count) + attacker['bonus']
+        defender['hp'] = defender['hp'] - np.where(hits, np.maximum(1, damage - defender['armor']), 0)
+        return defender['hp'] <= 0
+    
+    def drop(ended):
+        nonlocal ids
+        keep = ~ended
+        ids = ids[keep]
+        for side in (player, monster):
+            for name, value in side.items():
+                if np.ndim(value):
+                    side[name] = value[keep]
+    
+    for turn in range(1, max_turns + 1):
+        # The player strikes first, then the monster strikes back
+        killed = attack(player, monster)
+        result[ids[killed]] = WIN
+        turns[ids[killed]] = turn
+        hp_lost[ids[killed]] = max_hp[ids[killed]] - player['hp'][killed]
+        drop(killed)
+        if not len(ids):
+            break
+        
+        died = attack(monster, player)
+        result[ids[died]] = LOSS
+        turns[ids[died]] = turn
+        hp_lost[ids[died]] = max_hp[ids[died]]
+        drop(died)
+        
+        if not len(ids):
+            break
+    
+    # Duels that hit max_turns are draws
+    hp_lost[ids] = max_hp[ids] - player['hp']
+    return result, turns, hp_lost
+
+def duel_stats(result, turns, hp_lost, max_hp):
+    """Summarize one matchup: outcome rates, turns to kill and HP lost (as a fraction of max HP) in wins"""
+    wins = result == WIN
+    stats = {
+        'duels': len(result),
+        'win_rate': wins.mean(),
+        'loss_rate': (result == LOSS).mean(),
+        'draw_rate': (result == DRAW).mean(),
+    }
+    if wins.any():
+        won_turns = turns[wins]
+        lost = hp_lost[wins] / max_hp[wins]
+        p10, p50, p90 = np.percentile(won_turns, (10, 50, 90))
+        stats.update(turns_mean=won_turns.mean(), turns_p10=p10, turns_p50=p50, turns_p90=p90,
+                     hp_lost_mean=lost.mean(), hp_lost_p50=np.median(lost), hp_lost_p90=np.percentile(lost, 90))
+    else:
+        stats.update(dict.fromkeys(COLUMNS[7:], float('nan')))
+    return stats
+
+def run_matchup(rng, monster_data, weapon, level, duels, max_turns, strength=None, dexterity=None,
+                constitution=None, armor_bonus=0):
+    """Fight duels between a level-level player wielding weapon and monster_data; returns duel_stats"""
+    # Player: rolled (or given) attributes, levelled-up HP and the weapon's damage
+    strength = roll_stat(rng, strength, duels)
+    dexterity = roll_stat(rng, dexterity, duels)
+    constitution = roll_stat(rng, constitution, duels)
+    count, sides = weapon.damage_dice
+    if weapon.ranged:
+        # Shots roll a single die plus the ranged (dexterity) bonus
+        count, bonus = 1, np.maximum(0, (dexterity - 10) // 5)
+    else:
+        bonus = np.maximum(0, (strength - 10) // 5)
+    player = {
+        'hp': player_hit_points(rng, level, constitution, duels),
+        'armor': PLAYER_ARMOR + armor_bonus,
+        'dodge': BASE_DODGE + np.maximum(0, (dexterity - 10) // 2),
+        'dice_count': count,
+        'dice_sides': sides,
+        'bonus': bonus,
+    }
+    
+    # Monster: a Fighter made from its template; its rolled attributes never exceed 10, so no bonuses
+    hp_count, hp_sides = hit_points_dice(monster_data)
+    count, sides = monster_data.damage_dice
+    monster = {
+        'hp': roll_dice(rng, hp_count, hp_sides, duels),
+        'armor': monster_data.armor,
+        'dodge': monster_data.dodge,
+        'dice_count': count,
+        'dice_sides': sides,
+        'bonus': 0,
+    }
+    
+    max_hp = player['hp']
+    result, turns, hp_lost = fight(rng, player, monster, max_turns)
+    return duel_stats(result, turns, hp_lost, max_hp)
+
+def run_balance(monster_keys, weapon_keys, levels, duels, max_turns=200, seed=0, **player_options):
+    """Run every monster x weapon x level matchup; returns a list of report rows (dicts keyed by COLUMNS)"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for monster_key in monster_keys:
+        monster_data = MONSTERS[monster_key]
+        for weapon_key in weapon_keys:
+            for level in levels:
+                stats = run_matchup(rng, monster_data, WEAPONS[weapon_key], level, duels, max_turns, **player_options)
+                rows.append(dict(monster=monster_data.name, weapon=WEAPONS[weapon_key].name, level=level, **stats))
+    return rows
+
+def format_report(rows):
+    """Lay the rows out as a text table"""
+    lines = [f"{'Monster':<16} {'Weapon':<14} {'Lvl':>3} {'Win':>6} {'Loss':>6} {'Draw':>6} "
+             f"{'Turns to kill':>13} {'p10/p50/p90':>12} {'HP lost':>8} {'p50/p90':>9}"]
+    for row in rows:
+        lines.append(
+            f"{row['monster']:<16} {row['weapon']:<14} {row['level']:>3} {row['win_rate']:>6.1%} "
+            f"{row['loss_rate']:>6.1%} {row['draw_rate']:>6.1%} {row['turns_mean']:>13.1f} "
+            f"{row['turns_p10']:>4.0f}/{row['turns_p50']:>3.0f}/{row['turns_p90']:>3.0f} "
+            f"{row['hp_lost_mean']:>8.0%} {row['hp_lost_p50']:>4.0%}/{row['hp_lost_p90']:>4.0%}")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate player vs monster duels to check combat balance.")
+    parser.add_argument('--depth', type=int, default=1, help="dungeon level whose monsters to fight")
+    parser.add_argument('--monsters', help="comma-separated MONSTERS keys (overrides --depth), e.g. g,o,T")
+    parser.add_argument('--weapons', default=','.join(WEAPONS), help="comma-separated WEAPONS keys")
+    parser.add_argument('--levels', default='1', help="comma-separated player levels")
+    parser.add_argument('--duels', type=int, default=100000, help="duels per monster x weapon x level")
+    parser.add_argument('--max-turns', type=int, default=200, help="call a duel a draw after this many turns")
+    parser.add_argument('--seed', type=int, default=0, help="seed for the dice")
+    parser.add_argument('--str', type=int, dest='strength', help="player strength (default: rolled 5-10)")
+    parser.add_argument('--dex', type=int, dest='dexterity', help="player dexterity (default: rolled 5-10)")
+    parser.add_argument('--con', type=int, dest='constitution', help="player constitution (default: rolled 5-10)")
+    parser.add_argument('--armor', type=int, default=0, help="armor bonus from the player's gear")
+    parser.add_argument('--csv', help="also write the rows to this CSV file")
+    args = parser.parse_args()
+    
+    if args.monsters:
+        monster_keys = args.monsters.split(',')
+    else:
+        monster_keys = [key for key, monster in MONSTERS.items() if monster.min_level <= args.depth <= monster.max_level]
+    weapon_keys = args.weapons.split(',')
+    levels = [int(level) for level in args.levels.split(',')]
+    
+    start_time = time.perf_counter()
+    rows = run_balance(monster_keys, weapon_keys, levels, args.duels, args.max_turns, args.seed,
+                       strength=args.strength, dexterity=args.dexterity, constitution=args.constitution,
+                       armor_bonus=args.armor)
+    elapsed = time.perf_counter() - start_time
+    
+    print(format_report(rows))
+    total = len(rows) * args.duels
+    print(f"\n{total:,} duels in {elapsed:.1f}s ({total / elapsed:,.0f} duels/s)")
+    
+    if args.csv:
+        with open(args.csv, 'w', newline='') as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,23 @@
-import pygame
 import numpy as np
-from enum import Enum
+from enum import Enum, IntEnum
 import os
 
 # Get the directory where this file is located
 current_dir = os.path.dirname(os.path.abspath(__file__))
 
-# Initialize Pygame
-pygame.init()
+# This module is pure data so the game logic can be imported without a screen.
+# The screen size, window, tileset and everything derived from them are set up
+# by ui.display.init_display the first time one of DISPLAY_NAMES is read.
+DISPLAY_NAMES = (
+    'SCREEN_WIDTH', 'SCREEN_HEIGHT', 'LEFT_PANEL_WIDTH', 'MAP_VIEW_WIDTH', 'MAP_VIEW_HEIGHT',
+    'INFO_PANEL_X', 'MESSAGE_LOG_Y', 'screen', 'tileset',
+)
 
 # Constants
 TILE_SIZE = 16  # Size of each tile in pixels
-SCREEN_WIDTH = pygame.display.Info().current_w
-SCREEN_HEIGHT = pygame.display.Info().current_h
+TILESET_PATH = os.path.join(current_dir, 'cp437_16x16.png')  # CP437 tileset, absolute path
+SAVE_PATH = os.path.join(current_dir, 'savegame.cdsave')  # Autosave written on level transitions
+INPUT_LOG_PATH = os.path.join(current_dir, 'lastgame.cdlog')  # Input log of the last game played (see replay.py)
 
 # Modern Theme Colors
 # Primary Colors
@@ -60,15 +65,9 @@ PANEL_STATE_COLLAPSED = "collapsed"
 PANEL_STATE_HIDDEN = "hidden"
 
 # Fixed layout constants (maintained for backward compatibility)
+# The screen-dependent layout values are computed in ui.display
 INFO_PANEL_WIDTH = 16  # Width in tiles for the right panel
 MESSAGE_LOG_HEIGHT = 8  # Height in tiles for the message log
-LEFT_PANEL_WIDTH = (SCREEN_WIDTH // TILE_SIZE) - INFO_PANEL_WIDTH
-MAP_VIEW_WIDTH = LEFT_PANEL_WIDTH - 2  # -2 for borders
-MAP_VIEW_HEIGHT = (SCREEN_HEIGHT // TILE_SIZE) - MESSAGE_LOG_HEIGHT - 2  # -2 for borders
-
-# Calculate pixel positions
-INFO_PANEL_X = (LEFT_PANEL_WIDTH) * TILE_SIZE
-MESSAGE_LOG_Y = (SCREEN_HEIGHT - MESSAGE_LOG_HEIGHT * TILE_SIZE)
 
 # Game map dimensions
 MAP_WIDTH = 90  # Width of the game map in tiles
@@ -78,6 +77,11 @@ MIN_ROOM_SIZE = 6
 MAX_ROOM_SIZE = 15
 MAX_ENEMIES_PER_ROOM = 3
 MAX_ITEMS_PER_ROOM = 2
+MAX_RESIDENT_LEVELS = 3  # Levels kept in memory; the least recently used are compressed
+NORMAL_SPEED = 10  # Actor speed that takes one turn per player turn (see game/scheduler.py)
+WAKE_RADIUS = 3  # Dormant monsters this close to the player wake even out of view
+NOISE_RADIUS = 6  # Fighting wakes dormant monsters this close to the attacker
+TRACK_RADIUS = 12  # Awake monsters out of view keep hunting the player within this many steps
 
 # Message log settings
 MAX_MESSAGES = 50
@@ -95,20 +99,12 @@ BORDER_T_UP = 202        # ╩
 BORDER_T_DOWN = 203      # ╦
 BORDER_CROSS = 206       # ╬
 
-# Set up the display
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.FULLSCREEN)
-pygame.display.set_caption("Crimson Depths")
-
-# Load the CP437 tileset using an absolute path
-tileset_path = os.path.join(current_dir, 'cp437_16x16.png')
-tileset = pygame.image.load(tileset_path).convert_alpha()
-
 # UI Animation settings
 ANIMATION_DURATION = 200  # milliseconds
 ANIMATION_EASING = "ease-out"  # easing function type
 
-# Tile types
-class TileType(Enum):
+# Tile types (stored as uint8 codes in Map.tiles)
+class TileType(IntEnum):
     WALL = 0
     FLOOR = 1
     CORRIDOR = 2
@@ -117,6 +113,11 @@ class TileType(Enum):
     GRASS = 5
     TOWN_WALL = 6
 
+# Tile property lookup tables, indexed by tile code
+TILE_WALKABLE = np.zeros(len(TileType), dtype=bool)
+TILE_WALKABLE[[TileType.FLOOR, TileType.CORRIDOR, TileType.STAIRS_DOWN, TileType.STAIRS_UP, TileType.GRASS]] = True
+TILE_TRANSPARENT = TILE_WALKABLE.copy()  # Only walls block line of sight
+
 # Entity types
 class EntityType(Enum):
     PLAYER = 0
@@ -153,12 +154,9 @@ class PanelType(Enum):
     MESSAGE_LOG = 3
     STATUS_BAR = 4
 
-def get_tile_from_tileset(index):
-    # Calculate position in the tileset
-    x = index % 16
-    y = index // 16
-    # Extract the tile from the tileset
-    rect = pygame.Rect(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
-    image = pygame.Surface((TILE_SIZE, TILE_SIZE), pygame.SRCALPHA)
-    image.blit(tileset, (0, 0), rect)
-    return image
+def __getattr__(name):
+    """Resolve the display-dependent names on first use (PEP 562)"""
+    if name in DISPLAY_NAMES:
+        from ui.display import init_display
+        return init_display()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
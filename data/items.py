@@ -34,6 +34,8 @@ ITEM_PRICES = {
 
 # Define weapon data structure
 class WeaponData:
+    __slots__ = ('name', 'weapon_type', 'damage_type', 'size', 'damage_dice', 'ranged', 'ammo_type', 'range')
+    
     def __init__(self, name, weapon_type, damage_type, size, damage_dice, ranged=False, ammo_type=None, range=None):
         self.name = name
         self.weapon_type = weapon_type
@@ -69,6 +71,8 @@ WEAPONS = {
 
 # Define ammo types
 class AmmoData:
+    __slots__ = ('name', 'ammo_type', 'capacity', 'current')
+    
     def __init__(self, name, ammo_type, capacity):
         self.name = name
         self.ammo_type = ammo_type
@@ -80,15 +84,18 @@ AMMO = {
     'arrows': AmmoData('Quiver of Arrows', 'Arrow', 20),
 }
 
-def place_entities(room, entities, max_enemies_per_room, max_items_per_room, dungeon_level=1):
+def place_entities(room, entities, max_enemies_per_room, max_items_per_room, dungeon_level=1, rng=random,
+                   monster_store=None):
+    # All rolls come from rng so a level can be generated from its own random.Random
+    # With a monster_store (see entities/monster_store.py) monsters are rows in it
     # Random number of enemies
-    number_of_enemies = random.randint(0, max_enemies_per_room)
+    number_of_enemies = rng.randint(0, max_enemies_per_room)
     
     # Random number of items
-    number_of_items = random.randint(0, max_items_per_room)
+    number_of_items = rng.randint(0, max_items_per_room)
     
     # 30% chance to place silver in a room
-    has_silver = random.random() < 0.3
+    has_silver = rng.random() < 0.3
     
     # Get eligible monsters for this dungeon level
     eligible_monsters = [
@@ -98,31 +105,36 @@ def place_entities(room, entities, max_enemies_per_room, max_items_per_room, dun
     
     # Place enemies
     for i in range(number_of_enemies):
-        x = random.randint(room.x1 + 1, room.x2 - 1)
-        y = random.randint(room.y1 + 1, room.y2 - 1)
+        x = rng.randint(room.x1 + 1, room.x2 - 1)
+        y = rng.randint(room.y1 + 1, room.y2 - 1)
         
         # Check if position is empty
         if not any(entity.x == x and entity.y == y for entity in entities):
             if eligible_monsters:
                 # Choose a random monster from eligible ones
-                monster_data = random.choice(eligible_monsters)
+                monster_data = rng.choice(eligible_monsters)
                 
                 # Calculate hit points
                 if isinstance(monster_data.hit_dice, tuple):
                     dice_count, dice_sides = monster_data.hit_dice
-                    hp = sum(random.randint(1, dice_sides) for _ in range(dice_count))
+                    hp = sum(rng.randint(1, dice_sides) for _ in range(dice_count))
                 elif monster_data.hit_dice == 0.5:  # 1/2 HD
-                    hp = random.randint(1, 4)
+                    hp = rng.randint(1, 4)
                 elif monster_data.hit_dice == 0.25:  # 1/4 HD
-                    hp = random.randint(1, 3)
+                    hp = rng.randint(1, 3)
                 else:
-                    hp = random.randint(1, 8)  # Default 1 HD
+                    hp = rng.randint(1, 8)  # Default 1 HD
+                
+                if monster_store is not None:
+                    entities.append(monster_store.spawn(monster_data, x, y, hp, rng))
+                    continue
                 
                 # Create fighter component
                 fighter_component = Fighter(
                     hp=hp,
                     armor=monster_data.armor,
-                    damage_dice=monster_data.damage_dice
+                    damage_dice=monster_data.damage_dice,
+                    rng=rng
                 )
                 
                 # Copy dodge from monster_data to fighter_component
@@ -139,18 +151,20 @@ def place_entities(room, entities, max_enemies_per_room, max_items_per_room, dun
                     monster_data.name, 
                     blocks=True, 
                     fighter=fighter_component, 
-                    ai=ai_component
+                    ai=ai_component,
+                    monster_data=monster_data
                 )
                 
                 entities.append(enemy)
             else:
                 # Fallback to default monsters if no eligible ones
-                if random.random() < 0.8:
+                if rng.random() < 0.8:
                     # 80% chance for an orc - 1d4 HP, 1 armor, 1d4 damage
                     fighter_component = Fighter(
-                        hp=random.randint(1, 4),
+                        hp=rng.randint(1, 4),
                         armor=1,  # Low armor
-                        damage_dice=(1, 4)
+                        damage_dice=(1, 4),
+                        rng=rng
                     )
                     # Set dodge chance
                     fighter_component.dodge = 12  # Moderate dodge
@@ -158,39 +172,40 @@ def place_entities(room, entities, max_enemies_per_room, max_items_per_room, dun
                     ai_component = BasicMonster()
                     
                     enemy = Entity(x, y, 'o', WHITE, EntityType.ENEMY, 'Orc', blocks=True,
-                                   fighter=fighter_component, ai=ai_component)
+                                   fighter=fighter_component, ai=ai_component, monster_data=MONSTERS['o'])
                 else:
                     # 20% chance for a troll - 1d8, 3 armor, 1d6 damage
                     fighter_component = Fighter(
-                        hp=random.randint(1, 8) + 4,
+                        hp=rng.randint(1, 8) + 4,
                         armor=3,  # Better armor
-                        damage_dice=(1, 6)
+                        damage_dice=(1, 6),
+                        rng=rng
                     )
                     # Set dodge chance
                     fighter_component.dodge = 7  # Low dodge (slower)
-
-                ai_component = BasicMonster()
-                
-                enemy = Entity(x, y, 'T', WHITE, EntityType.ENEMY, 'Troll', blocks=True, 
-                              fighter=fighter_component, ai=ai_component)
+                    
+                    ai_component = BasicMonster()
+                    
+                    enemy = Entity(x, y, 'T', WHITE, EntityType.ENEMY, 'Troll', blocks=True, 
+                                  fighter=fighter_component, ai=ai_component, monster_data=MONSTERS['T'])
                 
                 entities.append(enemy)
     
     # Place items
     for i in range(number_of_items):
-        x = random.randint(room.x1 + 1, room.x2 - 1)
-        y = random.randint(room.y1 + 1, room.y2 - 1)
+        x = rng.randint(room.x1 + 1, room.x2 - 1)
+        y = rng.randint(room.y1 + 1, room.y2 - 1)
         
         # Check if position is empty
         if not any(entity.x == x and entity.y == y for entity in entities):
-            item_choice = random.random()
+            item_choice = rng.random()
             
             if item_choice < 0.35:  # 35% chance for healing potion
                 item_component = Item(use_function=heal_player, item_type=ItemType.CONSUMABLE)
                 item = Entity(x, y, '!', YELLOW, EntityType.ITEM, 'Healing Potion', blocks=False, item=item_component)
             elif item_choice < 0.65:  # 30% chance for a weapon
                 # Choose a random weapon
-                weapon_key = random.choice(list(WEAPONS.keys()))
+                weapon_key = rng.choice(list(WEAPONS.keys()))
                 weapon = WEAPONS[weapon_key]
                 
                 # Determine if it's a ranged weapon
@@ -226,7 +241,7 @@ def place_entities(room, entities, max_enemies_per_room, max_items_per_room, dun
                 item = Entity(x, y, '[', WHITE, EntityType.ITEM, 'Shield', blocks=False, item=item_component)
             elif item_choice < 0.80:  # 5% chance for ammo
                 # Choose a random ammo
-                ammo_key = random.choice(list(AMMO.keys()))
+                ammo_key = rng.choice(list(AMMO.keys()))
                 ammo = AMMO[ammo_key]
                 
                 # Create a new AmmoData instance to ensure it's a fresh supply
@@ -269,13 +284,13 @@ def place_entities(room, entities, max_enemies_per_room, max_items_per_room, dun
     
     # Place silver if this room has it
     if has_silver:
-        x = random.randint(room.x1 + 1, room.x2 - 1)
-        y = random.randint(room.y1 + 1, room.y2 - 1)
+        x = rng.randint(room.x1 + 1, room.x2 - 1)
+        y = rng.randint(room.y1 + 1, room.y2 - 1)
         
         # Check if position is empty
         if not any(entity.x == x and entity.y == y for entity in entities):
             # Random amount between 1-10 silver pieces
-            amount = random.randint(1, 10)
+            amount = rng.randint(1, 10)
             silver = Entity(x, y, '$', YELLOW, EntityType.ITEM, 'Silver', blocks=False, silver_pieces=amount)
             entities.append(silver)
 
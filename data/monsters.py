@@ -1,7 +1,10 @@
-import random
+from config import NORMAL_SPEED
 
 class MonsterData:
-    def __init__(self, char, name, hit_dice, armor, damage_dice, xp, min_level, max_level, dodge=10):
+    """A monster template. Spawned monsters share one instance per kind (see Entity.monster_data)."""
+    __slots__ = ('char', 'name', 'hit_dice', 'armor', 'dodge', 'damage_dice', 'xp', 'min_level', 'max_level', 'speed')
+    
+    def __init__(self, char, name, hit_dice, armor, damage_dice, xp, min_level, max_level, dodge=10, speed=NORMAL_SPEED):
         self.char = char                # Character representation
         self.name = name                # Monster name
         self.hit_dice = hit_dice        # Tuple of (count, dice_sides) or a fraction
@@ -11,18 +14,11 @@ class MonsterData:
         self.xp = xp                    # XP awarded
         self.min_level = min_level      # Minimum dungeon level
         self.max_level = max_level      # Maximum dungeon level
+        self.speed = speed              # Turns per NORMAL_SPEED turns of the player
     
-    def roll_hit_points(self):
-        """Roll hit points based on hit dice"""
-        if isinstance(self.hit_dice, tuple):
-            dice_count, dice_sides = self.hit_dice
-            return sum(random.randint(1, dice_sides) for _ in range(dice_count))
-        elif self.hit_dice == 0.5:  # 1/2 HD
-            return random.randint(1, 4)
-        elif self.hit_dice == 0.25:  # 1/4 HD
-            return random.randint(1, 3)
-        else:
-            raise ValueError(f"Invalid hit dice value: {self.hit_dice}")
+    def __reduce__(self):
+        # Pickle a reference to the shared template rather than a copy of it
+        return (get_monster_template, (self.char,))
 
 # Define all monsters
 MONSTERS = {
@@ -82,3 +78,7 @@ MONSTERS = {
     'Y': MonsterData('Y', 'Yeti', (4, 8), 14, (2, 4), 200, 8, 13),
     'Z': MonsterData('Z', 'Zombie Dragon', (10, 8), 18, (3, 6), 1200, 17, 20),
 }
+
+def get_monster_template(char):
+    """The MONSTERS template for a monster character"""
+    return MONSTERS[char]
@@ -1,8 +1,10 @@
-import random
-from config import EntityType, LIGHT_BLUE, YELLOW
+from config import EntityType, TileType, LIGHT_BLUE
 from map.town import BuildingType
 from map.town import force_shopkeeper_aside
 
+# Steps a monster may take in a turn
+MONSTER_STEPS = [(0, 1), (1, 0), (0, -1), (-1, 0), (1, 1), (-1, -1), (1, -1), (-1, 1)]
+
 class BasicMonster:
     def __init__(self):
         self.owner = None
@@ -10,34 +12,37 @@ class BasicMonster:
     def take_turn(self, player, game_map, message_log):
         monster = self.owner
         
-        # Only take a turn if monster is visible
-        if game_map.visible[monster.y][monster.x]:
-            # Check if monster is adjacent to the player
-            if abs(monster.x - player.x) <= 1 and abs(monster.y - player.y) <= 1:
-                # Monster is adjacent to player, attack!
-                if monster.fighter:
-                    attack_message = monster.fighter.attack(player, message_log)
-                    if attack_message:
-                        message_log.add_message(str(attack_message))
-            else:
-                # Basic pathfinding - move towards player
-                dx = player.x - monster.x
-                dy = player.y - monster.y
-                distance = max(abs(dx), abs(dy))
-                
-                if distance > 0:
-                    dx = int(round(dx / distance))
-                    dy = int(round(dy / distance))
-                    
-                    # Don't move onto stairs
-                    new_x, new_y = monster.x + dx, monster.y + dy
-                    if (0 <= new_x < game_map.width and 0 <= new_y < game_map.height and
-                        game_map.tiles[new_y][new_x] not in 
-                        [game_map.tiles[new_y][new_x].__class__.STAIRS_UP, 
-                         game_map.tiles[new_y][new_x].__class__.STAIRS_DOWN, 
-                         game_map.tiles[new_y][new_x].__class__.WALL] and
-                        not game_map.is_blocked(new_x, new_y)):
-                        monster.move(dx, dy, game_map, message_log)
+        # Awake monsters hunt the player whether it can see them or not; the
+        # scheduler puts them to sleep once they lose track (see game/scheduler.py)
+        # Check if monster is adjacent to the player
+        if abs(monster.x - player.x) <= 1 and abs(monster.y - player.y) <= 1:
+            # Monster is adjacent to player, attack!
+            if monster.fighter:
+                monster.fighter.attack(player, message_log, game_map)
+        else:
+            # Walk downhill on the distance field shared by all monsters
+            field = game_map.get_distance_field(player.x, player.y)
+            
+            # Try the direct step first so it wins ties with detours
+            dx = player.x - monster.x
+            dy = player.y - monster.y
+            distance = max(abs(dx), abs(dy))
+            direct_step = (int(round(dx / distance)), int(round(dy / distance)))
+            
+            best_step = None
+            best_distance = field[monster.y, monster.x]
+            for dx, dy in [direct_step] + MONSTER_STEPS:
+                new_x, new_y = monster.x + dx, monster.y + dy
+                # Don't move onto stairs
+                if (0 <= new_x < game_map.width and 0 <= new_y < game_map.height and
+                    field[new_y, new_x] < best_distance and
+                    game_map.tiles[new_y, new_x] not in (TileType.STAIRS_UP, TileType.STAIRS_DOWN) and
+                    not game_map.is_blocked(new_x, new_y)):
+                    best_step = (dx, dy)
+                    best_distance = field[new_y, new_x]
+            
+            if best_step:
+                monster.move(best_step[0], best_step[1], game_map, message_log)
 
 class ShopkeeperAI:
     def __init__(self, shop_type, door_x, door_y, shop_area):
@@ -83,8 +88,7 @@ class ShopkeeperAI:
                         # Check if the shopkeeper was recently moved by a player action
                         shopkeeper.x != self.door_x or shopkeeper.y != self.door_y
                     ):
-                        shopkeeper.x = self.door_x
-                        shopkeeper.y = self.door_y
+                        shopkeeper.force_move(self.door_x, self.door_y, game_map)
                         self.is_in_doorway = True
                         message_log.add_message(f"The {shopkeeper.name} moves to block the exit.", LIGHT_BLUE)
                 # Don't make the shopkeeper move back to the door automatically if player has no unpaid items
@@ -94,8 +98,7 @@ class ShopkeeperAI:
                 if (not self.is_in_doorway and 
                     shopkeeper.x >= x1 and shopkeeper.x <= x2 and 
                     shopkeeper.y >= y1 and shopkeeper.y <= y2):
-                    shopkeeper.x = self.door_x
-                    shopkeeper.y = self.door_y
+                    shopkeeper.force_move(self.door_x, self.door_y, game_map)
                     self.is_in_doorway = True
     
     def on_player_enter(self, player, message_log, game_map):
@@ -1,22 +1,55 @@
 import random
-from config import EntityType, LIGHT_BLUE, YELLOW
+from config import EntityType, YELLOW
+from game.events import Attack, Miss, Hit, Damage, Death, XPGained
+
+# Level up table (level, xp_required, hit_dice, attack_bonus, attribute_points),
+# shared by every Fighter
+LEVEL_TABLE = [
+    (1, 0, (1, 8), 1, 0),      # Level 1: No points
+    (2, 200, (1, 8), 2, 5),      # Level 2: 5 points
+    (3, 500, (1, 8), 2, 5),      # Level 3: 5 points
+    (4, 1000, (1, 8), 3, 5),     # Level 4: 5 points
+    (5, 2000, (1, 8), 4, 5),     # Level 5: 5 points
+    (6, 3500, (1, 8), 4, 5),     # Level 6: 5 points
+    (7, 5000, (1, 8), 5, 5),     # Level 7: 5 points
+    (8, 7000, (1, 8), 6, 5),     # Level 8: 5 points
+    (9, 10000, (1, 8), 6, 5),    # Level 9: 5 points
+    (10, 14000, 2, 6, 5),     # Level 10: 5 points (Fixed HP increase)
+    (11, 18000, 2, 7, 5),     # Level 11: 5 points
+    (12, 23000, 2, 7, 5),     # Level 12: 5 points
+    (13, 30000, 2, 8, 5),     # Level 13: 5 points
+    (14, 40000, 2, 8, 5),     # Level 14: 5 points
+    (15, 52000, 2, 8, 5),     # Level 15: 5 points
+    (16, 65000, 2, 9, 5),     # Level 16: 5 points
+    (17, 80000, 2, 9, 5),     # Level 17: 5 points
+    (18, 100000, 2, 10, 5),    # Level 18: 5 points
+    (19, 125000, 2, 10, 5),    # Level 19: 5 points
+    (20, 150000, 2, 10, 5),    # Level 20: 5 points
+    (21, 180000, 2, 11, 5),    # Continue beyond level 20
+    (22, 215000, 2, 11, 5),
+    (23, 255000, 2, 12, 5),
+    (24, 300000, 2, 12, 5),
+    (25, 350000, 2, 13, 5)
+]
 
 class Fighter:
-    def __init__(self, hp=8, armor=2, damage_dice=(1, 3)):
+    __slots__ = ('max_hp', 'hp', 'armor', 'dodge', 'damage_dice', 'owner', 'rng',
+                 'str', 'int', 'wis', 'dex', 'con', 'cha', 'max_mp', 'mp', 'attr_points', 'xp', 'level', 'attack_bonus')
+    
+    def __init__(self, hp=8, armor=2, damage_dice=(1, 3), rng=random, stats=None):
         self.max_hp = hp
         self.hp = hp
         self.armor = armor  # Damage reduction (renamed from AC)
         self.dodge = 10  # Base dodge chance (chance to completely avoid an attack)
         self.damage_dice = damage_dice  # Tuple of (number of dice, dice sides)
         self.owner = None
+        self.rng = rng  # Source of stat, hit, damage and level-up rolls
         
-        # Character stats (starting range 5-10)
-        self.str = random.randint(5, 10)
-        self.int = random.randint(5, 10)
-        self.wis = random.randint(5, 10)
-        self.dex = random.randint(5, 10)
-        self.con = random.randint(5, 10)
-        self.cha = random.randint(5, 10)
+        # Character stats (starting range 5-10), rolled unless given as
+        # (str, int, wis, dex, con, cha)
+        if stats is None:
+            stats = [rng.randint(5, 10) for _ in range(6)]
+        self.str, self.int, self.wis, self.dex, self.con, self.cha = stats
         
         # Calculate mana based on intelligence
         self.max_mp = self.int * 2  # Base mana is 2x intelligence
@@ -29,35 +62,6 @@ class Fighter:
         self.xp = 0
         self.level = 1
         self.attack_bonus = 1  # Starting attack bonus at level 1
-        
-        # Level up table (level, xp_required, hit_dice, attack_bonus, attribute_points)
-        self.level_table = [
-            (1, 0, (1, 8), 1, 0),      # Level 1: No points
-            (2, 200, (1, 8), 2, 5),      # Level 2: 5 points
-            (3, 500, (1, 8), 2, 5),      # Level 3: 5 points
-            (4, 1000, (1, 8), 3, 5),     # Level 4: 5 points
-            (5, 2000, (1, 8), 4, 5),     # Level 5: 5 points
-            (6, 3500, (1, 8), 4, 5),     # Level 6: 5 points
-            (7, 5000, (1, 8), 5, 5),     # Level 7: 5 points
-            (8, 7000, (1, 8), 6, 5),     # Level 8: 5 points
-            (9, 10000, (1, 8), 6, 5),    # Level 9: 5 points
-            (10, 14000, 2, 6, 5),     # Level 10: 5 points (Fixed HP increase)
-            (11, 18000, 2, 7, 5),     # Level 11: 5 points
-            (12, 23000, 2, 7, 5),     # Level 12: 5 points
-            (13, 30000, 2, 8, 5),     # Level 13: 5 points
-            (14, 40000, 2, 8, 5),     # Level 14: 5 points
-            (15, 52000, 2, 8, 5),     # Level 15: 5 points
-            (16, 65000, 2, 9, 5),     # Level 16: 5 points
-            (17, 80000, 2, 9, 5),     # Level 17: 5 points
-            (18, 100000, 2, 10, 5),    # Level 18: 5 points
-            (19, 125000, 2, 10, 5),    # Level 19: 5 points
-            (20, 150000, 2, 10, 5),    # Level 20: 5 points
-            (21, 180000, 2, 11, 5),    # Continue beyond level 20
-            (22, 215000, 2, 11, 5),
-            (23, 255000, 2, 12, 5),
-            (24, 300000, 2, 12, 5),
-            (25, 350000, 2, 13, 5)
-        ]
     
     def get_dodge_chance(self):
         """Calculate character's dodge chance based on dexterity"""
@@ -78,7 +82,7 @@ class Fighter:
     def roll_damage(self):
         """Roll damage based on current weapon and add strength bonus"""
         num_dice, dice_sides = self.damage_dice
-        base_damage = sum(random.randint(1, dice_sides) for _ in range(num_dice))
+        base_damage = sum(self.rng.randint(1, dice_sides) for _ in range(num_dice))
         
         # Add strength bonus for melee weapons
         # Check if owner has a ranged weapon equipped
@@ -89,114 +93,103 @@ class Fighter:
         
         return base_damage
     
-    def take_damage(self, amount):
+    def take_damage(self, amount, game_map=None, source=None):
+        """Take amount damage less armor and return the Damage event.
+        
+        Damage and, if it was fatal, Death are published on game_map.events.
+        """
         # Apply armor damage reduction
         reduced_damage = max(1, amount - self.armor)  # Always take at least 1 damage
         self.hp -= reduced_damage
         
+        owner = self.owner
+        damage = Damage(owner, source, amount, reduced_damage, self.hp <= 0)
+        events = game_map.events if game_map else None
+        listening = events.handlers if events else ()
+        if Damage in listening:
+            events.publish(damage)
+        
         if self.hp <= 0:
-            # If the owner is the player, game over
-            if self.owner.entity_type == EntityType.PLAYER:
-                return 'dead'
-            else:
-                # Entity died - handle XP award if killed by player
-                self.owner.char = '%'  # Dead enemy becomes a corpse
-                self.owner.blocks = False
-                self.owner.fighter = None
-                self.owner.ai = None
-                
-                # Store original name for XP checking before changing it
-                original_name = self.owner.name
-                self.owner.name = f'remains of {original_name}'
-                
-                # Return the original name to check for XP in the calling method
-                return f'dead:{original_name}'
+            name = owner.name
+            # The player's death ends the game; anything else becomes a corpse
+            if owner.entity_type != EntityType.PLAYER:
+                owner.char = '%'  # Dead enemy becomes a corpse
+                if game_map:
+                    game_map.set_entity_blocks(owner, False)
+                else:
+                    owner.blocks = False
+                owner.fighter = None
+                owner.ai = None
+                owner.name = f'remains of {name}'
+            
+            if Death in listening:
+                events.publish(Death(owner, name, source))
         
-        return f'damaged:{reduced_damage}'
+        return damage
+    
+    def attack(self, target, message_log=None, game_map=None):
+        """Attack target in melee and return the Attack event.
+        
+        The outcome is published on game_map.events (see game/events.py).
+        """
+        return self._strike(target, None, message_log, game_map)
+    
+    def shoot(self, target, damage_dice, message_log=None, game_map=None):
+        """Fire a ranged weapon with damage_dice at target and return the Attack event"""
+        return self._strike(target, damage_dice, message_log, game_map)
     
-    def attack(self, target, message_log=None):
+    def _strike(self, target, ranged_dice, message_log, game_map):
+        attacker = self.owner
+        ranged = ranged_dice is not None
+        attack = Attack(attacker, target, ranged)
+        # Events nobody subscribed to are never built
+        events = game_map.events if game_map else None
+        listening = events.handlers if events else ()
+        if Attack in listening:
+            events.publish(attack)
+        
         # Determine if attack hits based on dodge chance
         dodge_chance = target.fighter.get_dodge_chance()
-        hit_roll = random.randint(1, 100)
+        hit_roll = self.rng.randint(1, 100)
         
         # If roll is higher than dodge chance, the attack hits
-        if hit_roll > dodge_chance:
-            damage = self.roll_damage()
-            if damage > 0:
-                # Store original name before potential death changes it
-                original_target_name = target.name
-                
-                # Deal damage and check result
-                result = target.fighter.take_damage(damage)
-                
-                # Check if it's a damage result with reduced damage info
-                if result and result.startswith('damaged:'):
-                    # Extract the reduced damage
-                    reduced_damage = int(result.split(':', 1)[1])
-                    damage_reduction = damage - reduced_damage
-                    
-                    # Show both original damage and reduced damage
-                    if damage_reduction > 0:
-                        attack_msg = f'{self.owner.name} attacks {target.name} for {damage} damage ({reduced_damage} after armor)!'
-                    else:
-                        attack_msg = f'{self.owner.name} attacks {target.name} for {reduced_damage} damage!'
-                
-                # Handle death and XP
-                elif result and 'dead:' in result:
-                    # Extract the original name
-                    killed_entity_name = result.split(':', 1)[1]
-                    
-                    # Award XP if player killed something
-                    if self.owner.entity_type == EntityType.PLAYER and message_log:
-                        xp_amount = 0
-                        
-                        # Find the monster in our list by name
-                        from data.monsters import MONSTERS
-                        for monster_key, monster_data in MONSTERS.items():
-                            if monster_data.name.lower() in killed_entity_name.lower():
-                                xp_amount = monster_data.xp
-                                break
-                        
-                        # Fallback for monsters not in the list (should be rare)
-                        if xp_amount == 0:
-                            if 'Orc' in killed_entity_name:
-                                xp_amount = 50
-                            elif 'Troll' in killed_entity_name:
-                                xp_amount = 100
-                        
-                        if xp_amount > 0:
-                            message_log.add_message(f"You killed a {killed_entity_name} and gained {xp_amount} XP!", LIGHT_BLUE)
-                            
-                            # Add XP directly and check for level up
-                            old_level = self.level
-                            self.xp += xp_amount
-                            
-                            # Check for level up
-                            for level, xp_threshold, hit_dice, attack_bonus, attr_points in self.level_table:
-                                if level > self.level and self.xp >= xp_threshold:
-                                    self.level_up(level, hit_dice, attack_bonus, attr_points, message_log)
-                                    break
-                    
-                    # Use original name in message to avoid saying "remains of..."
-                    return f'{self.owner.name} attacks {original_target_name} for {damage} damage and kills it!'
-                elif result == 'dead':
-                    return f'{self.owner.name} attacks {original_target_name} for {damage} damage and kills it!'
-                else:
-                    return attack_msg
-            else:
-                return f'{self.owner.name} attacks {target.name} but does no damage!'
+        if hit_roll <= dodge_chance:
+            if Miss in listening:
+                events.publish(Miss(attacker, target, ranged))
+            return attack
+        
+        if ranged:
+            # Ranged weapons roll one die plus the dexterity bonus
+            damage = self.rng.randint(1, ranged_dice[1]) + self.get_ranged_bonus()
         else:
-            return f'{self.owner.name} attacks {target.name} but misses! ({target.name} dodged)'
+            damage = self.roll_damage()
+        
+        if damage <= 0:
+            if Hit in listening:
+                events.publish(Hit(attacker, target, target.name, damage, 0, False, ranged))
+            return attack
+        
+        # Store name and template before a fatal hit turns the target into remains
+        name = target.name
+        monster_data = target.monster_data
+        result = target.fighter.take_damage(damage, game_map, attacker)
+        if Hit in listening:
+            events.publish(Hit(attacker, target, name, damage, result.taken, result.fatal, ranged))
+        
+        # The player earns the victim's template XP
+        if result.fatal and monster_data and attacker.entity_type == EntityType.PLAYER:
+            self.gain_xp(monster_data.xp, message_log, events, name)
+        return attack
     
-    def gain_xp(self, amount, message_log=None):
-        """Gain experience points and check for level up"""
+    def gain_xp(self, amount, message_log=None, events=None, source=None):
+        """Gain experience points (for killing source, if given) and check for level up"""
         # No level cap - continue past level 20
         self.xp += amount
-        if message_log:
-            message_log.add_message(f"You gain {amount} experience points.", LIGHT_BLUE)
+        if events and XPGained in events.handlers:
+            events.publish(XPGained(self.owner, amount, source))
         
         # Check for level up
-        for level, xp_threshold, hit_dice, attack_bonus, attr_points in self.level_table:
+        for level, xp_threshold, hit_dice, attack_bonus, attr_points in LEVEL_TABLE:
             if level > self.level and self.xp >= xp_threshold:
                 self.level_up(level, hit_dice, attack_bonus, attr_points, message_log)
                 break
@@ -210,7 +203,7 @@ class Fighter:
         if isinstance(hit_dice, tuple):
             # Roll dice for HP increase
             num_dice, dice_sides = hit_dice
-            hp_increase = sum(random.randint(1, dice_sides) for _ in range(num_dice))
+            hp_increase = sum(self.rng.randint(1, dice_sides) for _ in range(num_dice))
             
             # Add constitution bonus
             hp_increase += self.get_hp_bonus()
@@ -268,15 +261,15 @@ class Fighter:
     def get_next_level_xp(self):
         """Get XP needed for next level"""
         # Check if we've exceeded our defined level table
-        if self.level >= len(self.level_table):
-            last_level = self.level_table[-1]
+        if self.level >= len(LEVEL_TABLE):
+            last_level = LEVEL_TABLE[-1]
             # Generate a reasonable next XP threshold (25% increase from previous)
             return int(last_level[1] * 1.25)
             
-        for level, xp_threshold, _, _, _ in self.level_table:
+        for level, xp_threshold, _, _, _ in LEVEL_TABLE:
             if level > self.level:
                 return xp_threshold
                 
         # If we get here, create a fallback calculation
-        last_known_level = self.level_table[-1]
+        last_known_level = LEVEL_TABLE[-1]
         return int(last_known_level[1] * 1.25)
@@ -2,6 +2,9 @@ from config import ItemType, YELLOW, GREEN, RED, LIGHT_BLUE, EquipmentSlot
 import random
 
 class Item:
+    __slots__ = ('use_function', 'owner', 'item_type', 'equippable', 'armor_bonus', 'dodge_bonus', 'damage_dice',
+                 'weapon_data', 'ammo_data', 'price', 'unpaid')
+    
     def __init__(self, use_function=None, item_type=None, equippable=False, 
                  armor_bonus=0, dodge_bonus=0, damage_dice=None, weapon_data=None, ammo_data=None):
         self.use_function = use_function
@@ -18,7 +21,7 @@ class Item:
         self.price = 0      # Item price in silver
         self.unpaid = False # Whether item is paid for
         
-    def use(self, player, message_log, entities):
+    def use(self, player, message_log, game_map):
         # For consumable items
         if self.use_function is not None:
             if self.use_function(player, message_log):
@@ -36,10 +39,10 @@ class Item:
                 
             if player.inventory.get_equipped_item(slot) == self.owner:
                 # Item is already equipped, unequip it
-                player.inventory.unequip_item(slot, message_log, entities)
+                player.inventory.unequip_item(slot, message_log, game_map)
             else:
                 # Equip the item
-                player.inventory.equip_item(self.owner, slot, message_log, entities)
+                player.inventory.equip_item(self.owner, slot, message_log, game_map)
             return True
         
         # Can't use this item
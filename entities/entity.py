@@ -2,7 +2,11 @@ import math
 from config import EntityType, RED
 
 class Entity:
-    def __init__(self, x, y, char, color, entity_type, name, blocks=True, fighter=None, ai=None, item=None, inventory=None, silver_pieces=0):
+    __slots__ = ('x', 'y', 'char', 'color', 'entity_type', 'name', 'blocks', 'fighter', 'ai', 'item', 'inventory',
+                 'silver_pieces', 'monster_data', 'targeting_x', 'targeting_y', 'selected_attribute')
+    
+    def __init__(self, x, y, char, color, entity_type, name, blocks=True, fighter=None, ai=None, item=None, inventory=None, silver_pieces=0,
+                 monster_data=None):
         self.x = x
         self.y = y
         self.char = char
@@ -27,11 +31,29 @@ class Entity:
             self.inventory.owner = self
             
         self.silver_pieces = silver_pieces
+        
+        # Shared MonsterData template for monsters (XP, base stats); None otherwise
+        self.monster_data = monster_data
+        
+        # Player UI state: ranged targeting cursor and character sheet selection
+        self.targeting_x = None
+        self.targeting_y = None
+        self.selected_attribute = 0
     
-    def force_move(self, new_x, new_y):
+    @property
+    def target_coords(self):
+        """The targeting cursor position, or None when not targeting"""
+        if self.targeting_x is None:
+            return None
+        return (self.targeting_x, self.targeting_y)
+    
+    def force_move(self, new_x, new_y, game_map=None):
         """Force the entity to move regardless of obstacles"""
-        self.x = new_x
-        self.y = new_y
+        if game_map:
+            game_map.move_entity(self, new_x, new_y)
+        else:
+            self.x = new_x
+            self.y = new_y
         if hasattr(self, 'ai') and self.ai and hasattr(self.ai, 'is_in_doorway'):
             self.ai.is_in_doorway = False
         return True
@@ -40,31 +62,25 @@ class Entity:
         # Move by the given amount if not blocked
         if 0 <= self.x + dx < game_map.width and 0 <= self.y + dy < game_map.height:
             if not game_map.is_blocked(self.x + dx, self.y + dy):
-                self.x += dx
-                self.y += dy
-                
-                # Double-check we're still within bounds after all movement
-                self.x = max(0, min(game_map.width - 1, self.x))
-                self.y = max(0, min(game_map.height - 1, self.y))
+                game_map.move_entity(self, self.x + dx, self.y + dy)
                 
                 # Check for silver pickup if this is the player
                 if self.entity_type == EntityType.PLAYER:
-                    for entity in list(game_map.entities):
-                        if entity.entity_type == EntityType.ITEM and entity.name == "Silver" and entity.x == self.x and entity.y == self.y:
+                    for entity in list(game_map.get_entities_at(self.x, self.y)):
+                        if entity.entity_type == EntityType.ITEM and entity.name == "Silver":
                             # Add silver to player's total
                             self.silver_pieces += entity.silver_pieces
-                            game_map.entities.remove(entity)
+                            game_map.remove_entity(entity)
                             message_log.add_message(f"You pick up {entity.silver_pieces} silver pieces.", RED)
                             
                 return True
             else:
                 # First check for shopkeeper interaction (player bumping into shopkeeper)
                 if self.entity_type == EntityType.PLAYER:
-                    for entity in list(game_map.entities):
+                    for entity in list(game_map.get_entities_at(self.x + dx, self.y + dy)):
                         if (entity.entity_type == EntityType.ENEMY and 
                             entity.ai and 
-                            hasattr(entity.ai, 'on_player_enter') and
-                            entity.x == self.x + dx and entity.y == self.y + dy):
+                            hasattr(entity.ai, 'on_player_enter')):
                             
                             # Give the shopkeeper a greeting message first
                             entity.ai.on_player_enter(self, message_log, game_map)
@@ -131,10 +147,7 @@ class Entity:
                                 if x1 <= new_x <= x2 and y1 <= new_y <= y2:
                                     print(f"Moving shopkeeper to {new_x}, {new_y}")
                                     # Force the shopkeeper to move
-                                    entity.x = new_x
-                                    entity.y = new_y
-                                    if hasattr(entity.ai, 'is_in_doorway'):
-                                        entity.ai.is_in_doorway = False
+                                    entity.force_move(new_x, new_y, game_map)
                                     moved = True
                                     break
                             
@@ -142,20 +155,16 @@ class Entity:
                             if not moved:
                                 center_x = (x1 + x2) // 2
                                 center_y = (y1 + y2) // 2
-                                entity.x = center_x
-                                entity.y = center_y
-                                if hasattr(entity.ai, 'is_in_doorway'):
-                                    entity.ai.is_in_doorway = False
+                                entity.force_move(center_x, center_y, game_map)
                                 print(f"Moving shopkeeper to center: {center_x}, {center_y}")
                             
                             message_log.add_message(f"The {entity.name} steps aside.", RED)
                             return "You meet the shopkeeper."
                 
                 # Check for entities to attack (but not shopkeepers)
-                for entity in list(game_map.entities):  # Create a copy to avoid issues with entity removal
+                for entity in list(game_map.get_entities_at(self.x + dx, self.y + dy)):  # Create a copy to avoid issues with entity removal
                     if (entity.fighter and 
-                        entity.x == self.x + dx and entity.y == self.y + dy and
                         not (entity.ai and hasattr(entity.ai, 'on_player_enter'))):  # Not a shopkeeper
                         if self.fighter:
-                            return self.fighter.attack(entity, message_log)
+                            return self.fighter.attack(entity, message_log, game_map)
         return False
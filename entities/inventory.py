@@ -1,6 +1,8 @@
-from config import EquipmentSlot, ItemType, RED, YELLOW, LIGHT_BLUE
+from config import EquipmentSlot, ItemType, EntityType, RED, YELLOW, LIGHT_BLUE
 
 class Inventory:
+    __slots__ = ('capacity', 'items', 'equipment', 'owner')
+    
     def __init__(self, capacity=10):
         self.capacity = capacity
         self.items = []  # Regular inventory items
@@ -38,7 +40,7 @@ class Inventory:
     def get_equipped_item(self, slot):
         return self.equipment[slot]
     
-    def equip_item(self, item, slot, message_log, entities=None):
+    def equip_item(self, item, slot, message_log, game_map=None):
         # Check if the item is a two-handed weapon
         is_two_handed = (item.item.weapon_data and item.item.weapon_data.is_two_handed)
         
@@ -55,19 +57,19 @@ class Inventory:
             if right_hand_item:
                 # Special handling for two-handed weapon already in right hand
                 if right_hand_item == left_hand_item and right_hand_item.item.weapon_data and right_hand_item.item.weapon_data.is_two_handed:
-                    success = self.unequip_item(EquipmentSlot.RIGHT_HAND, message_log, entities)
+                    success = self.unequip_item(EquipmentSlot.RIGHT_HAND, message_log, game_map)
                     if not success:
                         message_log.add_message(f"Cannot equip - inventory full!", RED)
                         return False
                 else:
-                    success = self.unequip_item(EquipmentSlot.RIGHT_HAND, message_log, entities)
+                    success = self.unequip_item(EquipmentSlot.RIGHT_HAND, message_log, game_map)
                     if not success:
                         message_log.add_message(f"Cannot equip - right hand item can't be unequipped!", RED)
                         return False
             
             # Only try to unequip left hand if it's not the same as right hand (would be already unequipped)
             if left_hand_item and left_hand_item != right_hand_item:
-                success = self.unequip_item(EquipmentSlot.LEFT_HAND, message_log, entities)
+                success = self.unequip_item(EquipmentSlot.LEFT_HAND, message_log, game_map)
                 if not success:
                     message_log.add_message(f"Cannot equip - left hand item can't be unequipped!", RED)
                     # Re-equip right hand if needed
@@ -100,7 +102,7 @@ class Inventory:
             
             if two_handed_equipped:
                 # Need to unequip the two-handed weapon
-                success = self.unequip_item(EquipmentSlot.RIGHT_HAND, message_log, entities)
+                success = self.unequip_item(EquipmentSlot.RIGHT_HAND, message_log, game_map)
                 if not success:
                     message_log.add_message(f"Cannot equip - two-handed weapon can't be unequipped!", RED)
                     return False
@@ -115,8 +117,8 @@ class Inventory:
                     # Drop the item if inventory is full
                     current_item.x = self.owner.x
                     current_item.y = self.owner.y
-                    if entities is not None:
-                        entities.append(current_item)
+                    if game_map is not None:
+                        game_map.add_entity(current_item)
                     message_log.add_message(f"You drop the {current_item.name} since your inventory is full.", YELLOW)
             
             # Remove the item from inventory and equip it
@@ -139,8 +141,8 @@ class Inventory:
                     # Drop the item if inventory is full
                     current_item.x = self.owner.x
                     current_item.y = self.owner.y
-                    if entities is not None:
-                        entities.append(current_item)
+                    if game_map is not None:
+                        game_map.add_entity(current_item)
                     message_log.add_message(f"You drop the {current_item.name} since your inventory is full.", YELLOW)
             
             # Remove the item from inventory and equip it
@@ -151,7 +153,7 @@ class Inventory:
             message_log.add_message(f"You equip the {item.name}.", LIGHT_BLUE)
             return True
     
-    def unequip_item(self, slot, message_log, entities):
+    def unequip_item(self, slot, message_log, game_map=None):
         item = self.equipment[slot]
         if not item:
             return False
@@ -177,11 +179,16 @@ class Inventory:
                 
             message_log.add_message(f"You unequip the {item.name}.", LIGHT_BLUE)
             return True
+        elif game_map is None:
+            # Nowhere to drop it
+            message_log.add_message(f"Cannot unequip - inventory full!", RED)
+            self._update_fighter_stats(item, True)
+            return False
         else:
             # Drop the item if inventory is full
             # First check if something already exists at this spot
-            for entity in entities:
-                if entity.x == self.owner.x and entity.y == self.owner.y and entity.entity_type == EntityType.ITEM:
+            for entity in game_map.get_entities_at(self.owner.x, self.owner.y):
+                if entity.entity_type == EntityType.ITEM:
                     message_log.add_message(f"Cannot unequip - inventory full and an item is already on the ground.", RED)
                     # Re-apply bonuses since we couldn't unequip
                     self._update_fighter_stats(item, True)
@@ -199,7 +206,7 @@ class Inventory:
             else:
                 self.equipment[slot] = None
                 
-            entities.append(item)
+            game_map.add_entity(item)
             message_log.add_message(f"You unequip and drop the {item.name} since your inventory is full.", YELLOW)
             return True
     
@@ -295,7 +302,7 @@ class Inventory:
                     pass
             return True
         return False
-
+    
     def has_unpaid_items(self):
         """Check if the player has any unpaid items in inventory"""
         for item in self.items:
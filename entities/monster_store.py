@@ -0,0 +1,213 @@
+import random
+import numpy as np
+from config import EntityType, WHITE
+from data.monsters import MONSTERS
+from entities.entity import Entity
+from entities.components.fighter import Fighter
+from entities.components.ai import BasicMonster
+
+# Template ids index MONSTER_TEMPLATES (-1 for monsters not made from one)
+MONSTER_TEMPLATES = list(MONSTERS.values())
+TEMPLATE_IDS = {monster_data.name: index for index, monster_data in enumerate(MONSTER_TEMPLATES)}
+
+# Store columns: name -> dtype
+COLUMNS = {
+    'x': np.int16,
+    'y': np.int16,
+    'hp': np.int32,
+    'max_hp': np.int32,
+    'armor': np.int16,
+    'dodge': np.int16,
+    'dice_count': np.int16,
+    'dice_sides': np.int16,
+    'template': np.int16,
+    'alive': np.bool_,
+}
+
+class MonsterStore:
+    """A level's monsters as NumPy columns, one row per monster.
+    
+    Each row is wrapped in a StoredMonster facade whose position and combat
+    stats read and write the columns, so code written against Entity and
+    Fighter keeps working while whole-level queries run vectorized. Rows are
+    never reused: a monster that dies or is replaced stops being alive.
+    """
+    def __init__(self, capacity=64):
+        self.size = 0
+        self.entities = []  # Row -> StoredMonster
+        for name, dtype in COLUMNS.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+    
+    def __len__(self):
+        return self.size
+    
+    def _new_row(self):
+        if self.size == len(self.x):
+            # Double every column's capacity
+            for name in COLUMNS:
+                column = getattr(self, name)
+                grown = np.zeros(len(column) * 2, dtype=column.dtype)
+                grown[:self.size] = column
+                setattr(self, name, grown)
+        self.size += 1
+        return self.size - 1
+    
+    def spawn(self, monster_data, x, y, hp, rng=random, color=WHITE):
+        """Create a monster from a MonsterData template and return its facade"""
+        row = self._new_row()
+        self.template[row] = TEMPLATE_IDS.get(monster_data.name, -1)
+        self.alive[row] = True
+        fighter = StoredFighter(self, row, hp, monster_data.armor, monster_data.damage_dice, rng)
+        fighter.dodge = monster_data.dodge
+        monster = StoredMonster(self, row, x, y, monster_data.char, color, monster_data.name, fighter, BasicMonster(),
+                                monster_data)
+        self.entities.append(monster)
+        return monster
+    
+    def add(self, entity):
+        """Copy a living monster Entity into a new row and return its facade"""
+        row = self._new_row()
+        self.template[row] = TEMPLATE_IDS.get(entity.monster_data.name, -1) if entity.monster_data else -1
+        self.alive[row] = True
+        fighter = StoredFighter(self, row, entity.fighter.max_hp, entity.fighter.armor,
+                                entity.fighter.damage_dice, entity.fighter.rng)
+        fighter.hp = entity.fighter.hp
+        fighter.dodge = entity.fighter.dodge
+        monster = StoredMonster(self, row, entity.x, entity.y, entity.char, entity.color, entity.name, fighter, entity.ai,
+                                entity.monster_data)
+        monster.blocks = entity.blocks
+        self.entities.append(monster)
+        return monster
+    
+    def release(self, monster):
+        """Stop counting a monster that is no longer on the level"""
+        self.alive[monster.row] = False
+    
+    def living_rows(self):
+        return np.flatnonzero(self.alive[:self.size])
+    
+    def visible_rows(self, visible):
+        """Rows of living monsters on tiles that are True in visible"""
+        size = self.size
+        return np.flatnonzero(self.alive[:size] & visible[self.y[:size], self.x[:size]])
+    
+    def rows_in_rect(self, x1, y1, x2, y2):
+        """Rows of living monsters inside the inclusive rectangle, e.g. the camera view"""
+        x, y = self.x[:self.size], self.y[:self.size]
+        return np.flatnonzero(self.alive[:self.size] & (x >= x1) & (x <= x2) & (y >= y1) & (y <= y2))
+    
+    def rows_within(self, x, y, radius):
+        """Rows of living monsters within radius steps (8-way) of (x, y)"""
+        distance = np.maximum(np.abs(self.x[:self.size] - x), np.abs(self.y[:self.size] - y))
+        return np.flatnonzero(self.alive[:self.size] & (distance <= radius))
+    
+    def get_entities(self, rows):
+        """The StoredMonster facades for rows"""
+        return [self.entities[row] for row in rows]
+
+class StoredMonster(Entity):
+    """Entity whose position lives in a MonsterStore row"""
+    __slots__ = ('store', 'row')
+    
+    def __init__(self, store, row, x, y, char, color, name, fighter, ai, monster_data=None):
+        self.store = store
+        self.row = row
+        super().__init__(x, y, char, color, EntityType.ENEMY, name, blocks=True, fighter=fighter, ai=ai,
+                         monster_data=monster_data)
+    
+    @property
+    def x(self):
+        return int(self.store.x[self.row])
+    
+    @x.setter
+    def x(self, value):
+        self.store.x[self.row] = value
+    
+    @property
+    def y(self):
+        return int(self.store.y[self.row])
+    
+    @y.setter
+    def y(self, value):
+        self.store.y[self.row] = value
+
+# Fighter stats every stored monster shares (see StoredFighter)
+MONSTER_CONSTANTS = dict.fromkeys(('str', 'int', 'wis', 'dex', 'con', 'cha'), 10)
+MONSTER_CONSTANTS.update(dict.fromkeys(('max_mp', 'mp', 'attr_points', 'xp'), 0))
+MONSTER_CONSTANTS.update(level=1, attack_bonus=1)
+
+def constant_stat(name, value):
+    """A read-only property that always returns value"""
+    def set_stat(fighter, _):
+        raise AttributeError(f"Stored monsters can't change {name}; it is fixed at {value}")
+    return property(lambda fighter: value, set_stat)
+
+class StoredFighter(Fighter):
+    """Fighter whose hit points, armor, dodge and damage dice live in a MonsterStore row.
+    
+    Monsters never spend attributes, mana or XP, so those are the shared,
+    read-only MONSTER_CONSTANTS instead of six rolled stats per monster.
+    A 10 in every attribute gives the same zero bonuses as the 5-10 a
+    Fighter rolls. Writing one (e.g. gain_xp) raises AttributeError.
+    """
+    __slots__ = ('store', 'row')
+    
+    def __init__(self, store, row, hp, armor, damage_dice, rng=random):
+        self.store = store
+        self.row = row
+        self.max_hp = hp
+        self.hp = hp
+        self.armor = armor
+        self.dodge = 10
+        self.damage_dice = damage_dice
+        self.owner = None
+        self.rng = rng
+    
+    @property
+    def hp(self):
+        return int(self.store.hp[self.row])
+    
+    @hp.setter
+    def hp(self, value):
+        self.store.hp[self.row] = value
+    
+    @property
+    def max_hp(self):
+        return int(self.store.max_hp[self.row])
+    
+    @max_hp.setter
+    def max_hp(self, value):
+        self.store.max_hp[self.row] = value
+    
+    @property
+    def armor(self):
+        return int(self.store.armor[self.row])
+    
+    @armor.setter
+    def armor(self, value):
+        self.store.armor[self.row] = value
+    
+    @property
+    def dodge(self):
+        return int(self.store.dodge[self.row])
+    
+    @dodge.setter
+    def dodge(self, value):
+        self.store.dodge[self.row] = value
+    
+    @property
+    def damage_dice(self):
+        return (int(self.store.dice_count[self.row]), int(self.store.dice_sides[self.row]))
+    
+    @damage_dice.setter
+    def damage_dice(self, value):
+        self.store.dice_count[self.row], self.store.dice_sides[self.row] = value
+    
+    def take_damage(self, amount, game_map=None, source=None):
+        result = super().take_damage(amount, game_map, source)
+        if self.hp <= 0:
+            self.store.alive[self.row] = False
+        return result
+
+for stat_name, stat_value in MONSTER_CONSTANTS.items():
+    setattr(StoredFighter, stat_name, constant_stat(stat_name, stat_value))
@@ -0,0 +1,304 @@
+"""Programmatic environment API for agents.
+
+CrimsonDepthsEnv plays one game through reset(seed) / step(action) in the
+Gymnasium style. Its observations are live NumPy arrays rather than copies:
+the current map's tiles, visible and explored arrays are attached to the
+observation buffers (see Map.attach_buffers), so FOV and tile changes land in
+them directly. VectorEnv steps many games in lockstep, in-process or one per
+subprocess, with every observation in shared memory.
+"""
+import multiprocessing
+import pickle
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from config import MAP_WIDTH, MAP_HEIGHT, EntityType
+from map.fov import calculate_fov
+from game.world import GameWorld
+from game.player import create_player, perform_action
+from ui.message_log import MessageLog
+
+# Entity layer codes (0 means no visible entity)
+ENTITY_CODES = {EntityType.PLAYER: 1, EntityType.ENEMY: 2, EntityType.ITEM: 3}
+CORPSE_CODE = 4  # Dead monsters keep EntityType.ENEMY but lose their fighter
+
+# Player stats vector layout
+STATS = ('hp', 'max_hp', 'x', 'y', 'depth', 'level', 'xp', 'turn')
+
+# Observation layers: name -> (shape, dtype)
+OBSERVATION_SPEC = {
+    'terrain': ((MAP_HEIGHT, MAP_WIDTH), np.uint8),   # TileType codes
+    'visible': ((MAP_HEIGHT, MAP_WIDTH), np.bool_),
+    'explored': ((MAP_HEIGHT, MAP_WIDTH), np.bool_),
+    'entities': ((MAP_HEIGHT, MAP_WIDTH), np.uint8),  # ENTITY_CODES of visible entities
+    'stats': ((len(STATS),), np.int32),
+}
+
+# Reward for each new dungeon level reached, on top of XP gained
+DEPTH_REWARD = 100
+
+def allocate_observations(batch_shape=()):
+    """Allocate a zeroed array for every observation layer, with optional leading batch dims"""
+    return {name: np.zeros(batch_shape + shape, dtype=dtype) for name, (shape, dtype) in OBSERVATION_SPEC.items()}
+
+class CrimsonDepthsEnv:
+    """A single game driven one player turn at a time.
+    
+    reset and step return the same observation dict every time; its arrays
+    are updated in place, so copy them if an earlier frame must be kept.
+    Pass buffers (a dict shaped like allocate_observations()) to have the
+    observations written somewhere specific, such as shared memory.
+    Actions are the codes in game/input_log.py, played by perform_action
+    exactly as main.py plays the same commands.
+    """
+    def __init__(self, max_depth=20, max_turns=20000, buffers=None):
+        self.max_depth = max_depth
+        self.max_turns = max_turns
+        self.observation = buffers if buffers is not None else allocate_observations()
+        self.game_world = None
+        self.game_map = None
+        self.player = None
+        self.message_log = None
+        self.seed = None
+        self.turn = 0
+        self.depth = 0
+        self.fov_radius = 20
+    
+    def reset(self, seed=None):
+        """Start a new game and return (observation, info)"""
+        if self.game_map is not None:
+            self.game_map.detach_buffers()
+        self.close()
+        
+        self.seed = seed
+        self.turn = 0
+        self.depth = 0
+        self.message_log = MessageLog()
+        self.game_world = GameWorld(max_levels=self.max_depth, seed=seed)
+        
+        game_map, _ = self.game_world.get_current_level()
+        self.player = create_player(self.game_world, game_map, self.message_log)
+        self.game_world.attach_player(self.player)
+        self._enter_level(game_map, fov_radius=20)  # Town
+        return self.observation, self._info(None)
+    
+    def step(self, action):
+        """Play one player turn and the monsters' replies.
+        
+        Returns (observation, reward, terminated, truncated, info). The reward
+        is the XP gained plus DEPTH_REWARD per new level; the episode
+        terminates when the player dies or reaches max_depth and is truncated
+        after max_turns. Actions that take no game time (stairs, picking up,
+        using an item) or can't be carried out leave the monsters and the
+        turn count alone.
+        """
+        player = self.player
+        game_world = self.game_world
+        xp_before = player.fighter.xp
+        depth_before = self.depth
+        level_before = game_world.current_level
+        
+        took_turn = perform_action(game_world, player, action, self.message_log)
+        if game_world.current_level != level_before:
+            self.game_map.detach_buffers()
+            game_map, _ = game_world.get_current_level()
+            self.depth = max(self.depth, game_world.current_level)
+            self._enter_level(game_map, fov_radius=20 if game_world.current_level == 0 else 10)
+        
+        killer = None
+        if took_turn:
+            self.turn += 1
+            actor = self.game_world.advance_turn(player, self.message_log)
+            if actor is not None:
+                killer = actor.name
+        
+        self._observe()
+        reward = player.fighter.xp - xp_before + DEPTH_REWARD * (self.depth - depth_before)
+        terminated = player.fighter.hp <= 0 or self.depth >= self.max_depth
+        truncated = not terminated and self.turn >= self.max_turns
+        return self.observation, reward, terminated, truncated, self._info(killer)
+    
+    def get_state(self):
+        """Snapshot the whole game as bytes (see set_state)"""
+        return pickle.dumps((self.game_world, self.game_map, self.player, self.message_log,
+                             self.seed, self.turn, self.depth, self.fov_radius), pickle.HIGHEST_PROTOCOL)
+    
+    def set_state(self, state):
+        """Restore a snapshot taken by get_state and return the observation"""
+        if self.game_map is not None:
+            self.game_map.detach_buffers()
+        self.close()
+        (self.game_world, game_map, self.player, self.message_log,
+         self.seed, self.turn, self.depth, self.fov_radius) = pickle.loads(state)
+        game_map.attach_buffers(self.observation['terrain'], self.observation['visible'], self.observation['explored'])
+        self.game_map = game_map
+        self._observe()
+        return self.observation
+    
+    def close(self):
+        """Stop the current game's level generation thread"""
+        if self.game_world is not None:
+            self.game_world.close()
+    
+    def _enter_level(self, game_map, fov_radius):
+        """Make game_map current and point its arrays at the observation buffers"""
+        game_map.attach_buffers(self.observation['terrain'], self.observation['visible'], self.observation['explored'])
+        self.game_map = game_map
+        self.fov_radius = fov_radius
+        self._observe()
+    
+    def _observe(self):
+        """Refresh the layers that aren't already live views of the map"""
+        game_map = self.game_map
+        calculate_fov(game_map, self.player.x, self.player.y, self.fov_radius)
+        
+        # Visible entities only; items first so creatures are drawn over them
+        layer = self.observation['entities']
+        layer.fill(0)
+        visible = game_map.visible
+        for entity in sorted(game_map.entities, key=lambda e: e.entity_type != EntityType.ITEM):
+            if visible[entity.y, entity.x]:
+                if entity.entity_type == EntityType.ENEMY and not entity.fighter:
+                    layer[entity.y, entity.x] = CORPSE_CODE
+                else:
+                    layer[entity.y, entity.x] = ENTITY_CODES[entity.entity_type]
+        
+        fighter = self.player.fighter
+        self.observation['stats'][:] = (fighter.hp, fighter.max_hp, self.player.x, self.player.y,
+                                        self.game_world.current_level, fighter.level, fighter.xp, self.turn)
+    
+    def _info(self, killer):
+        return {'seed': self.seed, 'turn': self.turn, 'depth': self.depth, 'killer': killer}
+
+def _env_worker(connection, shm_names, num_envs, index, env_kwargs):
+    """Subprocess loop: run one env whose observations live in slot index of the shared buffers"""
+    blocks = []
+    env = buffers = batch = None
+    try:
+        for name in shm_names:
+            blocks.append(shared_memory.SharedMemory(name=name))
+        buffers = {}
+        for block, (name, (shape, dtype)) in zip(blocks, OBSERVATION_SPEC.items()):
+            batch = np.ndarray((num_envs,) + shape, dtype=dtype, buffer=block.buf)
+            buffers[name] = batch[index]
+        env = CrimsonDepthsEnv(buffers=buffers, **env_kwargs)
+        
+        while True:
+            command, argument = connection.recv()
+            if command == 'reset':
+                _, info = env.reset(argument)
+                connection.send(info)
+            elif command == 'step':
+                _, reward, terminated, truncated, info = env.step(argument)
+                connection.send((reward, terminated, truncated, info))
+            elif command == 'close':
+                env.close()
+                break
+    finally:
+        # Drop every view of the shared memory before unmapping it
+        env = buffers = batch = None
+        for block in blocks:
+            block.close()
+        connection.close()
+
+class VectorEnv:
+    """Steps num_envs games in lockstep with batched observations.
+    
+    Observations are arrays with a leading env axis. With subprocess=True each
+    game runs in its own process and writes straight into shared memory, so
+    only actions, rewards and flags cross the pipes. Finished games are reset
+    automatically with their seed advanced by num_envs; the final info of the
+    finished episode is returned for that step.
+    """
+    def __init__(self, num_envs, subprocess=False, **env_kwargs):
+        self.num_envs = num_envs
+        self.subprocess = subprocess
+        self.seeds = [None] * num_envs
+        self.blocks = []
+        self.workers = []
+        self.connections = []
+        self.envs = []
+        
+        if subprocess:
+            # One shared memory block per observation layer
+            self.observation = {}
+            for name, (shape, dtype) in OBSERVATION_SPEC.items():
+                size = num_envs * int(np.prod(shape)) * np.dtype(dtype).itemsize
+                block = shared_memory.SharedMemory(create=True, size=size)
+                self.blocks.append(block)
+                self.observation[name] = np.ndarray((num_envs,) + shape, dtype=dtype, buffer=block.buf)
+                self.observation[name].fill(0)
+            
+            shm_names = [block.name for block in self.blocks]
+            for index in range(num_envs):
+                parent_end, child_end = multiprocessing.Pipe()
+                worker = multiprocessing.Process(target=_env_worker, args=(child_end, shm_names, num_envs, index, env_kwargs),
+                                                 daemon=True)
+                worker.start()
+                child_end.close()
+                self.workers.append(worker)
+                self.connections.append(parent_end)
+        else:
+            self.observation = allocate_observations((num_envs,))
+            self.envs = [CrimsonDepthsEnv(buffers={name: batch[index] for name, batch in self.observation.items()},
+                                          **env_kwargs)
+                         for index in range(num_envs)]
+    
+    def reset(self, seeds):
+        """Reset every game with its seed and return (observations, infos)"""
+        self.seeds = list(seeds)
+        if self.subprocess:
+            for connection, seed in zip(self.connections, self.seeds):
+                connection.send(('reset', seed))
+            infos = [connection.recv() for connection in self.connections]
+        else:
+            infos = [env.reset(seed)[1] for env, seed in zip(self.envs, self.seeds)]
+        return self.observation, infos
+    
+    def step(self, actions):
+        """Step every game; returns (observations, rewards, terminated, truncated, infos)"""
+        if self.subprocess:
+            for connection, action in zip(self.connections, actions):
+                connection.send(('step', int(action)))
+            results = [connection.recv() for connection in self.connections]
+        else:
+            results = [env.step(int(action))[1:] for env, action in zip(self.envs, actions)]
+        
+        rewards = np.array([result[0] for result in results], dtype=np.float32)
+        terminated = np.array([result[1] for result in results], dtype=bool)
+        truncated = np.array([result[2] for result in results], dtype=bool)
+        infos = [result[3] for result in results]
+        
+        # Start the next episode for every finished game
+        for index in np.nonzero(terminated | truncated)[0]:
+            if self.seeds[index] is not None:
+                self.seeds[index] += self.num_envs
+            if self.subprocess:
+                self.connections[index].send(('reset', self.seeds[index]))
+                self.connections[index].recv()
+            else:
+                self.envs[index].reset(self.seeds[index])
+        
+        return self.observation, rewards, terminated, truncated, infos
+    
+    def close(self):
+        """Stop the workers and free the shared memory"""
+        for env in self.envs:
+            env.close()
+        for connection in self.connections:
+            connection.send(('close', None))
+        for worker in self.workers:
+            worker.join()
+        for connection in self.connections:
+            connection.close()
+        self.observation = None
+        for block in self.blocks:
+            block.unlink()
+            try:
+                block.close()
+            except BufferError:
+                pass  # The caller still holds observation arrays; the mapping goes with them
+        self.blocks = []
+        self.workers = []
+        self.connections = []
@@ -0,0 +1,92 @@
+"""Combat events and the bus they are published on.
+
+Fighters publish what happens in a fight as small event objects instead of
+formatting messages. Anything interested (the message log, statistics, a
+replay recorder) subscribes to the event types it cares about. Publishers
+check `event_type in bus.handlers` first, so an event nobody subscribed to
+is never even built. Each GameWorld has one EventBus, reachable from its
+maps as game_map.events.
+"""
+
+class EventBus:
+    """Calls the handlers subscribed to an event's exact type"""
+    def __init__(self):
+        self.handlers = {}  # Event type -> list of handlers
+    
+    def subscribe(self, event_type, handler):
+        self.handlers.setdefault(event_type, []).append(handler)
+    
+    def unsubscribe(self, event_type, handler):
+        self.handlers[event_type].remove(handler)
+        if not self.handlers[event_type]:
+            del self.handlers[event_type]
+    
+    def publish(self, event):
+        handlers = self.handlers.get(type(event))
+        if handlers:
+            for handler in handlers:
+                handler(event)
+
+class Attack:
+    """attacker swings or shoots at target (published before the hit roll)"""
+    __slots__ = ('attacker', 'target', 'ranged')
+    
+    def __init__(self, attacker, target, ranged=False):
+        self.attacker = attacker
+        self.target = target
+        self.ranged = ranged
+
+class Miss:
+    """target dodged attacker's attack"""
+    __slots__ = ('attacker', 'target', 'ranged')
+    
+    def __init__(self, attacker, target, ranged=False):
+        self.attacker = attacker
+        self.target = target
+        self.ranged = ranged
+
+class Hit:
+    """attacker's attack landed: damage rolled, taken after armor, fatal if it killed.
+    
+    Published once the damage is applied, so name keeps the target's name from
+    before a fatal hit turned it into remains.
+    """
+    __slots__ = ('attacker', 'target', 'name', 'damage', 'taken', 'fatal', 'ranged')
+    
+    def __init__(self, attacker, target, name, damage, taken, fatal, ranged=False):
+        self.attacker = attacker
+        self.target = target
+        self.name = name
+        self.damage = damage
+        self.taken = taken
+        self.fatal = fatal
+        self.ranged = ranged
+
+class Damage:
+    """target lost taken hit points out of amount (source is None for unattributed damage)"""
+    __slots__ = ('target', 'source', 'amount', 'taken', 'fatal')
+    
+    def __init__(self, target, source, amount, taken, fatal):
+        self.target = target
+        self.source = source
+        self.amount = amount
+        self.taken = taken
+        self.fatal = fatal
+
+class Death:
+    """entity, called name, was killed by killer (or None)"""
+    __slots__ = ('entity', 'name', 'killer')
+    
+    def __init__(self, entity, name, killer=None):
+        self.entity = entity
+        self.name = name
+        self.killer = killer
+
+class XPGained:
+    """entity gained amount XP, for killing source if it is the name of a monster"""
+    __slots__ = ('entity', 'amount', 'source')
+    
+    def __init__(self, entity, amount, source=None):
+        self.entity = entity
+        self.amount = amount
+        self.source = source
@@ -0,0 +1,104 @@
+"""Input logs: a game's master seed plus every command the player gave.
+
+A game is fully determined by its master seed and the actions the player
+took, because every random draw comes from the seed's RandomStreams. An
+InputLog stores just that: a small header and one 16-bit action code per
+command. The codes below are shared by main.py, CrimsonDepthsEnv (env.py)
+and game.player.perform_action, which carries them out; replay.py
+re-simulates logs headless.
+
+Interactive play still has commands with no action code: unequipping,
+dropping, buying and selling, and spending attribute points. They are
+logged as UNREPLAYABLE so the log still shows where they happened; a replay
+stops at the first one.
+"""
+import struct
+import sys
+from array import array
+
+# Action codes: 0 waits, 1-8 move or bump-attack, then the stairs and a potion
+ACTION_WAIT = 0
+ACTION_DIRECTIONS = [(0, 0), (0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1)]
+ACTION_DESCEND = 9
+ACTION_HEAL = 10     # Drink the first potion in the pack; takes a turn
+ACTION_ASCEND = 11
+ACTION_PICK_UP = 12  # Pick up what lies on the player's tile without spending a turn
+# Use (quaff, equip or unequip) inventory slot N: ACTION_USE + N
+ACTION_USE = 13
+INVENTORY_SLOTS = 26
+# Fire the ranged weapon at the tile (dx, dy) from the player: see fire_action
+ACTION_FIRE = ACTION_USE + INVENTORY_SLOTS
+FIRE_RANGE = 10  # Longest range of any ranged weapon (data/items.py)
+FIRE_SPAN = 2 * FIRE_RANGE + 1
+NUM_ACTIONS = ACTION_FIRE + FIRE_SPAN * FIRE_SPAN
+
+# File header: magic, format version, seed, max depth, max turns
+LOG_MAGIC = b'CDRL'
+LOG_VERSION = 2  # Version 1 stored one byte per action
+LOG_HEADER = struct.Struct('<4sHqHI')
+
+UNREPLAYABLE = 0xFFFF  # A command with no action code
+
+def use_action(slot):
+    """Action code for using inventory slot slot"""
+    return ACTION_USE + slot
+
+def fire_action(dx, dy):
+    """Action code for firing at the tile (dx, dy) from the player, or None beyond FIRE_RANGE"""
+    if max(abs(dx), abs(dy)) > FIRE_RANGE:
+        return None
+    return ACTION_FIRE + (dy + FIRE_RANGE) * FIRE_SPAN + dx + FIRE_RANGE
+
+def fire_offset(action):
+    """The (dx, dy) target offset of a fire action code"""
+    row, column = divmod(action - ACTION_FIRE, FIRE_SPAN)
+    return column - FIRE_RANGE, row - FIRE_RANGE
+
+class InputLog:
+    """Master seed plus the player's actions, one 16-bit code each"""
+    def __init__(self, seed, max_depth=20, max_turns=20000, actions=()):
+        self.seed = seed
+        self.max_depth = max_depth
+        self.max_turns = max_turns
+        self.actions = array('H', actions)
+    
+    def record(self, action):
+        self.actions.append(action)
+    
+    def replayable_length(self):
+        """Number of actions before the first UNREPLAYABLE one"""
+        try:
+            return self.actions.index(UNREPLAYABLE)
+        except ValueError:
+            return len(self.actions)
+    
+    def to_bytes(self):
+        header = LOG_HEADER.pack(LOG_MAGIC, LOG_VERSION, self.seed, self.max_depth, self.max_turns)
+        actions = array('H', self.actions)
+        if sys.byteorder == 'big':
+            actions.byteswap()  # Codes are stored little-endian
+        return header + actions.tobytes()
+    
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, seed, max_depth, max_turns = LOG_HEADER.unpack_from(data)
+        if magic != LOG_MAGIC or version not in (1, LOG_VERSION):
+            raise ValueError("Not a Crimson Depths input log (or an unsupported version)")
+        body = data[LOG_HEADER.size:]
+        if version == 1:
+            # One byte per action, with 0xFF for unreplayable commands
+            return cls(seed, max_depth, max_turns, (UNREPLAYABLE if code == 0xFF else code for code in body))
+        actions = array('H')
+        actions.frombytes(body)
+        if sys.byteorder == 'big':
+            actions.byteswap()
+        return cls(seed, max_depth, max_turns, actions)
+    
+    def save(self, path):
+        with open(path, 'wb') as log_file:
+            log_file.write(self.to_bytes())
+    
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as log_file:
+            return cls.from_bytes(log_file.read())
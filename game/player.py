@@ -0,0 +1,166 @@
+"""Player setup and the player's commands, shared by main.py and the headless runners (sim.py, env.py)."""
+from config import EntityType, ItemType, EquipmentSlot, WHITE, LIGHT_BLUE, YELLOW, RED
+from entities.entity import Entity
+from entities.components.fighter import Fighter
+from entities.inventory import Inventory
+from game.rng import STREAM_COMBAT
+from game.input_log import (ACTION_WAIT, ACTION_DIRECTIONS, ACTION_DESCEND, ACTION_HEAL, ACTION_ASCEND,
+                            ACTION_PICK_UP, ACTION_USE, ACTION_FIRE, NUM_ACTIONS, fire_offset)
+from data.items import create_item
+
+def create_player(game_world, game_map, message_log):
+    """Create the player with the same stats and starting kit as a new game in main"""
+    fighter_component = Fighter(hp=8, armor=2, damage_dice=(1, 3), rng=game_world.rng.get(STREAM_COMBAT))
+    player = Entity(0, 0, '@', WHITE, EntityType.PLAYER, 'Player', blocks=True,
+                    fighter=fighter_component, inventory=Inventory(), silver_pieces=50)
+    
+    # Start in the town near the dungeon stairs
+    player.x = game_map.down_stairs_position[0]
+    player.y = game_map.down_stairs_position[1] - 2
+    
+    # Starting equipment (shortbow and arrows)
+    shortbow = create_item('shortbow', player.x, player.y)
+    player.inventory.add_item(shortbow, message_log)
+    player.inventory.equip_item(shortbow, EquipmentSlot.RIGHT_HAND, message_log, game_map)
+    arrows = create_item('arrows', player.x, player.y)
+    player.inventory.add_item(arrows, message_log)
+    player.inventory.equip_item(arrows, EquipmentSlot.LEFT_HAND, message_log, game_map)
+    return player
+
+# Shop prices for unpaid items that don't have one
+DEFAULT_PRICES = {ItemType.WEAPON: 15, ItemType.RANGED_WEAPON: 15, ItemType.ARMOR: 25, ItemType.CONSUMABLE: 20}
+
+def pick_up_items(player, game_map, message_log):
+    """Pick up every item on the player's tile.
+    
+    Items inside a shop become unpaid and send the shopkeeper to block the
+    door. Paid gear is equipped at once if its slot is empty.
+    """
+    for entity in list(game_map.get_entities_at(player.x, player.y)):
+        if entity.entity_type != EntityType.ITEM or not entity.item:
+            continue
+        
+        # Check if we're picking up an unpaid item from a shop
+        for shopkeeper in game_map.entities:
+            if (shopkeeper.entity_type == EntityType.ENEMY and 
+                shopkeeper.ai and hasattr(shopkeeper.ai, 'shop_area')):
+                x1, y1, x2, y2 = shopkeeper.ai.shop_area
+                if x1 <= entity.x <= x2 and y1 <= entity.y <= y2:
+                    if not entity.item.unpaid:
+                        entity.item.unpaid = True
+                        if entity.item.price == 0:
+                            entity.item.price = DEFAULT_PRICES.get(entity.item.item_type, 10)
+                    
+                    # Make the shopkeeper move to block the exit
+                    shopkeeper.force_move(shopkeeper.ai.door_x, shopkeeper.ai.door_y, game_map)
+                    shopkeeper.ai.is_in_doorway = True
+                    message_log.add_message(f"The {shopkeeper.name} moves to block the exit.", LIGHT_BLUE)
+                    break
+        
+        if player.inventory.add_item(entity, message_log):
+            game_map.remove_entity(entity)
+            
+            # Auto-equip paid gear into an empty slot
+            if entity.item.equippable and not entity.item.unpaid:
+                slot = entity.item.get_slot()
+                if slot is not None and player.inventory.get_equipped_item(slot) is None:
+                    player.inventory.equip_item(entity, slot, message_log, game_map)
+
+def fire_at(player, game_map, target_x, target_y, message_log):
+    """Shoot the equipped ranged weapon at a tile.
+    
+    Returns None if the shot can't be taken, False if it hit a corpse (the
+    arrow is lost but not the turn) and True otherwise.
+    """
+    ranged_weapon = player.inventory.get_equipped_ranged_weapon()
+    if not ranged_weapon:
+        message_log.add_message("You need to equip a ranged weapon first!", YELLOW)
+        return None
+    if not player.inventory.has_ammo_for_weapon():
+        message_log.add_message("You need to equip arrows to use your bow!", YELLOW)
+        return None
+    if (target_x, target_y) == (player.x, player.y):
+        message_log.add_message("You can't target yourself!", YELLOW)
+        return None
+    
+    weapon_range = ranged_weapon.item.weapon_data.range
+    if max(abs(target_x - player.x), abs(target_y - player.y)) > weapon_range:
+        message_log.add_message(f"Target is out of range! Maximum range is {weapon_range} tiles.", YELLOW)
+        return None
+    if not (0 <= target_x < game_map.width and 0 <= target_y < game_map.height) or \
+            not game_map.visible[target_y][target_x]:
+        message_log.add_message("You can't see that target!", YELLOW)
+        return None
+    
+    # A living monster first, then a corpse
+    enemies = [entity for entity in game_map.get_entities_at(target_x, target_y)
+               if entity.entity_type == EntityType.ENEMY]
+    living = [entity for entity in enemies if entity.char != '%' and entity.fighter]
+    target = living[0] if living else (enemies[0] if enemies else None)
+    
+    # Firing uses up an arrow even if nothing is there
+    player.inventory.use_ammo()
+    if target is None:
+        message_log.add_message("There's no enemy at that location!", YELLOW)
+    elif not target.fighter:
+        message_log.add_message(f"The {target.name} is already dead!", RED)
+        return False
+    else:
+        # Roll to hit and for damage; the message log reports the outcome
+        player.fighter.shoot(target, ranged_weapon.item.damage_dice, message_log, game_map)
+    return True
+
+def perform_action(game_world, player, action, message_log):
+    """Carry out one player command given as an action code (see game/input_log.py).
+    
+    Returns None if the command can't be carried out (nothing changed),
+    otherwise whether it took a turn; the caller then lets the monsters
+    act with game_world.advance_turn. Main and the env both play every
+    logged command through here, so a replayed log takes the same path.
+    """
+    game_map, _ = game_world.levels[game_world.current_level]
+    
+    if action == ACTION_WAIT:
+        message_log.add_message("You wait...", LIGHT_BLUE)
+        return True
+    elif action < len(ACTION_DIRECTIONS):
+        dx, dy = ACTION_DIRECTIONS[action]
+        result = player.move(dx, dy, game_map, message_log)
+        if result and isinstance(result, str):
+            message_log.add_message(result)
+        pick_up_items(player, game_map, message_log)
+        return True
+    elif action in (ACTION_DESCEND, ACTION_ASCEND):
+        down = action == ACTION_DESCEND
+        direction = "down" if down else "up"
+        stairs = game_map.down_stairs_position if down else game_map.up_stairs_position
+        if not stairs or (player.x, player.y) != tuple(stairs):
+            message_log.add_message(f"There are no stairs {direction} here.", YELLOW)
+            return None
+        if not (game_world.go_down_stairs(player) if down else game_world.go_up_stairs(player)):
+            message_log.add_message(f"You can't go {direction} here.", YELLOW)
+            return None
+        message_log.add_message("You descend deeper into the dungeon." if down else "You climb up the stairs.",
+                                LIGHT_BLUE)
+        return False  # Changing level doesn't cost a turn
+    elif action == ACTION_HEAL:
+        potion = player.inventory.find_item_by_type(ItemType.CONSUMABLE)
+        if potion and potion.item and potion.item.use_function:
+            potion.item.use(player, message_log, game_map)
+        return True
+    elif action == ACTION_PICK_UP:
+        if not any(entity.entity_type == EntityType.ITEM and entity.item
+                   for entity in game_map.get_entities_at(player.x, player.y)):
+            return None
+        pick_up_items(player, game_map, message_log)
+        return False
+    elif action < ACTION_FIRE:
+        slot = action - ACTION_USE
+        if slot >= len(player.inventory.items) or not player.inventory.items[slot].item:
+            return None
+        player.inventory.items[slot].item.use(player, message_log, game_map)
+        return False
+    elif action < NUM_ACTIONS:
+        dx, dy = fire_offset(action)
+        return fire_at(player, game_map, player.x + dx, player.y + dy, message_log)
+    raise ValueError(f"Invalid action: {action}")
@@ -0,0 +1,229 @@
+import zlib
+import numpy as np
+from config import EntityType, ItemType, EquipmentSlot, TILE_WALKABLE, TILE_TRANSPARENT
+from entities.entity import Entity
+from entities.components.fighter import Fighter
+from entities.components.ai import BasicMonster, ShopkeeperAI
+from entities.components.item import Item, heal_player
+from entities.inventory import Inventory
+from entities.monster_store import StoredMonster
+from data.items import WEAPONS, AmmoData
+from data.monsters import get_monster_template
+
+# Item use functions are recorded by name
+USE_FUNCTIONS = {'heal_player': heal_player}
+
+# Records are plain tuples, lists, numbers, strings and bytes, so they can be
+# pickled, compared and kept around without holding on to game objects.
+#
+# A level is fully determined by the world seed and its number, so a level
+# is recorded as a delta against what build_level regenerates: the explored
+# mask, the tiles that differ and the level's entities in order. An entity
+# the level was generated with is referred to by its index in
+# GameWorld.spawned and only carries a full record if it has changed;
+# anything killed or picked up is simply left out. Which monsters are
+# dormant (see game/scheduler.py) is recorded too, since awake monsters
+# hunt the player and dormant ones don't.
+
+def stream_keys(streams):
+    """Map id(stream) -> (subsystem, level) for a RandomStreams, so fighters can record their stream"""
+    return {id(stream): key for key, stream in streams.streams.items()}
+
+def streams_record(streams):
+    """Record the state of every stream in a RandomStreams that has been drawn from"""
+    records = []
+    for (subsystem, level), stream in streams.streams.items():
+        state = stream.getstate()
+        # Streams nobody has used yet are recreated on demand from the seed
+        if state != streams.spawn(subsystem, level).getstate():
+            version, internal, gauss_next = state
+            records.append(((subsystem, level), version, np.array(internal, dtype=np.uint32).tobytes(), gauss_next))
+    return records
+
+def restore_streams(streams, records):
+    for key, version, internal, gauss_next in records:
+        internal = tuple(int(word) for word in np.frombuffer(internal, dtype=np.uint32))
+        streams.get(*key).setstate((version, internal, gauss_next))
+
+def level_delta(game_world, level_number, keys=None):
+    """Record how a stored level differs from its freshly generated baseline"""
+    if keys is None:
+        keys = stream_keys(game_world.rng)
+    game_map, _ = game_world.levels[level_number]
+    baseline_map, baseline_entities = game_world.build_level(level_number)
+    spawn_indices = {id(entity): index for index, entity in enumerate(game_world.spawned.get(level_number, ()))}
+    
+    # (spawn index or None, record or None) for each entity, in list order
+    entries = []
+    sleeping = []  # Positions in entries of the dormant monsters
+    scheduler = game_map.scheduler
+    for entity in game_map.entities:
+        if entity.entity_type == EntityType.PLAYER:
+            continue
+        record = entity_record(entity, keys)
+        index = spawn_indices.get(id(entity))
+        if index is not None and record == entity_record(baseline_entities[index], keys):
+            record = None  # Untouched since generation
+        if entity in scheduler.sleeping:
+            sleeping.append(len(entries))
+        entries.append((index, record))
+    # The room the player was last seen in, so it isn't entered again on restore
+    room = game_map.rooms.index(scheduler.room) if scheduler.room is not None else None
+    
+    changed = np.flatnonzero(game_map.tiles != baseline_map.tiles)
+    tile_changes = (changed.astype(np.uint32).tobytes(), game_map.tiles.flat[changed].tobytes())
+    explored = zlib.compress(np.packbits(game_map.explored).tobytes())
+    return (level_number, explored, tile_changes, entries, (sleeping, room))
+
+def restore_level(game_world, delta):
+    """Regenerate a level, apply its delta and store it in game_world; returns (game_map, entities)"""
+    level_number, explored, (positions, values), entries, (sleeping, room) = delta
+    game_map, baseline_entities = game_world.build_level(level_number)
+    
+    if positions:
+        game_map.tiles.flat[np.frombuffer(positions, dtype=np.uint32)] = np.frombuffer(values, dtype=np.uint8)
+        game_map.walkable = TILE_WALKABLE[game_map.tiles]
+        game_map.transparent = TILE_TRANSPARENT[game_map.tiles]
+        game_map.mark_tiles_changed()
+    
+    explored = np.unpackbits(np.frombuffer(zlib.decompress(explored), dtype=np.uint8), count=game_map.explored.size)
+    game_map.explored[:] = explored.reshape(game_map.explored.shape)
+    
+    # Changed entities are rebuilt from their records but keep their spawn index
+    spawned = list(baseline_entities)
+    entities = []
+    for index, record in entries:
+        if record is None:
+            entity = baseline_entities[index]
+        else:
+            entity = restore_entity(record, game_world.rng, game_map.monsters)
+            if index is not None:
+                spawned[index] = entity
+        entities.append(entity)
+    
+    # Free the store rows of generated monsters that were replaced or are gone
+    kept = {index for index, record in entries if record is None}
+    for index, entity in enumerate(baseline_entities):
+        if index not in kept and isinstance(entity, StoredMonster):
+            game_map.monsters.release(entity)
+    
+    game_map.entities = entities
+    for position in sleeping:
+        game_map.scheduler.sleep(entities[position])
+    game_map.scheduler.room = game_map.rooms[room] if room is not None else None
+    game_world.levels[level_number] = (game_map, entities)
+    game_world.spawned[level_number] = spawned
+    return game_map, entities
+
+def entity_record(entity, keys):
+    fighter = entity.fighter
+    if fighter:
+        fighter_record = (fighter.max_hp, fighter.hp, fighter.armor, fighter.dodge, fighter.damage_dice,
+                          fighter.str, fighter.int, fighter.wis, fighter.dex, fighter.con, fighter.cha,
+                          fighter.max_mp, fighter.mp, fighter.attr_points, fighter.xp, fighter.level,
+                          fighter.attack_bonus, keys.get(id(fighter.rng)))
+    else:
+        fighter_record = None
+    
+    ai = entity.ai
+    if isinstance(ai, ShopkeeperAI):
+        ai_record = ('shop', ai.shop_type, ai.door_x, ai.door_y, ai.shop_area, ai.blocking_door, ai.is_in_doorway)
+    elif isinstance(ai, BasicMonster):
+        ai_record = ('basic',)
+    else:
+        ai_record = None
+    
+    item = entity.item
+    if item:
+        use_function = next((name for name, function in USE_FUNCTIONS.items() if function is item.use_function), None)
+        # Matched by name, as unpickled items hold copies of the WEAPONS entries
+        weapon = next((key for key, weapon in WEAPONS.items()
+                       if item.weapon_data is not None and weapon.name == item.weapon_data.name), None)
+        ammo = item.ammo_data
+        ammo_record = (ammo.name, ammo.ammo_type, ammo.capacity, ammo.current) if ammo else None
+        item_record = (use_function, item.item_type.value if item.item_type else None, item.equippable,
+                       item.armor_bonus, item.dodge_bonus, item.damage_dice, weapon, ammo_record,
+                       item.price, item.unpaid)
+    else:
+        item_record = None
+    
+    inventory = entity.inventory
+    if inventory:
+        # Equipped items may also sit in items, or fill two slots; store each once
+        owned = []
+        def index_of(owned_entity):
+            for index, other in enumerate(owned):
+                if other is owned_entity:
+                    return index
+            owned.append(owned_entity)
+            return len(owned) - 1
+        items = [index_of(owned_entity) for owned_entity in inventory.items]
+        equipment = [(slot.value, index_of(owned_entity)) for slot, owned_entity in inventory.equipment.items()
+                     if owned_entity is not None]
+        inventory_record = (inventory.capacity, [entity_record(e, keys) for e in owned], items, equipment)
+    else:
+        inventory_record = None
+    
+    # Monster templates are recorded by their MONSTERS key
+    monster_key = entity.monster_data.char if entity.monster_data else None
+    
+    return (entity.x, entity.y, entity.char, entity.color, entity.entity_type.value, entity.name,
+            entity.blocks, entity.silver_pieces, fighter_record, ai_record, item_record, inventory_record,
+            monster_key)
+
+def restore_entity(record, streams, monster_store=None):
+    (x, y, char, color, entity_type, name, blocks, silver_pieces,
+     fighter_record, ai_record, item_record, inventory_record, monster_key) = record
+    
+    fighter = None
+    if fighter_record:
+        (max_hp, hp, armor, dodge, damage_dice, strength, intelligence, wisdom, dexterity, constitution,
+         charisma, max_mp, mp, attr_points, xp, level, attack_bonus, stream_key) = fighter_record
+        # Passing the recorded stats skips the roll, which would draw from a random stream
+        fighter = Fighter(hp=max_hp, armor=armor, damage_dice=damage_dice,
+                          stats=(strength, intelligence, wisdom, dexterity, constitution, charisma))
+        fighter.hp, fighter.dodge = hp, dodge
+        fighter.max_mp, fighter.mp, fighter.attr_points = max_mp, mp, attr_points
+        fighter.xp, fighter.level, fighter.attack_bonus = xp, level, attack_bonus
+        if stream_key is not None:
+            fighter.rng = streams.get(*stream_key)
+    
+    ai = None
+    if ai_record and ai_record[0] == 'shop':
+        _, shop_type, door_x, door_y, shop_area, blocking_door, is_in_doorway = ai_record
+        ai = ShopkeeperAI(shop_type, door_x, door_y, shop_area)
+        ai.blocking_door, ai.is_in_doorway = blocking_door, is_in_doorway
+    elif ai_record:
+        ai = BasicMonster()
+    
+    item = None
+    if item_record:
+        (use_function, item_type, equippable, armor_bonus, dodge_bonus, damage_dice,
+         weapon, ammo_record, price, unpaid) = item_record
+        ammo = None
+        if ammo_record:
+            ammo_name, ammo_type, capacity, current = ammo_record
+            ammo = AmmoData(ammo_name, ammo_type, capacity)
+            ammo.current = current
+        item = Item(use_function=USE_FUNCTIONS.get(use_function),
+                    item_type=ItemType(item_type) if item_type is not None else None,
+                    equippable=equippable, armor_bonus=armor_bonus, dodge_bonus=dodge_bonus,
+                    damage_dice=damage_dice, weapon_data=WEAPONS.get(weapon), ammo_data=ammo)
+        item.price, item.unpaid = price, unpaid
+    
+    inventory = None
+    if inventory_record:
+        capacity, owned, items, equipment = inventory_record
+        owned = [restore_entity(owned_record, streams) for owned_record in owned]
+        inventory = Inventory(capacity)
+        inventory.items = [owned[index] for index in items]
+        for slot, index in equipment:
+            inventory.equipment[EquipmentSlot(slot)] = owned[index]
+    
+    entity = Entity(x, y, char, color, EntityType(entity_type), name, blocks=blocks, fighter=fighter,
+                    ai=ai, item=item, inventory=inventory, silver_pieces=silver_pieces,
+                    monster_data=get_monster_template(monster_key) if monster_key is not None else None)
+    if monster_store is not None and fighter and isinstance(ai, BasicMonster):
+        # Living monsters on a store-backed level go back into the store
+        return monster_store.add(entity)
+    return entity
@@ -0,0 +1,30 @@
+import random
+
+# Stream names for the subsystems that draw random numbers
+STREAM_MAPGEN = 'mapgen'   # Level layout, stairs and entity placement
+STREAM_COMBAT = 'combat'   # Hit, damage and level-up rolls
+
+class RandomStreams:
+    """Independent random.Random streams derived from a single game seed.
+    
+    Every (subsystem, level) pair gets its own generator seeded from the game
+    seed and the pair's name, so draws in one subsystem never shift another's
+    and a level can be generated on any thread with the same result.
+    """
+    def __init__(self, seed):
+        self.seed = seed
+        self.streams = {}
+    
+    def get(self, subsystem, level=None):
+        """Return the shared stream for (subsystem, level), creating it on first use"""
+        key = (subsystem, level)
+        stream = self.streams.get(key)
+        if stream is None:
+            # setdefault keeps one stream per key if two threads race here
+            stream = self.streams.setdefault(key, self.spawn(subsystem, level))
+        return stream
+    
+    def spawn(self, subsystem, level=None):
+        """Return a fresh generator for (subsystem, level), not shared with get()"""
+        # String seeds are hashed with SHA-512, so streams are stable across runs
+        return random.Random(f"{self.seed}:{subsystem}:{level}")
@@ -0,0 +1,96 @@
+import os
+import pickle
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from ui.message_log import MessageLog
+from game.world import GameWorld
+from game.input_log import InputLog
+from game.records import (stream_keys, streams_record, restore_streams, level_delta, restore_level,
+                          entity_record, restore_entity)
+
+# File header: magic and format version, followed by one pickled record tree
+SAVE_MAGIC = b'CDSV'
+SAVE_VERSION = 6
+SAVE_HEADER = struct.Struct('<4sH')
+
+# Saves are a tree of plain records (see game/records.py): the player in
+# full, the random streams that have been drawn from and every level as a
+# delta against its regenerated baseline. Nothing in
+# it references game objects, so building it is the only step that touches
+# live state and the rest can run on another thread.
+
+def snapshot_game(game_world, player, message_log):
+    """Copy everything needed to restore the game into a plain record tree"""
+    # Fighters point at one of the world's random streams; record which
+    keys = stream_keys(game_world.rng)
+    streams = streams_record(game_world.rng)
+    levels = [level_delta(game_world, level_number, keys) for level_number in game_world.levels]
+    levels += [game_world.get_evicted_delta(level_number) for level_number in game_world.evicted]
+    messages = [(message.text, message.color) for message in message_log.messages]
+    input_log = game_world.input_log.to_bytes() if game_world.input_log is not None else None
+    return (game_world.seed, game_world.max_levels, game_world.monster_store, game_world.current_level,
+            streams, levels, entity_record(player, keys), messages, input_log)
+
+def restore_game(snapshot):
+    """Rebuild (game_world, player, message_log) from snapshot_game's records"""
+    seed, max_levels, monster_store, current_level, streams, levels, player_record, messages, input_log = snapshot
+    
+    game_world = GameWorld(max_levels=max_levels, seed=seed, monster_store=monster_store)
+    game_world.current_level = current_level
+    if input_log is not None:
+        game_world.input_log = InputLog.from_bytes(input_log)
+    restore_streams(game_world.rng, streams)
+    
+    for delta in levels:
+        if delta[0] == current_level:
+            restore_level(game_world, delta)
+        else:
+            # Other levels start out evicted and are restored when revisited
+            game_world.set_evicted_delta(delta)
+    
+    player = restore_entity(player_record, game_world.rng)
+    game_world.attach_player(player)
+    message_log = MessageLog()
+    for text, color in messages:
+        message_log.add_message(text, color)
+    return game_world, player, message_log
+
+def write_snapshot(path, snapshot):
+    """Write a snapshot to path atomically (a crash never leaves half a save)"""
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as save_file:
+        save_file.write(SAVE_HEADER.pack(SAVE_MAGIC, SAVE_VERSION))
+        pickle.dump(snapshot, save_file, pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, path)
+
+def read_snapshot(path):
+    with open(path, 'rb') as save_file:
+        magic, version = SAVE_HEADER.unpack(save_file.read(SAVE_HEADER.size))
+        if magic != SAVE_MAGIC or version != SAVE_VERSION:
+            raise ValueError("Not a Crimson Depths save (or an unsupported version)")
+        return pickle.load(save_file)
+
+def save_game(path, game_world, player, message_log):
+    """Save the game to path"""
+    write_snapshot(path, snapshot_game(game_world, player, message_log))
+
+def load_game(path):
+    """Load a game saved by save_game; returns (game_world, player, message_log)"""
+    return restore_game(read_snapshot(path))
+
+class Autosaver:
+    """Saves in the background: snapshot on the caller's thread, write on a worker"""
+    def __init__(self, path):
+        self.path = path
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="autosave")
+        self.pending = None
+    
+    def save(self, game_world, player, message_log):
+        snapshot = snapshot_game(game_world, player, message_log)
+        self.pending = self.writer.submit(write_snapshot, self.path, snapshot)
+    
+    def wait(self):
+        """Block until the last autosave is on disk"""
+        if self.pending is not None:
+            self.pending.result()
+            self.pending = None
@@ -0,0 +1,190 @@
+"""Turn scheduling.
+
+Every active actor (an entity with an AI) waits in a heap keyed by the game
+time of its next turn. A turn takes TURN_TIME * NORMAL_SPEED // speed time
+units, so a speed 20 monster acts twice for each of a normal player's turns.
+The player is not in the heap: after each player action advance() runs
+everything due before the player's next turn. Entries are dropped lazily, so
+an actor that dies, leaves the level or falls asleep costs nothing until its
+old entry comes up, and items, corpses and sleepers are never visited at all.
+
+Awake monsters hunt the player even out of view, walking the level's
+distance field. An actor that ends its turn out of view, further than
+wake_radius from the player and more than track_radius steps away has lost
+track of them and goes dormant. Dormant actors are woken when their tile
+comes into view (wake_in_view, run by every FOV recompute), when the player
+comes within wake_radius or enters their room, and by noise (wake_within);
+a woken actor then comes after the player. Per-turn cost therefore follows
+the monsters near the player, not the level's population.
+
+Each Map has its own scheduler (game_map.scheduler), kept in step with its
+entity list.
+"""
+import heapq
+from config import NORMAL_SPEED, WAKE_RADIUS, TRACK_RADIUS
+
+TURN_TIME = 100  # Time a normal-speed action takes
+
+class TurnScheduler:
+    """A level's actors and delayed actions, ordered by the time they are due.
+    
+    Actors due at the same time act in the order they were added, however
+    often they have slept and woken since.
+    """
+    def __init__(self, actors=(), wake_radius=WAKE_RADIUS, track_radius=TRACK_RADIUS):
+        self.time = 0  # Current game time
+        self.player_time = 0  # Time of the player's next turn
+        self.queue = []  # Heap of (time, order, sequence, actor, action)
+        self.sequence = 0  # Numbers every entry; also the order of delayed actions
+        self.order = {}  # Actor -> sequence number when it was added
+        self.scheduled = {}  # Actor -> its live queue entry
+        self.sleeping = {}  # Sleeping actor -> earliest time of its next turn
+        self.speeds = {}  # Actor -> speed, for actors not moving at their template's speed
+        self.wake_radius = wake_radius
+        self.track_radius = track_radius
+        self.room = None  # Room the player was last seen in
+        for actor in actors:
+            self.add(actor)
+    
+    def _push(self, time, order, actor, action):
+        self.sequence += 1
+        entry = (time, self.sequence if order is None else order, self.sequence, actor, action)
+        heapq.heappush(self.queue, entry)
+        return entry
+    
+    def _schedule_actor(self, actor, time):
+        self.scheduled[actor] = self._push(time, self.order.setdefault(actor, self.sequence + 1), actor, None)
+    
+    def add(self, actor, delay=0):
+        """Give actor a turn delay time units from now; entities without an AI are ignored"""
+        if actor.ai is not None:
+            self._schedule_actor(actor, self.time + delay)
+    
+    def remove(self, actor):
+        """Forget actor (it left the level)"""
+        self.scheduled.pop(actor, None)
+        self.order.pop(actor, None)
+        self.sleeping.pop(actor, None)
+        self.speeds.pop(actor, None)
+    
+    def sleep(self, actor):
+        """Stop giving actor turns until it is woken"""
+        entry = self.scheduled.pop(actor, None)
+        if entry is not None:
+            self.sleeping[actor] = entry[0]
+    
+    def wake(self, actor, delay=0):
+        """Give a sleeping actor its turns back, the first delay time units from now.
+        
+        Sleeping never speeds an actor up: it doesn't act again before its
+        next turn was due when it fell asleep.
+        """
+        if actor in self.sleeping:
+            self._schedule_actor(actor, max(self.time + delay, self.sleeping.pop(actor)))
+    
+    def wake_in_rect(self, game_map, x1, y1, x2, y2):
+        """Wake every sleeper inside the inclusive rectangle"""
+        sleeping = self.sleeping
+        if not sleeping:
+            return
+        if len(sleeping) < (x2 - x1 + 1) * (y2 - y1 + 1):
+            # Fewer sleepers than tiles: test each sleeper
+            woken = [actor for actor in sleeping if x1 <= actor.x <= x2 and y1 <= actor.y <= y2]
+        else:
+            buckets = game_map.entity_buckets
+            woken = [entity for y in range(y1, y2 + 1) for x in range(x1, x2 + 1)
+                     for entity in buckets.get((x, y), ()) if entity in sleeping]
+        for actor in woken:
+            self.wake(actor)
+    
+    def wake_within(self, game_map, x, y, radius):
+        """Wake every sleeper within radius steps (8-way) of (x, y), e.g. in earshot of a noise"""
+        self.wake_in_rect(game_map, x - radius, y - radius, x + radius, y + radius)
+    
+    def wake_in_view(self, game_map, x, y):
+        """Wake the sleepers the player at (x, y) can now see, is near or shares a new room with.
+        
+        Called after every FOV recompute, with game_map.newly_visible holding
+        the tiles that came into view.
+        """
+        sleeping = self.sleeping
+        if sleeping:
+            newly_visible = game_map.newly_visible
+            if len(sleeping) < len(newly_visible):
+                woken = [actor for actor in sleeping if game_map.visible[actor.y, actor.x]]
+            else:
+                buckets = game_map.entity_buckets
+                woken = [entity for tile in newly_visible for entity in buckets.get(tile, ()) if entity in sleeping]
+            for actor in woken:
+                self.wake(actor)
+            self.wake_within(game_map, x, y, self.wake_radius)
+        
+        # Entering a room wakes everything in it, seen or not
+        room = next((room for room in game_map.rooms if room.x1 < x < room.x2 and room.y1 < y < room.y2), None)
+        if room is not self.room:
+            self.room = room
+            if room is not None:
+                self.wake_in_rect(game_map, room.x1 + 1, room.y1 + 1, room.x2 - 1, room.y2 - 1)
+    
+    def schedule(self, delay, action):
+        """Call action() once, delay time units from now"""
+        self._push(self.time + delay, None, None, action)
+    
+    def get_speed(self, actor):
+        if actor in self.speeds:
+            return self.speeds[actor]
+        if actor.monster_data is not None:
+            return actor.monster_data.speed
+        return NORMAL_SPEED
+    
+    def set_speed(self, actor, speed):
+        """Change actor's speed (hasted, slowed) from its next turn on"""
+        self.speeds[actor] = speed
+    
+    def turn_time(self, actor):
+        return TURN_TIME * NORMAL_SPEED // self.get_speed(actor)
+    
+    def advance(self, player, game_map, message_log, delay=TURN_TIME):
+        """The player has acted, taking delay time: run every turn and action due before their next turn.
+        
+        Stops early if the player dies; returns the actor whose turn killed
+        them, or None.
+        """
+        self.player_time += delay
+        queue = self.queue
+        scheduled = self.scheduled
+        visible = game_map.visible
+        while queue and queue[0][0] < self.player_time:
+            entry = heapq.heappop(queue)
+            time, order, _, actor, action = entry
+            self.time = time
+            if action is not None:
+                action()
+                if player.fighter.hp <= 0:
+                    return None
+                continue
+            
+            if scheduled.get(actor) is not entry:
+                # Stale entry: removed, put to sleep or rescheduled since
+                continue
+            if actor.ai is None:
+                # Died since its last turn
+                del scheduled[actor]
+                continue
+            
+            actor.ai.take_turn(player, game_map, message_log)
+            if scheduled.get(actor) is entry:
+                next_time = time + self.turn_time(actor)
+                if (not visible[actor.y, actor.x] and
+                        max(abs(actor.x - player.x), abs(actor.y - player.y)) > self.wake_radius and
+                        game_map.get_distance_field(player.x, player.y)[actor.y, actor.x] > self.track_radius):
+                    # Lost track of the player: nothing to do until woken
+                    del scheduled[actor]
+                    self.sleeping[actor] = next_time
+                else:
+                    scheduled[actor] = self._push(next_time, order, actor, None)
+            if player.fighter.hp <= 0:
+                return actor
+        
+        self.time = self.player_time
+        return None
@@ -1,79 +1,217 @@
+import pickle
 import random
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from map.map import Map
-from config import MAP_WIDTH, MAP_HEIGHT, MAX_ENEMIES_PER_ROOM, MAX_ITEMS_PER_ROOM, TileType, EntityType
+from config import MAP_WIDTH, MAP_HEIGHT, MAX_ENEMIES_PER_ROOM, MAX_ITEMS_PER_ROOM, MAX_RESIDENT_LEVELS, NOISE_RADIUS, TileType
 from data.items import place_entities
 from map.town import generate_town_map
+from game.rng import RandomStreams, STREAM_MAPGEN, STREAM_COMBAT
+from game.records import level_delta, restore_level
+from game.events import EventBus, Attack
+from game.scheduler import TURN_TIME
+from entities.monster_store import MonsterStore
 
 class GameWorld:
-    def __init__(self, max_levels=20):
+    def __init__(self, max_levels=20, seed=None, max_resident_levels=MAX_RESIDENT_LEVELS, monster_store=False):
         self.max_levels = max_levels
+        # Keep each dungeon level's monsters in a columnar MonsterStore
+        self.monster_store = monster_store
+        # Levels in memory as (game_map, entities), least recently used first
         self.levels = {}
+        # Levels evicted beyond max_resident_levels, as zlib-compressed level deltas
+        self.evicted = {}
+        self.max_resident_levels = max_resident_levels
+        # Entities each level was generated with, in generation order; level
+        # deltas (see game/records.py) describe changes against these
+        self.spawned = {}
         self.current_level = 0  # Start in town (level 0)
-        # Set a single seed for the entire dungeon
-        self.seed = random.randint(0, 1000000)
+        # Set a single seed for the entire dungeon; every random stream derives from it
+        self.seed = random.randint(0, 1000000) if seed is None else seed
+        self.rng = RandomStreams(self.seed)
+        # InputLog of the player's commands when a person is playing (see main.py)
+        self.input_log = None
+        # Combat events from every level are published here
+        self.events = EventBus()
+        self.events.subscribe(Attack, self.hear_fighting)
+        # Levels being generated in the background, keyed by level number
+        self.generator = ThreadPoolExecutor(max_workers=1, thread_name_prefix="levelgen")
+        self.pending_levels = {}
+    
+    def __getstate__(self):
+        # The worker thread and its pending levels can't be pickled; levels
+        # still being generated are simply rebuilt from the seed when needed
+        state = self.__dict__.copy()
+        del state['generator'], state['pending_levels']
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.generator = ThreadPoolExecutor(max_workers=1, thread_name_prefix="levelgen")
+        self.pending_levels = {}
     
     def initialize_level(self, level_number):
         """Create a new level if it doesn't already exist"""
-        if level_number not in self.levels:
-            # Set the random seed for consistent generation
-            level_seed = self.seed + level_number  # Unique seed for each level
-            random.seed(level_seed)
-            
-            # Create the new level
-            game_map = Map(MAP_WIDTH, MAP_HEIGHT, level_number)
-            
-            if level_number == 0:
-                # Town level
-                game_map.generate = lambda: None  # Disable standard dungeon generation
-                entities = generate_town_map(game_map)  # Use the entities returned from town generation
+        if level_number in self.levels:
+            # Mark as most recently used
+            self.levels[level_number] = self.levels.pop(level_number)
+        elif level_number in self.evicted:
+            # Regenerate from the seed and reapply what changed
+            restore_level(self, self.get_evicted_delta(level_number))
+            del self.evicted[level_number]
+        else:
+            pending = self.pending_levels.pop(level_number, None)
+            if pending is not None and (pending.done() or not pending.cancel()):
+                # Hand over the pre-generated level (waits if the worker is mid-build)
+                self.levels[level_number] = pending.result()
             else:
-                # Dungeon level
-                game_map.generate()
-                
-                # Create list for level entities (excluding player)
-                entities = []
-                
-                # Place entities in the map
-                for room in game_map.rooms[1:]:
-                    place_entities(room, entities, MAX_ENEMIES_PER_ROOM, MAX_ITEMS_PER_ROOM, level_number)
-            
-            # Set the stairs positions
-            if level_number == 0:
-                # Town already has down stairs to dungeon from the town generator
-                pass
-            elif level_number < self.max_levels:
-                # Down stairs in a random room (except first room where player spawns)
-                down_stairs_room = random.choice(game_map.rooms[1:])
-                game_map.tiles[down_stairs_room.center_y][down_stairs_room.center_x] = TileType.STAIRS_DOWN
-                game_map.down_stairs_position = (down_stairs_room.center_x, down_stairs_room.center_y)
-            
-            # Up stairs in another random room
-            if level_number == 1:
-                # The first dungeon level has stairs up to the town
-                up_room_candidates = [room for room in game_map.rooms if 
-                                   (room.center_x, room.center_y) != getattr(game_map, 'down_stairs_position', None)]
-                up_stairs_room = random.choice(up_room_candidates)
-                game_map.tiles[up_stairs_room.center_y][up_stairs_room.center_x] = TileType.STAIRS_UP
-                game_map.up_stairs_position = (up_stairs_room.center_x, up_stairs_room.center_y)
-            elif level_number > 1:
-                # Other levels connect to the previous dungeon level
-                up_room_candidates = [room for room in game_map.rooms if 
-                                   (room.center_x, room.center_y) != getattr(game_map, 'down_stairs_position', None)]
-                up_stairs_room = random.choice(up_room_candidates)
-                game_map.tiles[up_stairs_room.center_y][up_stairs_room.center_x] = TileType.STAIRS_UP
-                game_map.up_stairs_position = (up_stairs_room.center_x, up_stairs_room.center_y)
+                # Nothing pre-generated yet, build it here
+                self.levels[level_number] = self.build_level(level_number)
+            game_map, entities = self.levels[level_number]
+            self.spawned[level_number] = list(entities)
+            # From here on the map's entity list is the level's only container
+            game_map.entities = entities
+        
+        self.evict_levels()
+        return self.levels[level_number]
+    
+    def evict_levels(self):
+        """Compress least recently used levels until at most max_resident_levels are in memory"""
+        for level_number in list(self.levels):
+            if len(self.levels) <= self.max_resident_levels:
+                break
+            if level_number != self.current_level:
+                self.set_evicted_delta(level_delta(self, level_number))
+                del self.levels[level_number], self.spawned[level_number]
+    
+    def get_evicted_delta(self, level_number):
+        """Return an evicted level's delta record (see game/records.py)"""
+        return pickle.loads(zlib.decompress(self.evicted[level_number]))
+    
+    def set_evicted_delta(self, delta):
+        """Store a level delta compressed; the level is restored from it on its next visit"""
+        self.evicted[delta[0]] = zlib.compress(pickle.dumps(delta, pickle.HIGHEST_PROTOCOL))
+    
+    def get_level_bytes(self):
+        """Memory held per level: map array bytes if resident, compressed size if evicted"""
+        level_bytes = {level_number: game_map.nbytes for level_number, (game_map, _) in self.levels.items()}
+        level_bytes.update((level_number, len(data)) for level_number, data in self.evicted.items())
+        return level_bytes
+    
+    def build_level(self, level_number):
+        """Generate a level and return (game_map, entities) without storing it.
+        
+        All randomness comes from the level's own map generation stream, so the
+        result does not depend on (or disturb) the global random module and the
+        same level can safely be built on a worker thread.
+        """
+        rng = self.rng.spawn(STREAM_MAPGEN, level_number)
+        
+        # Create the new level
+        game_map = Map(MAP_WIDTH, MAP_HEIGHT, level_number)
+        game_map.events = self.events
+        
+        if level_number == 0:
+            # Town level (no standard dungeon generation)
+            entities = generate_town_map(game_map, rng)  # Use the entities returned from town generation
+        else:
+            # Dungeon level
+            game_map.generate(rng)
+            if self.monster_store:
+                game_map.monsters = MonsterStore()
             
-            # Store the level
-            self.levels[level_number] = (game_map, entities)
+            # Create list for level entities (excluding player)
+            entities = []
             
-            # Reset random seed
-            random.seed()
+            # Place entities in the map
+            for room in game_map.rooms[1:]:
+                place_entities(room, entities, MAX_ENEMIES_PER_ROOM, MAX_ITEMS_PER_ROOM, level_number, rng,
+                               game_map.monsters)
         
-        return self.levels[level_number]
+        # Set the stairs positions
+        if level_number == 0:
+            # Town already has down stairs to dungeon from the town generator
+            pass
+        elif level_number < self.max_levels:
+            # Down stairs in a random room (except first room where player spawns)
+            down_stairs_room = rng.choice(game_map.rooms[1:])
+            game_map.set_tile(down_stairs_room.center_x, down_stairs_room.center_y, TileType.STAIRS_DOWN)
+            game_map.down_stairs_position = (down_stairs_room.center_x, down_stairs_room.center_y)
+        
+        # Up stairs in another random room
+        if level_number == 1:
+            # The first dungeon level has stairs up to the town
+            up_room_candidates = [room for room in game_map.rooms if 
+                               (room.center_x, room.center_y) != getattr(game_map, 'down_stairs_position', None)]
+            up_stairs_room = rng.choice(up_room_candidates)
+            game_map.set_tile(up_stairs_room.center_x, up_stairs_room.center_y, TileType.STAIRS_UP)
+            game_map.up_stairs_position = (up_stairs_room.center_x, up_stairs_room.center_y)
+        elif level_number > 1:
+            # Other levels connect to the previous dungeon level
+            up_room_candidates = [room for room in game_map.rooms if 
+                               (room.center_x, room.center_y) != getattr(game_map, 'down_stairs_position', None)]
+            up_stairs_room = rng.choice(up_room_candidates)
+            game_map.set_tile(up_stairs_room.center_x, up_stairs_room.center_y, TileType.STAIRS_UP)
+            game_map.up_stairs_position = (up_stairs_room.center_x, up_stairs_room.center_y)
+        
+        # Monsters on this level roll their attacks from the level's combat stream
+        combat_rng = self.rng.get(STREAM_COMBAT, level_number)
+        for entity in entities:
+            if entity.fighter:
+                entity.fighter.rng = combat_rng
+        
+        return game_map, entities
+    
+    def close(self):
+        """Stop the level generation thread, dropping any levels still queued.
+        
+        Call this when the world is discarded; it can't generate levels afterwards.
+        """
+        self.generator.shutdown(cancel_futures=True)
+        self.pending_levels.clear()
+    
+    def prefetch_level(self, level_number):
+        """Start generating a level on the worker thread if it isn't built or queued.
+        
+        build_level is pure Python, so the worker holds the GIL while it runs
+        and competes with the main thread rather than running beside it. The
+        prefetch pays off because it starts on arrival at a level, while the
+        game mostly sits waiting for input, instead of stalling the descent.
+        """
+        if (0 <= level_number <= self.max_levels and level_number not in self.levels
+                and level_number not in self.pending_levels):
+            # Create the level's combat stream here so the worker only reads rng.streams
+            self.rng.get(STREAM_COMBAT, level_number)
+            self.pending_levels[level_number] = self.generator.submit(self.build_level, level_number)
     
     def get_current_level(self):
         """Get the current level map and entities"""
-        return self.initialize_level(self.current_level)
+        level = self.initialize_level(self.current_level)
+        # Speculatively build the level below so descending doesn't stall
+        self.prefetch_level(self.current_level + 1)
+        return level
+    
+    def attach_player(self, player):
+        """Put the player at the front of the current level's entity list"""
+        game_map, entities = self.levels[self.current_level]
+        if player not in entities:
+            game_map.add_entity(player, 0)
+    
+    def detach_player(self, player):
+        """Take the player out of the current level's entity list"""
+        game_map, entities = self.levels[self.current_level]
+        if player in entities:
+            game_map.remove_entity(player)
+    
+    def hear_fighting(self, attack):
+        """Fighting is noisy: wake dormant monsters within NOISE_RADIUS of the attacker"""
+        game_map = self.levels[self.current_level][0]
+        game_map.scheduler.wake_within(game_map, attack.attacker.x, attack.attacker.y, NOISE_RADIUS)
+    
+    def advance_turn(self, player, message_log, delay=TURN_TIME):
+        """Run the current level's monsters until the player's next turn; returns the player's killer or None"""
+        game_map = self.levels[self.current_level][0]
+        return game_map.scheduler.advance(player, game_map, message_log, delay)
     
     def go_up_stairs(self, player):
         """Move player up one level if possible"""
@@ -88,6 +226,7 @@ class GameWorld:
                     'silver_pieces': player.silver_pieces
                 }
                 
+                self.detach_player(player)
                 self.current_level -= 1
                 
                 # Get the new level
@@ -95,6 +234,7 @@ class GameWorld:
                 
                 # Position player at the down stairs on the upper level
                 player.x, player.y = new_map.down_stairs_position
+                self.attach_player(player)
                 
                 # Restore player state
                 player.silver_pieces = player_state['silver_pieces']
@@ -116,6 +256,7 @@ class GameWorld:
                     'silver_pieces': player.silver_pieces
                 }
                 
+                self.detach_player(player)
                 self.current_level += 1
                 
                 # Get the new level (initialize if needed)
@@ -127,6 +268,7 @@ class GameWorld:
                 else:
                     # Fallback to first room center if something went wrong
                     player.x, player.y = new_map.rooms[0].center_x, new_map.rooms[0].center_y
+                self.attach_player(player)
                 
                 # Restore player state
                 player.silver_pieces = player_state['silver_pieces']
@@ -134,16 +276,3 @@ class GameWorld:
                 return True
         
         return False
-        
-    def update_entities(self, entities):
-        """Update the entities for the current level"""
-        # Get player from entities
-        player = next((e for e in entities if e.entity_type == EntityType.PLAYER), None)
-        
-        if player:
-            # Remove player from entities to store
-            entities_without_player = [e for e in entities if e.entity_type != EntityType.PLAYER]
-            
-            # Store the updated entities
-            current_map = self.levels[self.current_level][0]
-            self.levels[self.current_level] = (current_map, entities_without_player)
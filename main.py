@@ -1,20 +1,22 @@
 import pygame
 import sys
-import random
+import os
 from config import (
     TILE_SIZE, SCREEN_WIDTH, SCREEN_HEIGHT, LEFT_PANEL_WIDTH, MESSAGE_LOG_HEIGHT,
     INFO_PANEL_WIDTH, MAP_WIDTH, MAP_HEIGHT, BLACK, WHITE, RED, GREEN, LIGHT_BLUE, YELLOW,
-    UI_BACKGROUND, UI_TEXT_PRIMARY, screen, EntityType, EquipmentSlot, ItemType
+    UI_BACKGROUND, UI_TEXT_PRIMARY, screen, EntityType, EquipmentSlot, ItemType, SAVE_PATH, INPUT_LOG_PATH
 )
 from map.map import Map
 from map.fov import calculate_fov
-from entities.entity import Entity
-from entities.components.fighter import Fighter
+from entities.components.fighter import LEVEL_TABLE
 from entities.components.ai import BasicMonster
 from entities.components.item import Item, heal_player
-from entities.inventory import Inventory
 from game.world import GameWorld
-from data.items import place_entities, create_item
+from game.save import Autosaver, load_game
+from game.input_log import (InputLog, UNREPLAYABLE, ACTION_WAIT, ACTION_DIRECTIONS, ACTION_DESCEND, ACTION_ASCEND,
+                            ACTION_PICK_UP, use_action, fire_action)
+from game.player import create_player, perform_action
+from data.items import place_entities
 from ui.message_log import MessageLog
 from ui.theme import ThemeManager
 from ui.rendering import (
@@ -22,7 +24,6 @@ from ui.rendering import (
     draw_message_log, draw_inventory, draw_targeting_cursor, draw_arrow_path
 )
 from ui.title_screen import title_screen
-from data.monsters import MONSTERS
 from map.town import BuildingType
 
 # Define character sheet variables at the module level
@@ -46,59 +47,24 @@ def main():
     fov_radius = None
     fov_recompute = None
     
+    # Level transitions are saved in the background so resume survives a restart
+    autosaver = Autosaver(SAVE_PATH)
+    
     # Initial game setup or resume from title screen
     while True:
         # Show the title screen
         # If we have a player, that means we're coming from the game, so show resume option
-        choice = title_screen(show_resume=player is not None and player.fighter.hp > 0)
+        # (a saved game can be resumed too)
+        can_resume = (player is not None and player.fighter.hp > 0) or (player is None and os.path.exists(SAVE_PATH))
+        choice = title_screen(show_resume=can_resume)
         
         # Initialize or reset the game based on choice
         if choice == "new_game":
-            # Create new game
-            game_world = GameWorld(max_levels=20)
-            
-            # Create message log
-            message_log = MessageLog()
-            message_log.add_message("Welcome to Crimson Depths! Use arrow keys to move.", LIGHT_BLUE)
-            message_log.add_message("Find the stairs (>) to descend into the dungeon.", LIGHT_BLUE)
-            message_log.add_message("Press I to open inventory.", LIGHT_BLUE)
-            message_log.add_message("Press T for targeted fire or F for quick fire with ranged weapons.", LIGHT_BLUE)
-            message_log.add_message("Press E to auto-explore the dungeon (stops when encountering monsters).", LIGHT_BLUE)
-            
-            # Create inventory for player
-            inventory_component = Inventory()
-            
-            # Create player with OSR-style stats
-            fighter_component = Fighter(hp=8, armor=2, damage_dice=(1, 3))
-            player = Entity(0, 0, '@', WHITE, EntityType.PLAYER, 'Player', blocks=True, 
-                          fighter=fighter_component, inventory=inventory_component, silver_pieces=50)
-            
-            # Initialize town level
-            game_map, level_entities = game_world.get_current_level()
-            
-            # Place player in the town - at the center near the dungeon stairs
-            if game_map.down_stairs_position:
-                player.x = game_map.down_stairs_position[0]
-                player.y = game_map.down_stairs_position[1] - 2  # Place player near but not on the stairs
-            else:
-                # Fallback to center of map
-                player.x = MAP_WIDTH // 2
-                player.y = MAP_HEIGHT // 2
-            
-            # Add player to entities list
-            entities = [player] + level_entities
-            game_map.entities = entities
-            
-            # Add starting equipment (shortbow and arrows)
-            # Create and add shortbow
-            shortbow = create_item('shortbow', player.x, player.y)
-            player.inventory.add_item(shortbow, message_log)
-            player.inventory.equip_item(shortbow, EquipmentSlot.RIGHT_HAND, message_log, entities)
-            
-            # Create and add arrows
-            arrows = create_item('arrows', player.x, player.y)
-            player.inventory.add_item(arrows, message_log)
-            player.inventory.equip_item(arrows, EquipmentSlot.LEFT_HAND, message_log, entities)
+            # Create new game, stopping the old one's level generation thread
+            if game_world is not None:
+                game_world.close()
+            game_world, player, message_log = new_game()
+            game_map, entities = game_world.get_current_level()
             
             # Game state
             game_state = 'playing'  # Can be 'playing', 'inventory', 'targeting', or 'dead'
@@ -114,34 +80,85 @@ def main():
             # Initial FOV calculation before game starts
             calculate_fov(game_map, player.x, player.y, fov_radius)
         
+        elif choice == "resume_game" and player is None and os.path.exists(SAVE_PATH):
+            # Resume the autosaved game from disk
+            if game_world is not None:
+                game_world.close()
+            game_world, player, message_log = load_game(SAVE_PATH)
+            message_log.subscribe(game_world.events)
+            game_map, entities = game_world.get_current_level()
+            message_log.add_message("Welcome back to Crimson Depths!", LIGHT_BLUE)
+            
+            game_state = 'playing'
+            game_over_time = None
+            inventory_index = 0
+            inventory_mode = 'items'
+            selected_equipment_slot = EquipmentSlot.RIGHT_HAND
+            fov_radius = 20 if game_world.current_level == 0 else 10  # Double FOV in town
+            fov_recompute = True
+        
         elif choice == "resume_game" and player is not None and player.fighter.hp > 0:
             # Resume game - all variables should already be set
             # Make sure we're on the correct dungeon level
-            game_map, level_entities = game_world.get_current_level()
-            entities = [player] + level_entities
-            game_map.entities = entities
+            game_map, entities = game_world.get_current_level()
             # Recalculate FOV to be safe
             fov_recompute = True
         
         elif choice != "resume_game":
             # Exit or other unimplemented options
+            if game_world is not None:
+                game_world.close()
             return
             
         # Play the game
-        player_died = play_game(
-            game_world, player, message_log, entities, game_map,
-            game_state, game_over_time, inventory_index, inventory_mode,
-            selected_equipment_slot, fov_radius, fov_recompute
-        )
+        try:
+            player_died = play_game(
+                game_world, player, message_log, entities, game_map,
+                game_state, game_over_time, inventory_index, inventory_mode,
+                selected_equipment_slot, fov_radius, fov_recompute, autosaver
+            )
+        finally:
+            # Write the input log on every exit, including quitting and crashes
+            if game_world.input_log is not None:
+                game_world.input_log.save(INPUT_LOG_PATH)
         
         # If the player died, we need to reset the player object so they can't "resume" a dead character
         if player_died:
             player = None
+            # Permadeath: the autosave goes too
+            autosaver.wait()
+            if os.path.exists(SAVE_PATH):
+                os.remove(SAVE_PATH)
+
+def new_game(seed=None):
+    """Start a recorded game in town; returns (game_world, player, message_log).
+    
+    The player comes from create_player, like the env's, so the input log
+    replays from the same start.
+    """
+    game_world = GameWorld(max_levels=20, seed=seed)
+    # Record the game so it can be replayed (python replay.py lastgame.cdlog)
+    game_world.input_log = InputLog(game_world.seed, game_world.max_levels)
+    
+    # Create message log
+    message_log = MessageLog()
+    message_log.subscribe(game_world.events)
+    message_log.add_message("Welcome to Crimson Depths! Use arrow keys to move.", LIGHT_BLUE)
+    message_log.add_message("Find the stairs (>) to descend into the dungeon.", LIGHT_BLUE)
+    message_log.add_message("Press I to open inventory.", LIGHT_BLUE)
+    message_log.add_message("Press T for targeted fire or F for quick fire with ranged weapons.", LIGHT_BLUE)
+    message_log.add_message("Press E to auto-explore the dungeon (stops when encountering monsters).", LIGHT_BLUE)
+    
+    # Place the player in town near the dungeon stairs, with a shortbow and arrows
+    game_map, _ = game_world.get_current_level()
+    player = create_player(game_world, game_map, message_log)
+    game_world.attach_player(player)
+    return game_world, player, message_log
 
 def play_game(
     game_world, player, message_log, entities, game_map,
     game_state, game_over_time, inventory_index, inventory_mode,
-    selected_equipment_slot, fov_radius, fov_recompute
+    selected_equipment_slot, fov_radius, fov_recompute, autosaver=None
 ):
     """Main game loop extracted to a function to allow returning to title screen"""
     # Define character sheet variables
@@ -150,6 +167,23 @@ def play_game(
     for attr in attributes:
         points_to_allocate[attr] = 0
     
+    # Commands are logged as action codes, or UNREPLAYABLE (see game/input_log.py)
+    def log_command(action):
+        if game_world.input_log is not None:
+            game_world.input_log.record(action)
+    
+    def act(action):
+        """Carry out a command the way the env does, log it and let the monsters reply.
+        
+        Returns perform_action's outcome: None if nothing happened.
+        """
+        outcome = perform_action(game_world, player, action, message_log)
+        if outcome is not None:
+            log_command(action)
+        if outcome:
+            game_world.advance_turn(player, message_log)
+        return outcome
+    
     # Auto-explore variables
     auto_explore = False
     auto_explore_path = []
@@ -257,143 +291,20 @@ def play_game(
                 
                 # Fire in targeting mode
                 elif event.key == pygame.K_t and game_state == 'targeting':
-                    # Make sure we're not targeting ourselves
-                    if targeting_x == player.x and targeting_y == player.y:
-                        message_log.add_message("You can't target yourself!", YELLOW)
+                    # Invalid shots (no target, out of range or sight) stay in targeting mode
+                    action = fire_action(targeting_x - player.x, targeting_y - player.y)
+                    if action is None:
+                        message_log.add_message("Target is out of range!", YELLOW)
+                        continue
+                    if act(action) is None:
                         continue
                     
-                    # Check if target is in range
-                    ranged_weapon = player.inventory.get_equipped_ranged_weapon()
-                    if ranged_weapon:
-                        # Calculate distance to target
-                        dx = targeting_x - player.x
-                        dy = targeting_y - player.y
-                        distance = max(abs(dx), abs(dy))
-                        
-                        if distance > ranged_weapon.item.weapon_data.range:
-                            message_log.add_message(f"Target is out of range! Maximum range is {ranged_weapon.item.weapon_data.range} tiles.", YELLOW)
-                            continue
-                        
-                        # Check if target is visible
-                        if not game_map.visible[targeting_y][targeting_x]:
-                            message_log.add_message("You can't see that target!", YELLOW)
-                            continue
-                        
-                        # Find the target entity
-                        target = None
-                        
-                        # First try to find a living monster (non-corpse enemy)
-                        for entity in entities:
-                            if (entity.x == targeting_x and entity.y == targeting_y and 
-                                entity.entity_type == EntityType.ENEMY and 
-                                entity.char != '%' and entity.fighter):  # Not a corpse and still has fighter component
-                                target = entity
-                                break
-                        
-                        # If no living monster found, check for a corpse
-                        if not target:
-                            for entity in entities:
-                                if (entity.x == targeting_x and entity.y == targeting_y and 
-                                    entity.entity_type == EntityType.ENEMY):
-                                    target = entity
-                                    break
-                        
-                        if target:
-                            # Use ammo
-                            player.inventory.use_ammo()
-                            
-                            # Make sure target has a fighter component
-                            if not target.fighter:
-                                message_log.add_message(f"The {target.name} is already dead!", RED)
-                                game_state = 'playing'
-                                continue
-                                
-                            # Calculate dodge chance
-                            dodge_chance = target.fighter.get_dodge_chance()
-                            hit_roll = random.randint(1, 100)
-                            
-                            # Show the arrow animation
-                            draw_arrow_path(player.x, player.y, targeting_x, targeting_y, camera_x, camera_y)
-                            
-                            if hit_roll > dodge_chance:
-                                # Hit! Roll damage
-                                damage_dice = ranged_weapon.item.damage_dice
-                                damage = random.randint(1, damage_dice[1])
-                                
-                                # Add dexterity bonus for ranged attacks
-                                damage += player.fighter.get_ranged_bonus()
-                                
-                                # Apply damage
-                                old_hp = target.fighter.hp
-                                target_name = target.name  # Store the name before it might change
-                                result = target.fighter.take_damage(damage)
-                                
-                                # Get details about damage reduction if applicable
-                                reduced_damage = damage
-                                if result and result.startswith('damaged:'):
-                                    reduced_damage = int(result.split(':', 1)[1])
-                                
-                                # Display hit message with damage and armor reduction
-                                if reduced_damage < damage:
-                                    hit_message = f"Your arrow hits the {target_name} for {damage} damage ({reduced_damage} after armor)!"
-                                else:
-                                    hit_message = f"Your arrow hits the {target_name} for {reduced_damage} damage!"
-                                
-                                message_log.add_message(hit_message, GREEN)
-                                
-                                # Check if target died
-                                if target.fighter is None and old_hp > 0:
-                                    message_log.add_message(f"The {target_name} dies!", LIGHT_BLUE)
-                                    
-                                    # Award XP to the player based on monster type
-                                    xp_awarded = 0
-                                    
-                                    # Find the monster in the list by name
-                                    for monster_key, monster_data in MONSTERS.items():
-                                        if monster_data.name.lower() in target_name.lower():
-                                            xp_awarded = monster_data.xp
-                                            break
-                                    
-                                    # Fallback for monsters not in the list (should be rare)
-                                    if xp_awarded == 0:
-                                        if 'Orc' in target_name:
-                                            xp_awarded = 50
-                                        elif 'Troll' in target_name:
-                                            xp_awarded = 100
-                                        else:
-                                            xp_awarded = 10  # Default XP
-                                    
-                                    player.fighter.xp += xp_awarded
-                                    message_log.add_message(f"You gain {xp_awarded} XP!", LIGHT_BLUE)
-                                    
-                                    # Check for level up
-                                    old_level = player.fighter.level
-                                    # Check the level table for possible level up
-                                    for level, xp_threshold, hit_dice, attack_bonus, attr_points in player.fighter.level_table:
-                                        if level > player.fighter.level and player.fighter.xp >= xp_threshold:
-                                            player.fighter.level_up(level, hit_dice, attack_bonus, attr_points, message_log)
-                                            break
-                            else:
-                                message_log.add_message(
-                                    f"Your arrow misses the {target.name}! (They dodged the attack)",
-                                    RED
-                                )
-                        else:
-                            message_log.add_message("There's no enemy at that location!", YELLOW)
-                            # Still use up an arrow if firing at an empty spot
-                            player.inventory.use_ammo()
-                            
-                            # Show arrow animation
-                            draw_arrow_path(player.x, player.y, targeting_x, targeting_y, camera_x, camera_y)
+                    # Show the arrow animation
+                    draw_arrow_path(player.x, player.y, targeting_x, targeting_y, camera_x, camera_y)
                     
                     # Exit targeting mode after firing
                     game_state = 'playing'
                     
-                    # Process monster turns after firing
-                    for entity in entities:
-                        if entity.ai and entity != player:
-                            entity.ai.take_turn(player, game_map, message_log)
-                    
                     # Check for game over after monsters take their turns
                     if player.fighter.hp <= 0:
                         game_state = 'dead'
@@ -436,88 +347,12 @@ def play_game(
                                         message_log.add_message(f"Closest monster ({closest_monster.name}) is out of range! Maximum range is {ranged_weapon.item.weapon_data.range} tiles.", YELLOW)
                                     else:
                                         # We have a target, fire!
-                                        target = closest_monster
-                                        targeting_x, targeting_y = target.x, target.y # For arrow animation
-                                        
-                                        # Use ammo
-                                        player.inventory.use_ammo()
-                                        
-                                        # Calculate dodge chance
-                                        dodge_chance = target.fighter.get_dodge_chance()
-                                        hit_roll = random.randint(1, 100)
+                                        targeting_x, targeting_y = closest_monster.x, closest_monster.y # For arrow animation
+                                        act(fire_action(targeting_x - player.x, targeting_y - player.y))
                                         
                                         # Show the arrow animation
                                         draw_arrow_path(player.x, player.y, targeting_x, targeting_y, camera_x, camera_y)
-                                        
-                                        if hit_roll > dodge_chance:
-                                            # Hit! Roll damage
-                                            damage_dice = ranged_weapon.item.damage_dice
-                                            damage = random.randint(1, damage_dice[1])
-                                            
-                                            # Add dexterity bonus for ranged attacks
-                                            damage += player.fighter.get_ranged_bonus()
-                                            
-                                            # Apply damage
-                                            old_hp = target.fighter.hp
-                                            target_name = target.name  # Store the name before it might change
-                                            result = target.fighter.take_damage(damage)
-                                            
-                                            # Get details about damage reduction if applicable
-                                            reduced_damage = damage
-                                            if result and result.startswith('damaged:'):
-                                                reduced_damage = int(result.split(':', 1)[1])
-                                            
-                                            # Display hit message with damage and armor reduction
-                                            if reduced_damage < damage:
-                                                hit_message = f"Your arrow hits the {target_name} for {damage} damage ({reduced_damage} after armor)!"
-                                            else:
-                                                hit_message = f"Your arrow hits the {target_name} for {reduced_damage} damage!"
-                                            
-                                            message_log.add_message(hit_message, GREEN)
-                                            
-                                            # Check if target died
-                                            if target.fighter is None and old_hp > 0:
-                                                message_log.add_message(f"The {target_name} dies!", LIGHT_BLUE)
-                                                
-                                                # Award XP to the player based on monster type
-                                                xp_awarded = 0
-                                                
-                                                # Find the monster in the list by name
-                                                for monster_key, monster_data in MONSTERS.items():
-                                                    if monster_data.name.lower() in target_name.lower():
-                                                        xp_awarded = monster_data.xp
-                                                        break
-                                                
-                                                # Fallback for monsters not in the list (should be rare)
-                                                if xp_awarded == 0:
-                                                    if 'Orc' in target_name:
-                                                        xp_awarded = 50
-                                                    elif 'Troll' in target_name:
-                                                        xp_awarded = 100
-                                                    else:
-                                                        xp_awarded = 10  # Default XP
-                                                
-                                                player.fighter.xp += xp_awarded
-                                                message_log.add_message(f"You gain {xp_awarded} XP!", LIGHT_BLUE)
-                                                
-                                                # Check for level up
-                                                old_level = player.fighter.level
-                                                # Check the level table for possible level up
-                                                for level, xp_threshold, hit_dice, attack_bonus, attr_points in player.fighter.level_table:
-                                                    if level > player.fighter.level and player.fighter.xp >= xp_threshold:
-                                                        player.fighter.level_up(level, hit_dice, attack_bonus, attr_points, message_log)
-                                                        break
-                                        else:
-                                            message_log.add_message(
-                                                f"Your arrow misses the {target.name}! (They dodged the attack)",
-                                                RED
-                                            )
-                                            
-                                        # Process monster turns after firing
                                         fov_recompute = True # Recompute FOV in case player moved
-                                        for entity in entities:
-                                            if entity.ai and entity != player:
-                                                entity.ai.take_turn(player, game_map, message_log)
                                         
                                         # Check for game over after monsters take their turns
                                         if player.fighter.hp <= 0:
@@ -532,7 +367,7 @@ def play_game(
                             message_log.add_message("You need to equip arrows to use your bow!", YELLOW)
                     else:
                         message_log.add_message("You need to equip a ranged weapon first!", YELLOW)
-
+                
                 # Player movement
                 if game_state == 'playing':
                     dx, dy = 0, 0
@@ -565,11 +400,8 @@ def play_game(
                     elif event.key == pygame.K_KP3:  # Southeast
                         dx, dy = 1, 1
                     elif event.key == pygame.K_KP5:  # Wait (no movement)
-                        message_log.add_message("You wait...", LIGHT_BLUE)
-                        # Trigger enemy turns without player movement
-                        for entity in entities:
-                            if entity.ai and entity != player:
-                                entity.ai.take_turn(player, game_map, message_log)
+                        # Enemies take their turns without player movement
+                        act(ACTION_WAIT)
                         
                         # Check for game over after enemies take their turns
                         if player.fighter.hp <= 0:
@@ -580,179 +412,30 @@ def play_game(
                         fov_recompute = True  # Still recompute FOV for any enemy movement
                     
                     if dx != 0 or dy != 0:
-                        # Process player movement
-                        action_result = player.move(dx, dy, game_map, message_log)
-                        
-                        # Only add message if it's a string message (not just True)
-                        if action_result and isinstance(action_result, str):
-                            message_log.add_message(action_result)
-                        
-                        # Check for building interactions if player moved successfully
-                        if action_result and isinstance(action_result, bool):
-                            # Implement building interaction logic here
-                            pass
+                        # Move or attack, pick up whatever is there, then the enemies' turns
+                        act(ACTION_DIRECTIONS.index((dx, dy)))
                         
                         # Recalculate FOV after movement
                         fov_recompute = True
                         
-                        # Enemy turns
-                        for entity in entities:
-                            if entity.ai and entity != player:
-                                entity.ai.take_turn(player, game_map, message_log)
-                        
                         # Check for game over
                         if player.fighter.hp <= 0:
                             game_state = 'dead'
                             message_log.add_message("You died!", RED)
                             game_over_time = pygame.time.get_ticks()  # Record time when game over happens
-                        
-                        # Pick up items feature
-                        for entity in list(entities):  # Use a copy to avoid issues if we remove during iteration
-                            if (entity.item and entity.x == player.x and entity.y == player.y and 
-                                entity.entity_type == EntityType.ITEM):
-                                
-                                # Check if we're picking up an unpaid item from a shop
-                                item_is_in_shop = False
-                                for shop_entity in entities:
-                                    if (shop_entity.entity_type == EntityType.ENEMY and 
-                                        shop_entity.ai and hasattr(shop_entity.ai, 'shop_area')):
-                                        # This is a shopkeeper, check if the item is in their shop
-                                        x1, y1, x2, y2 = shop_entity.ai.shop_area
-                                        if (x1 <= entity.x <= x2 and y1 <= entity.y <= y2):
-                                            # The item is in a shop
-                                            item_is_in_shop = True
-                                            
-                                            # Mark the item as unpaid and set its price if not already set
-                                            if not entity.item.unpaid:
-                                                entity.item.unpaid = True
-                                                
-                                                # Set a default price if needed based on item type
-                                                if entity.item.price == 0:
-                                                    if entity.item.item_type == ItemType.WEAPON or entity.item.item_type == ItemType.RANGED_WEAPON:
-                                                        entity.item.price = 15
-                                                    elif entity.item.item_type == ItemType.ARMOR:
-                                                        entity.item.price = 25
-                                                    elif entity.item.item_type == ItemType.CONSUMABLE:
-                                                        entity.item.price = 20
-                                                    else:
-                                                        entity.item.price = 10
-                                                
-                                            # Make the shopkeeper move to block the exit
-                                            shop_entity.ai.is_in_doorway = True
-                                            shop_entity.x = shop_entity.ai.door_x
-                                            shop_entity.y = shop_entity.ai.door_y
-                                            
-                                            # Add message about the shopkeeper's reaction
-                                            message_log.add_message(f"The {shop_entity.name} moves to block the exit.", LIGHT_BLUE)
-                                            break
-                                
-                                # Store item information for auto-equip
-                                item_name = entity.name
-                                
-                                # Add item to inventory
-                                if player.inventory.add_item(entity, message_log):
-                                    entities.remove(entity)
-                                    
-                                    # Auto-equip functionality (only for non-shop items or paid items)
-                                    if entity.item.equippable and not entity.item.unpaid:
-                                        # Get the appropriate equipment slot for this item
-                                        slot = entity.item.get_slot()
-                                        if slot is not None:
-                                            # Check if the slot is empty
-                                            if player.inventory.get_equipped_item(slot) is None:
-                                                # Find the item in the inventory
-                                                for inv_item in player.inventory.items:
-                                                    if inv_item.name == item_name:
-                                                        # Auto-equip the item
-                                                        player.inventory.equip_item(inv_item, slot, message_log, entities)
-                                                        break
-
-                # Stair movement keys
-                if event.key == pygame.K_LESS and game_state == 'playing':
-                    # Check if player is on up stairs
-                    if (hasattr(game_map, 'up_stairs_position') and 
-                        game_map.up_stairs_position and 
-                        player.x == game_map.up_stairs_position[0] and 
-                        player.y == game_map.up_stairs_position[1]):
-                        # Player is on up stairs, try to go up
-                        if game_world.go_up_stairs(player):
-                            # Get the updated map and entities after level change
-                            game_map, level_entities = game_world.get_current_level()
-                            entities = [player] + level_entities
-                            game_map.entities = entities
-                            message_log.add_message("You climb up the stairs.", LIGHT_BLUE)
-                            # Adjust FOV radius based on the new level
-                            fov_radius = 20 if game_world.current_level == 0 else 10
-                            fov_recompute = True
-                        else:
-                            message_log.add_message("You can't go up here.", YELLOW)
-                    else:
-                        message_log.add_message("There are no stairs up here.", YELLOW)
-                
-                elif event.key == pygame.K_GREATER and game_state == 'playing':
-                    # Check if player is on down stairs
-                    if (hasattr(game_map, 'down_stairs_position') and 
-                        game_map.down_stairs_position and 
-                        player.x == game_map.down_stairs_position[0] and 
-                        player.y == game_map.down_stairs_position[1]):
-                        # Player is on down stairs, try to go down
-                        if game_world.go_down_stairs(player):
-                            # Get the updated map and entities after level change
-                            game_map, level_entities = game_world.get_current_level()
-                            entities = [player] + level_entities
-                            game_map.entities = entities
-                            message_log.add_message("You descend deeper into the dungeon.", LIGHT_BLUE)
-                            # Adjust FOV radius based on the new level
-                            fov_radius = 20 if game_world.current_level == 0 else 10
-                            fov_recompute = True
-                        else:
-                            message_log.add_message("You can't go down here.", YELLOW)
-                    else:
-                        message_log.add_message("There are no stairs down here.", YELLOW)
-                
-                # Add new handler for period with shift
-                elif event.key == pygame.K_PERIOD and pygame.key.get_mods() & pygame.KMOD_SHIFT and game_state == 'playing':
-                    # Check if player is on down stairs
-                    if (hasattr(game_map, 'down_stairs_position') and 
-                        game_map.down_stairs_position and 
-                        player.x == game_map.down_stairs_position[0] and 
-                        player.y == game_map.down_stairs_position[1]):
-                        # Player is on down stairs, try to go down
-                        if game_world.go_down_stairs(player):
-                            # Get the updated map and entities after level change
-                            game_map, level_entities = game_world.get_current_level()
-                            entities = [player] + level_entities
-                            game_map.entities = entities
-                            message_log.add_message("You descend deeper into the dungeon.", LIGHT_BLUE)
-                            # Adjust FOV radius based on the new level
-                            fov_radius = 20 if game_world.current_level == 0 else 10
-                            fov_recompute = True
-                        else:
-                            message_log.add_message("You can't go down here.", YELLOW)
-                    else:
-                        message_log.add_message("There are no stairs down here.", YELLOW)
                 
-                # Add new handler for comma with shift
-                elif event.key == pygame.K_COMMA and pygame.key.get_mods() & pygame.KMOD_SHIFT and game_state == 'playing':
-                    # Check if player is on up stairs
-                    if (hasattr(game_map, 'up_stairs_position') and 
-                        game_map.up_stairs_position and 
-                        player.x == game_map.up_stairs_position[0] and 
-                        player.y == game_map.up_stairs_position[1]):
-                        # Player is on up stairs, try to go up
-                        if game_world.go_up_stairs(player):
-                            # Get the updated map and entities after level change
-                            game_map, level_entities = game_world.get_current_level()
-                            entities = [player] + level_entities
-                            game_map.entities = entities
-                            message_log.add_message("You climb up the stairs.", LIGHT_BLUE)
-                            # Adjust FOV radius based on the new level
-                            fov_radius = 20 if game_world.current_level == 0 else 10
-                            fov_recompute = True
-                        else:
-                            message_log.add_message("You can't go up here.", YELLOW)
-                    else:
-                        message_log.add_message("There are no stairs up here.", YELLOW)
+                # Stair movement keys (shift with comma or period works too)
+                if game_state == 'playing' and (event.key in (pygame.K_LESS, pygame.K_GREATER) or
+                        (event.key in (pygame.K_COMMA, pygame.K_PERIOD) and pygame.key.get_mods() & pygame.KMOD_SHIFT)):
+                    climbing = event.key in (pygame.K_LESS, pygame.K_COMMA)
+                    if act(ACTION_ASCEND if climbing else ACTION_DESCEND) is not None:
+                        # Get the updated map and entities after level change
+                        game_map, entities = game_world.get_current_level()
+                        if autosaver:
+                            autosaver.save(game_world, player, message_log)
+                        # Adjust FOV radius based on the new level
+                        fov_radius = 20 if game_world.current_level == 0 else 10
+                        fov_recompute = True
                 
                 # Targeting mode movement
                 elif game_state == 'targeting':
@@ -877,7 +560,7 @@ def play_game(
                     if game_state == 'playing':
                         # Open character sheet
                         game_state = 'character_sheet'
-                        selected_attribute = getattr(player, 'selected_attribute', 0)
+                        selected_attribute = player.selected_attribute
                         player.selected_attribute = selected_attribute
                         for attr in attributes:
                             points_to_allocate[attr] = 0
@@ -919,6 +602,7 @@ def play_game(
                                 points_to_allocate[attr] = 0
                                 
                             if points_applied > 0:
+                                log_command(UNREPLAYABLE)
                                 message_log.add_message(f"Applied {points_applied} attribute points!", GREEN)
                             else:
                                 message_log.add_message("You don't have enough attribute points.", RED)
@@ -928,8 +612,8 @@ def play_game(
                     # First try to find a healing potion in inventory
                     healing_potion = player.inventory.find_item_by_type(ItemType.CONSUMABLE)
                     if healing_potion and healing_potion.item and healing_potion.item.use_function:
-                        # Found a potion, use it
-                        healing_potion.item.use(player, message_log, entities)
+                        # Found a potion, drink it (a free action)
+                        act(use_action(player.inventory.items.index(healing_potion)))
                 
                 # Toggle inventory screen
                 if event.key == pygame.K_i:
@@ -985,14 +669,13 @@ def play_game(
                         if inventory_mode == 'items':
                             # Use/equip item from inventory
                             if player.inventory.items and 0 <= inventory_index < len(player.inventory.items):
-                                selected_item = player.inventory.items[inventory_index]
-                                if selected_item.item:
-                                    selected_item.item.use(player, message_log, entities)
+                                act(use_action(inventory_index))
                         else:  # equipment mode
                             # Unequip item from equipment slot
                             equipped_item = player.inventory.get_equipped_item(selected_equipment_slot)
                             if equipped_item:
-                                player.inventory.unequip_item(selected_equipment_slot, message_log, entities)
+                                log_command(UNREPLAYABLE)
+                                player.inventory.unequip_item(selected_equipment_slot, message_log, game_map)
                     
                     # Drop item
                     if event.key == pygame.K_d:
@@ -1000,6 +683,7 @@ def play_game(
                             # Drop item from inventory
                             if player.inventory.items and 0 <= inventory_index < len(player.inventory.items):
                                 selected_item = player.inventory.items[inventory_index]
+                                log_command(UNREPLAYABLE)
                                 if player.inventory.remove_item(selected_item):
                                     # Check if an item is already on the ground
                                     item_at_position = False
@@ -1017,7 +701,7 @@ def play_game(
                                         selected_item.x = player.x
                                         selected_item.y = player.y
                                         message_log.add_message(f"You dropped the {selected_item.name}.", LIGHT_BLUE)
-                                        entities.append(selected_item)
+                                        game_map.add_entity(selected_item)
                                         # Adjust inventory index if needed
                                         if inventory_index >= len(player.inventory.items) and inventory_index > 0:
                                             inventory_index -= 1
@@ -1027,6 +711,7 @@ def play_game(
                         # Buy unpaid items from shop
                         if player.inventory.has_unpaid_items():
                             if player.inventory.pay_for_items(message_log):
+                                log_command(UNREPLAYABLE)
                                 # Find all shopkeepers and make them move
                                 for entity in entities:
                                     if (entity.entity_type == EntityType.ENEMY and 
@@ -1058,7 +743,7 @@ def play_game(
                                         new_y = max(y1, min(y2, new_y))
                                         
                                         # FORCE MOVE the shopkeeper to this position
-                                        entity.force_move(new_x, new_y)
+                                        entity.force_move(new_x, new_y, game_map)
                                         message_log.add_message(f"The {entity.name} steps aside.", LIGHT_BLUE)
                             else:
                                 message_log.add_message("You don't have enough silver.", RED)
@@ -1097,6 +782,7 @@ def play_game(
                                 shop_items.append(entity)
                         
                         if shop_items:
+                            log_command(UNREPLAYABLE)
                             total_value = 0
                             
                             # Calculate the value of the items (half of purchase price)
@@ -1110,7 +796,7 @@ def play_game(
                                 total_value += item_value
                                 
                                 # Remove item from game
-                                entities.remove(item)
+                                game_map.remove_entity(item)
                             
                             # Give player silver for the items
                             player.silver_pieces += total_value
@@ -1143,7 +829,7 @@ def play_game(
                                 new_y = max(y1, min(y2, new_y))
                                 
                                 # FORCE MOVE the shopkeeper to this position
-                                shopkeeper.force_move(new_x, new_y)
+                                shopkeeper.force_move(new_x, new_y, game_map)
                                 message_log.add_message(f"The {shopkeeper.name} steps aside.", LIGHT_BLUE)
                         else:
                             message_log.add_message("There are no items here to sell.", YELLOW)
@@ -1214,32 +900,17 @@ def play_game(
                 
                 # If we don't have a path or have reached the target, find a new target
                 if not auto_explore_path or auto_explore_target is None:
-                    # Find unexplored tiles adjacent to explored tiles
-                    frontier_tiles = game_map.get_unexplored_tiles(explored_only=True)
-                    
-                    # If no frontier tiles, try any unexplored tile
-                    if not frontier_tiles:
-                        frontier_tiles = game_map.get_unexplored_tiles(explored_only=False)
+                    # Walk outward from the player to the nearest reachable unexplored tile
+                    auto_explore_path = game_map.get_explore_path(player.x, player.y)
                     
-                    # If still no unexplored tiles, stop auto-explore
-                    if not frontier_tiles:
+                    # If no unexplored tile can be reached, stop auto-explore
+                    if not auto_explore_path:
                         auto_explore = False
+                        auto_explore_target = None
                         message_log.add_message("Stopped auto-exploration: No unexplored tiles left!", LIGHT_BLUE)
                     else:
-                        # Find closest unexplored tile
-                        closest_tile = None
-                        closest_distance = float('inf')
-                        
-                        for tile_x, tile_y in frontier_tiles:
-                            distance = abs(tile_x - player.x) + abs(tile_y - player.y)
-                            if distance < closest_distance:
-                                closest_distance = distance
-                                closest_tile = (tile_x, tile_y)
-                        
-                        if closest_tile:
-                            # Get path to the closest unexplored tile
-                            auto_explore_target = (closest_tile[0], closest_tile[1], "explore")
-                            auto_explore_path = game_map.get_path(player.x, player.y, closest_tile[0], closest_tile[1])
+                        target_x, target_y = auto_explore_path[-1]
+                        auto_explore_target = (target_x, target_y, "explore")
                 
                 # If we have a path, follow it
                 if auto_explore_path:
@@ -1247,58 +918,37 @@ def play_game(
                     dx = next_step[0] - player.x
                     dy = next_step[1] - player.y
                     
-                    # Check for pickup items before moving
+                    # Pick up silver or a potion here before moving, as a free action
                     item_picked_up = False
-                    for entity in list(entities):
-                        if (entity.item and entity.x == player.x and entity.y == player.y and 
-                            entity.entity_type == EntityType.ITEM):
-                            # Check if it's silver or a potion
-                            if entity.name == "Silver" or (entity.item.item_type == ItemType.CONSUMABLE and player.inventory.has_space()):
-                                # Store item information for auto-equip
-                                item_name = entity.name
-                                
-                                # Add item to inventory
-                                if player.inventory.add_item(entity, message_log):
-                                    entities.remove(entity)
-                                    item_picked_up = True
-                                    
-                                    # Auto-equip functionality
-                                    if entity.item.equippable:
-                                        # Get the appropriate equipment slot for this item
-                                        slot = entity.item.get_slot()
-                                        if slot is not None:
-                                            # Check if the slot is empty
-                                            if player.inventory.get_equipped_item(slot) is None:
-                                                # Find the item in the inventory
-                                                for inv_item in player.inventory.items:
-                                                    if inv_item.name == item_name:
-                                                        # Auto-equip the item
-                                                        player.inventory.equip_item(inv_item, slot, message_log, entities)
-                                                        break
+                    if any(entity.entity_type == EntityType.ITEM and entity.item and
+                           (entity.name == "Silver" or
+                            (entity.item.item_type == ItemType.CONSUMABLE and player.inventory.has_space()))
+                           for entity in game_map.get_entities_at(player.x, player.y)):
+                        item_picked_up = act(ACTION_PICK_UP) is not None
                     
                     if not item_picked_up:
-                        # Move or attack
-                        action_result = player.move(dx, dy, game_map, message_log)
+                        # Bumping into a monster (but not a shopkeeper) attacks it
+                        attacking = any(entity.fighter and not (entity.ai and hasattr(entity.ai, 'on_player_enter'))
+                                        for entity in game_map.get_entities_at(*next_step))
                         
-                        # Only add message if it's a string message (not just True)
-                        if action_result and isinstance(action_result, str):
-                            message_log.add_message(action_result)
+                        # Move or attack, then the enemies' turns
+                        act(ACTION_DIRECTIONS.index((dx, dy)))
                         
                         # Remove the step we just took
                         auto_explore_path.pop(0)
                         
                         # If we attacked something, stop auto-explore
-                        if action_result and isinstance(action_result, str) and "attack" in action_result:
+                        if attacking:
                             auto_explore = False
                             message_log.add_message("Stopped auto-exploration: Combat initiated!", YELLOW)
                         
                         # Recalculate FOV after movement
                         fov_recompute = True
+                        # Recalculate FOV after movement
+                        fov_recompute = True
                         
                         # Enemy turns
-                        for entity in entities:
-                            if entity.ai and entity != player:
-                                entity.ai.take_turn(player, game_map, message_log)
+                        game_world.advance_turn(player, message_log)
                         
                         # Check for game over
                         if player.fighter.hp <= 0:
@@ -1308,16 +958,13 @@ def play_game(
                             game_over_time = pygame.time.get_ticks()  # Record time when game over happens
                             player_died = True
         
-        # Save entities to current level before drawing
-        game_world.update_entities(entities)
-        
         # Adjust camera to center on player
         camera_x = max(0, min(MAP_WIDTH - view_width, player.x - view_width // 2))
         camera_y = max(0, min(MAP_HEIGHT - view_height, player.y - view_height // 2))
         
         # Draw everything
         screen.fill(UI_BACKGROUND)
-
+        
         # If game state is character_sheet, draw only that
         if game_state == 'character_sheet':
             draw_character_sheet(player, selected_attribute, attributes, attribute_names)
@@ -1325,7 +972,7 @@ def play_game(
             # Otherwise, draw the standard game UI
             draw_game_ui(player, game_world, game_map, message_log, camera_x, camera_y, game_state, 
                          inventory_index, inventory_mode, selected_equipment_slot)
-
+        
         # If the game is over, draw game over message (on top of whatever was drawn)
         if game_state == 'dead':
             font = ThemeManager.FONT_HEADING
@@ -1345,6 +992,7 @@ def play_game(
     # Return to the main menu or exit the game
     if not should_return_to_title:
         # Quit Pygame
+        game_world.close()
         pygame.quit()
         sys.exit()
     
@@ -1449,7 +1097,7 @@ def draw_character_sheet(player, selected_attribute, attributes, attribute_names
     
     # Experience to next level
     next_level_xp = 0
-    for level, xp_threshold, _, _, _ in player.fighter.level_table:
+    for level, xp_threshold, _, _, _ in LEVEL_TABLE:
         if level > player.fighter.level:
             next_level_xp = xp_threshold
             break
@@ -1,5 +1,18 @@
 import numpy as np
 
+# FOV algorithms selectable through calculate_fov
+FOV_RAYCAST = 'raycast'
+FOV_SHADOWCAST = 'shadowcast'
+
+# Octant transforms (xx, xy, yx, yy): a tile at (col, depth) in octant space
+# maps to (x + col * xx + depth * xy, y + col * yx + depth * yy) on the map
+OCTANTS = (
+    (1, 0, 0, -1), (-1, 0, 0, -1),  # North
+    (1, 0, 0, 1), (-1, 0, 0, 1),    # South
+    (0, 1, 1, 0), (0, 1, -1, 0),    # East
+    (0, -1, 1, 0), (0, -1, -1, 0),  # West
+)
+
 def bresenham_line(x0, y0, x1, y1):
     """Bresenham's Line Algorithm - returns a list of points on the line from (x0, y0) to (x1, y1)"""
     dx = abs(x1 - x0)
@@ -20,15 +33,57 @@ def bresenham_line(x0, y0, x1, y1):
             err += dx
             y0 += sy
 
-def calculate_fov(game_map, x, y, radius):
-    """Calculate the field of vision from position (x,y) with given radius"""
-    # Reset the visible tiles
-    game_map.visible = np.full((game_map.height, game_map.width), False, dtype=bool)
+def calculate_fov(game_map, x, y, radius, algorithm=FOV_SHADOWCAST):
+    """Calculate the field of vision from position (x,y) with given radius.
+    
+    The result is cached on the map: if the observer, radius, algorithm and
+    tile generation all match the previous call nothing is recomputed. After a
+    recompute game_map.newly_visible and game_map.newly_hidden hold the (x, y)
+    tiles that entered and left view, and game_map.newly_explored the tiles
+    seen for the first time, and dormant monsters brought into view are woken
+    (see TurnScheduler.wake_in_view). Returns True if the FOV was recomputed.
+    """
+    fov_key = (x, y, radius, algorithm, game_map.tile_generation)
+    if fov_key == game_map.fov_key:
+        game_map.newly_visible = set()
+        game_map.newly_hidden = set()
+        game_map.newly_explored = set()
+        return False
+    
+    # Keep the previous view for the deltas and reset the visible tiles in place
+    np.copyto(game_map.previous_visible, game_map.visible)
+    game_map.visible.fill(False)
     
     # The starting position is always visible
     game_map.visible[y][x] = True
-    game_map.explored[y][x] = True
     
+    if algorithm == FOV_RAYCAST:
+        _raycast(game_map, x, y, radius)
+    elif algorithm == FOV_SHADOWCAST:
+        _shadowcast(game_map, x, y, radius)
+    else:
+        raise ValueError(f"Unknown FOV algorithm: {algorithm}")
+    
+    game_map.fov_key = fov_key
+    
+    # Explore what is now in view and grow the exploration frontier from it
+    explored_y, explored_x = np.nonzero(game_map.visible & ~game_map.explored)
+    game_map.explored |= game_map.visible
+    game_map.newly_explored = set(zip(explored_x.tolist(), explored_y.tolist()))
+    game_map.update_frontier(game_map.newly_explored)
+    
+    # Publish which tiles changed visibility since the last recompute
+    entered_y, entered_x = np.nonzero(game_map.visible & ~game_map.previous_visible)
+    left_y, left_x = np.nonzero(game_map.previous_visible & ~game_map.visible)
+    game_map.newly_visible = set(zip(entered_x.tolist(), entered_y.tolist()))
+    game_map.newly_hidden = set(zip(left_x.tolist(), left_y.tolist()))
+    
+    # Wake the dormant monsters that came into view or earshot
+    game_map.scheduler.wake_in_view(game_map, x, y)
+    return True
+
+def _raycast(game_map, x, y, radius):
+    """Cast a Bresenham ray to every tile in the radius (reference implementation)"""
     radius_squared = radius * radius
     
     # Cast rays to all tiles within the radius
@@ -42,6 +97,52 @@ def calculate_fov(game_map, x, y, radius):
                 if not (0 <= px < game_map.width and 0 <= py < game_map.height):
                     break
                 game_map.visible[py][px] = True
-                game_map.explored[py][px] = True
-                if game_map.tiles[py][px] in [game_map.tiles[py][px].__class__.WALL, game_map.tiles[py][px].__class__.TOWN_WALL]:
+                if not game_map.transparent[py][px]:
                     break  # Stop the ray at walls and town walls
+
+def _shadowcast(game_map, x, y, radius):
+    """Symmetric shadowcasting, scanning each octant row by row.
+    
+    Slopes are kept as integer (numerator, denominator) pairs so the scan stays
+    exact without Fraction overhead. A floor tile is lit only if its centre lies
+    inside the visible sector, which makes the result symmetric: if A sees B,
+    B sees A. Walls are lit whenever the sector touches them.
+    """
+    width, height = game_map.width, game_map.height
+    transparent = game_map.transparent
+    visible = game_map.visible
+    radius_squared = radius * radius
+    
+    for xx, xy, yx, yy in OCTANTS:
+        # Each row is (depth, start_num, start_den, end_num, end_den)
+        rows = [(1, 0, 1, 1, 1)]
+        while rows:
+            depth, start_n, start_d, end_n, end_d = rows.pop()
+            if depth > radius:
+                continue
+            
+            # Columns whose cells overlap the sector, rounding ties outward
+            min_col = (2 * depth * start_n + start_d) // (2 * start_d)
+            max_col = -((end_d - 2 * depth * end_n) // (2 * end_d))
+            
+            prev_wall = None
+            for col in range(min_col, max_col + 1):
+                tx = x + col * xx + depth * xy
+                ty = y + col * yx + depth * yy
+                in_bounds = 0 <= tx < width and 0 <= ty < height
+                is_wall = not in_bounds or not transparent[ty][tx]
+                
+                if in_bounds and col * col + depth * depth <= radius_squared:
+                    if is_wall or (col * start_d >= depth * start_n and col * end_d <= depth * end_n):
+                        visible[ty][tx] = True
+                
+                if prev_wall and not is_wall:
+                    # Leaving a wall run: narrow the sector's start
+                    start_n, start_d = 2 * col - 1, 2 * depth
+                elif prev_wall is False and is_wall:
+                    # Entering a wall run: scan the lit gap in the next row
+                    rows.append((depth + 1, start_n, start_d, 2 * col - 1, 2 * depth))
+                prev_wall = is_wall
+            
+            if prev_wall is False:
+                rows.append((depth + 1, start_n, start_d, end_n, end_d))
@@ -1,149 +1,465 @@
 import numpy as np
 import random
-from config import TileType, MAP_WIDTH, MAP_HEIGHT, MAX_ROOMS, MIN_ROOM_SIZE, MAX_ROOM_SIZE
+from config import TileType, TILE_WALKABLE, TILE_TRANSPARENT, MAP_WIDTH, MAP_HEIGHT, MAX_ROOMS, MIN_ROOM_SIZE, MAX_ROOM_SIZE
 from .room import Room
+from game.scheduler import TurnScheduler
 import heapq
+from collections import deque
+
+# Distance field value for tiles that cannot be reached from the origin
+UNREACHABLE = 1 << 30
+
+# Pathfinding moves (dx, dy, cost); diagonal steps cost more
+DIAGONAL_COST = 1.4
+PATH_DIRECTIONS = [(0, 1, 1.0), (1, 0, 1.0), (0, -1, 1.0), (-1, 0, 1.0),
+                   (1, 1, DIAGONAL_COST), (-1, -1, DIAGONAL_COST), (1, -1, DIAGONAL_COST), (-1, 1, DIAGONAL_COST)]
 
 class Map:
     def __init__(self, width, height, level=1):
         self.width = width
         self.height = height
         self.level = level  # Dungeon level number
-        self.tiles = np.full((height, width), TileType.WALL, dtype=object)
+        self.tiles = np.full((height, width), TileType.WALL, dtype=np.uint8)
+        # Per-tile properties, kept in sync with self.tiles by the tile setters
+        self.walkable = TILE_WALKABLE[self.tiles]
+        self.transparent = TILE_TRANSPARENT[self.tiles]
         self.rooms = []
+        # Entity spatial index: count of blocking entities and entities on each tile
+        self.blocking_occupancy = np.zeros((height, width), dtype=np.uint16)
+        self.entity_buckets = {}
         self.entities = []
+        self.monsters = None  # Optional MonsterStore holding this level's monsters
+        self.events = None  # The world's EventBus for combat events (see game/events.py)
+        # A* search buffers, allocated on the first get_path call and reused
+        self._path_cost = None
+        self._path_parent = None
+        self._path_closed = None
+        self.last_path_expansions = 0
+        # Shared distance field (Dijkstra map) toward the player, see get_distance_field
+        self.distance_field = np.full((height, width), UNREACHABLE, dtype=np.int32)
+        self.distance_field_key = None
         # FOV properties
         self.visible = np.full((height, width), False, dtype=bool)
         self.explored = np.full((height, width), False, dtype=bool)
+        # FOV cache: the last calculation is reused until the observer, radius
+        # or tile layout changes (tile_generation is bumped on every change)
+        self.tile_generation = 0
+        self.fov_key = None
+        self.newly_visible = set()  # Tiles that entered view on the last recompute
+        self.newly_hidden = set()   # Tiles that left view on the last recompute
+        self.previous_visible = np.full((height, width), False, dtype=bool)
+        self.newly_explored = set()  # Tiles first explored on the last recompute
+        # Exploration frontier: unexplored walkable tiles next to explored
+        # walkable ones, kept up to date from the tiles each FOV call explores
+        self.frontier = set()
+        self.frontier_mask = np.full((height, width), False, dtype=bool)
+        self.frontier_generation = None
         # Stairs positions
         self.up_stairs_position = None
         self.down_stairs_position = None
     
+    def attach_buffers(self, tiles, visible, explored):
+        """Move tiles, visible and explored into caller-owned arrays.
+        
+        The current contents are copied in once; after that the tile setters
+        and FOV write straight into the given arrays, so an observer holding
+        them sees every change without further copies.
+        """
+        np.copyto(tiles, self.tiles)
+        np.copyto(visible, self.visible)
+        np.copyto(explored, self.explored)
+        self.tiles, self.visible, self.explored = tiles, visible, explored
+    
+    def detach_buffers(self):
+        """Move tiles, visible and explored back into arrays owned by the map"""
+        self.tiles = self.tiles.copy()
+        self.visible = self.visible.copy()
+        self.explored = self.explored.copy()
+    
+    @property
+    def nbytes(self):
+        """Bytes held by the map's arrays (tiles, FOV, caches and search buffers)"""
+        return sum(value.nbytes for value in vars(self).values() if isinstance(value, np.ndarray))
+    
+    def mark_tiles_changed(self):
+        """Invalidate everything cached against the current tile layout"""
+        self.tile_generation += 1
+    
+    def set_tile(self, x, y, tile_type):
+        """Change a single tile and invalidate tile-dependent caches"""
+        self.tiles[y, x] = tile_type
+        self.walkable[y, x] = TILE_WALKABLE[tile_type]
+        self.transparent[y, x] = TILE_TRANSPARENT[tile_type]
+        self.mark_tiles_changed()
+    
+    def fill_rect(self, x1, y1, x2, y2, tile_type):
+        """Set every tile in the inclusive rectangle (x1, y1)-(x2, y2), clipped to the map"""
+        region = (slice(max(0, y1), min(self.height, y2 + 1)), slice(max(0, x1), min(self.width, x2 + 1)))
+        self.tiles[region] = tile_type
+        self.walkable[region] = TILE_WALKABLE[tile_type]
+        self.transparent[region] = TILE_TRANSPARENT[tile_type]
+        self.mark_tiles_changed()
+    
     def create_room(self, room):
         # Make the tiles in a room passable
-        for y in range(room.y1 + 1, room.y2):
-            for x in range(room.x1 + 1, room.x2):
-                self.tiles[y][x] = TileType.FLOOR
+        self.fill_rect(room.x1 + 1, room.y1 + 1, room.x2 - 1, room.y2 - 1, TileType.FLOOR)
     
     def create_h_tunnel(self, x1, x2, y):
         # Create a horizontal tunnel
-        for x in range(min(x1, x2), max(x1, x2) + 1):
-            self.tiles[y][x] = TileType.CORRIDOR
+        self.fill_rect(min(x1, x2), y, max(x1, x2), y, TileType.CORRIDOR)
     
     def create_v_tunnel(self, y1, y2, x):
         # Create a vertical tunnel
-        for y in range(min(y1, y2), max(y1, y2) + 1):
-            self.tiles[y][x] = TileType.CORRIDOR
+        self.fill_rect(x, min(y1, y2), x, max(y1, y2), TileType.CORRIDOR)
+    
+    @property
+    def entities(self):
+        return self._entities
+    
+    @entities.setter
+    def entities(self, entities):
+        # Assigning a new entity list rebuilds the spatial index from scratch
+        self._entities = entities
+        self.blocking_occupancy.fill(0)
+        self.entity_buckets = {}
+        for entity in entities:
+            self._index_entity(entity)
+        # ... and schedules the level's actors afresh, in list order
+        self.scheduler = TurnScheduler(entities)
+    
+    def _index_entity(self, entity):
+        self.entity_buckets.setdefault((entity.x, entity.y), []).append(entity)
+        if entity.blocks:
+            self.blocking_occupancy[entity.y, entity.x] += 1
+    
+    def _unindex_entity(self, entity):
+        bucket = self.entity_buckets[(entity.x, entity.y)]
+        bucket.remove(entity)
+        if not bucket:
+            del self.entity_buckets[(entity.x, entity.y)]
+        if entity.blocks:
+            self.blocking_occupancy[entity.y, entity.x] -= 1
+    
+    def add_entity(self, entity, index=None):
+        """Place an entity on the map (at index in the entity list, default last)"""
+        if index is None:
+            self._entities.append(entity)
+        else:
+            self._entities.insert(index, entity)
+        self._index_entity(entity)
+        self.scheduler.add(entity)
+    
+    def remove_entity(self, entity):
+        """Take an entity off the map (picked up, sold, etc.)"""
+        self._entities.remove(entity)
+        self._unindex_entity(entity)
+        self.scheduler.remove(entity)
+    
+    def move_entity(self, entity, x, y):
+        """Move an entity to (x, y), keeping the spatial index in sync"""
+        self._unindex_entity(entity)
+        entity.x = x
+        entity.y = y
+        self._index_entity(entity)
+    
+    def set_entity_blocks(self, entity, blocks):
+        """Change whether an entity blocks movement (e.g. when it dies)"""
+        self._unindex_entity(entity)
+        entity.blocks = blocks
+        self._index_entity(entity)
+    
+    def get_entities_at(self, x, y):
+        """Entities on tile (x, y); copy the list before adding or removing entities"""
+        return self.entity_buckets.get((x, y), [])
+    
+    def get_blocking_entity_at(self, x, y):
+        """The blocking entity on tile (x, y), or None"""
+        if self.blocking_occupancy[y, x]:
+            for entity in self.entity_buckets[(x, y)]:
+                if entity.blocks:
+                    return entity
+        return None
+    
+    def get_passable(self, ignore_entities=False):
+        """Mask of tiles that can be entered: walkable and, unless ignore_entities, free of blocking entities"""
+        if ignore_entities:
+            return self.walkable
+        return self.walkable & (self.blocking_occupancy == 0)
     
     def is_blocked(self, x, y):
-        # First test the map tile
-        if self.tiles[y][x] in [TileType.WALL, TileType.TOWN_WALL]:
-            return True
+        # Blocked by the map tile or by a blocking entity
+        return not self.walkable[y, x] or self.blocking_occupancy[y, x] > 0
+    
+    def get_unexplored_tiles(self, explored_only=False):
+        """Returns a list of unexplored tiles that are adjacent to explored tiles.
         
-        # Now check for any blocking entities
-        for entity in self.entities:
-            if entity.blocks and entity.x == x and entity.y == y:
-                return True
+        This scans the whole map; it is kept as the reference for the
+        incrementally maintained frontier (see get_frontier).
+        """
+        unexplored = self.walkable & ~self.explored
         
-        return False
+        # If we only want unexplored tiles adjacent to explored tiles
+        if explored_only:
+            # Explored tiles the player could stand on
+            unexplored &= self._dilate(self.explored & self.walkable & (self.blocking_occupancy == 0))
+        
+        frontier_y, frontier_x = np.nonzero(unexplored)
+        return list(zip(frontier_x.tolist(), frontier_y.tolist()))
     
-    def get_unexplored_tiles(self, explored_only=False):
-        """Returns a list of unexplored tiles that are adjacent to explored tiles"""
-        frontier_tiles = []
-        for y in range(self.height):
-            for x in range(self.width):
-                # Only consider floor and corridor tiles 
-                if self.tiles[y][x] in [TileType.FLOOR, TileType.CORRIDOR, TileType.STAIRS_DOWN, TileType.STAIRS_UP]:
-                    # If we only want unexplored tiles adjacent to explored tiles
-                    if explored_only:
-                        if not self.explored[y][x]:
-                            # Check if adjacent to any explored tiles
-                            is_adjacent_to_explored = False
-                            for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0), (1, 1), (-1, -1), (1, -1), (-1, 1)]:
-                                nx, ny = x + dx, y + dy
-                                if (0 <= nx < self.width and 0 <= ny < self.height and 
-                                    self.explored[ny][nx] and not self.is_blocked(nx, ny)):
-                                    is_adjacent_to_explored = True
-                                    break
-                            if is_adjacent_to_explored:
-                                frontier_tiles.append((x, y))
-                    # If we want all unexplored tiles
-                    elif not self.explored[y][x]:
-                        frontier_tiles.append((x, y))
-        return frontier_tiles
-    
-    def get_path(self, start_x, start_y, target_x, target_y):
-        """A* pathfinding algorithm to find a path from start to target"""
-        # Define the heuristic (Manhattan distance)
-        def heuristic(x, y):
-            return abs(x - target_x) + abs(y - target_y)
-        
-        # Define possible movements (including diagonals)
-        directions = [(0, 1), (1, 0), (0, -1), (-1, 0), (1, 1), (-1, -1), (1, -1), (-1, 1)]
-        
-        # Priority queue for A*
-        frontier = []
-        heapq.heappush(frontier, (0, (start_x, start_y)))
-        
-        # Dict to track where we came from
-        came_from = {(start_x, start_y): None}
-        
-        # Dict to track the cost to reach each position
-        cost_so_far = {(start_x, start_y): 0}
+    def _dilate(self, mask):
+        """Grow a boolean mask by one tile in all 8 directions"""
+        padded = np.pad(mask, 1)
+        adjacent = np.zeros_like(mask)
+        for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0), (1, 1), (-1, -1), (1, -1), (-1, 1)]:
+            adjacent |= padded[1 + dy:1 + dy + self.height, 1 + dx:1 + dx + self.width]
+        return adjacent
+    
+    def rebuild_frontier(self):
+        """Recompute the exploration frontier from scratch.
+        
+        Needed after the tile layout changes or explored is modified directly;
+        get_frontier and update_frontier do it automatically for tile changes.
+        """
+        self.frontier_mask = self.walkable & ~self.explored & self._dilate(self.explored & self.walkable)
+        frontier_y, frontier_x = np.nonzero(self.frontier_mask)
+        self.frontier = set(zip(frontier_x.tolist(), frontier_y.tolist()))
+        self.frontier_generation = self.tile_generation
+    
+    def update_frontier(self, newly_explored):
+        """Fold tiles that just became explored into the frontier.
+        
+        A newly explored tile leaves the frontier, and if it is walkable its
+        unexplored walkable neighbours join it, so the cost is proportional to
+        the number of new tiles rather than the map size.
+        """
+        if self.frontier_generation != self.tile_generation:
+            self.rebuild_frontier()  # The explored mask already includes the new tiles
+            return
+        
+        frontier = self.frontier
+        frontier_mask = self.frontier_mask
+        walkable = self.walkable
+        explored = self.explored
+        
+        for x, y in newly_explored:
+            if frontier_mask[y, x]:
+                frontier_mask[y, x] = False
+                frontier.discard((x, y))
+            if not walkable[y, x]:
+                continue
+            for dx, dy, _ in PATH_DIRECTIONS:
+                nx, ny = x + dx, y + dy
+                if (0 <= nx < self.width and 0 <= ny < self.height and
+                        walkable[ny, nx] and not explored[ny, nx] and not frontier_mask[ny, nx]):
+                    frontier_mask[ny, nx] = True
+                    frontier.add((nx, ny))
+    
+    def get_frontier(self):
+        """Returns the set of (x, y) frontier tiles, maintained incrementally.
+        
+        Unlike get_unexplored_tiles(explored_only=True) this ignores entities:
+        a tile next to explored ground counts even if a monster stands there.
+        The same tiles are available as a boolean array in frontier_mask.
+        """
+        if self.frontier_generation != self.tile_generation:
+            self.rebuild_frontier()
+        return self.frontier
+    
+    def get_path(self, start_x, start_y, target_x, target_y, max_nodes=None, max_cost=None, ignore_entities=False):
+        """A* pathfinding algorithm to find a path from start to target.
+        
+        Works on flat tile indices with cost/parent buffers that are reused
+        between calls. max_nodes caps the number of expanded nodes and max_cost
+        the path length; if either budget runs out no path is returned. The
+        number of nodes expanded is left in self.last_path_expansions. With
+        ignore_entities the path may run through blocking entities.
+        """
+        width, height = self.width, self.height
+        start = start_y * width + start_x
+        target = target_y * width + target_x
+        
+        self._reset_search_buffers()
+        # Memoryviews give the inner loop plain Python scalars instead of NumPy ones
+        cost = memoryview(self._path_cost)
+        parent = memoryview(self._path_parent)
+        closed = memoryview(self._path_closed)
+        
+        # Precompute which tiles can be entered (no wall and no blocking entity)
+        passable = memoryview(self.get_passable(ignore_entities).ravel())
+        
+        # Octile distance, consistent with the 1.0 / 1.4 move costs
+        diagonal_saving = 2.0 - DIAGONAL_COST
+        
+        cost[start] = 0.0
+        frontier = [(0.0, 0.0, start)]
+        expansions = 0
         
         while frontier:
-            _, current = heapq.heappop(frontier)
-            current_x, current_y = current
+            _, _, current = heapq.heappop(frontier)
+            if closed[current]:
+                continue  # Stale queue entry for a node we already expanded
             
             # If we reached the goal
-            if current_x == target_x and current_y == target_y:
+            if current == target:
+                break
+            
+            closed[current] = True
+            expansions += 1
+            if max_nodes is not None and expansions > max_nodes:
                 break
             
-            for dx, dy in directions:
+            current_y, current_x = divmod(current, width)
+            current_cost = cost[current]
+            
+            for dx, dy, movement_cost in PATH_DIRECTIONS:
                 next_x, next_y = current_x + dx, current_y + dy
                 
-                # Check if the next position is valid
-                if not (0 <= next_x < self.width and 0 <= next_y < self.height):
+                # Check if the next position is on the map and can be entered
+                if not (0 <= next_x < width and 0 <= next_y < height):
                     continue
-                    
-                # Check if the next position is blocked
-                if self.is_blocked(next_x, next_y):
+                neighbor = next_y * width + next_x
+                if closed[neighbor] or not passable[neighbor]:
                     continue
                 
-                # Calculate the cost to move to the next position (diagonal moves cost more)
-                movement_cost = 1.0 if dx == 0 or dy == 0 else 1.4
-                new_cost = cost_so_far[current] + movement_cost
+                new_cost = current_cost + movement_cost
+                if max_cost is not None and new_cost > max_cost:
+                    continue
                 
                 # If we haven't been here before or found a better path
-                if (next_x, next_y) not in cost_so_far or new_cost < cost_so_far[(next_x, next_y)]:
-                    cost_so_far[(next_x, next_y)] = new_cost
-                    priority = new_cost + heuristic(next_x, next_y)
-                    heapq.heappush(frontier, (priority, (next_x, next_y)))
-                    came_from[(next_x, next_y)] = current
+                if new_cost < cost[neighbor]:
+                    cost[neighbor] = new_cost
+                    parent[neighbor] = current
+                    h_dx = abs(next_x - target_x)
+                    h_dy = abs(next_y - target_y)
+                    heuristic = h_dx + h_dy - diagonal_saving * (h_dx if h_dx < h_dy else h_dy)
+                    # Break f ties toward the deeper node to avoid flooding open rooms
+                    heapq.heappush(frontier, (new_cost + heuristic, -new_cost, neighbor))
+        
+        self.last_path_expansions = expansions
         
         # Reconstruct the path
-        if (target_x, target_y) not in came_from:
+        if target == start or parent[target] < 0 or (max_nodes is not None and expansions > max_nodes):
             return []  # No path found
+        return self._trace_path(start, target)
+    
+    def get_explore_path(self, start_x, start_y, ignore_entities=False):
+        """Path to the nearest reachable unexplored tile, found with one BFS.
+        
+        The search walks outward from the start through explored tiles that can
+        be entered and stops at the first unexplored walkable tile it reaches,
+        i.e. the closest frontier tile by walking distance. Returns [] when no
+        unexplored tile can be reached. With ignore_entities the path may run
+        through blocking entities.
+        """
+        if not self.get_frontier():
+            return []  # Everything reachable has been explored
+        
+        width, height = self.width, self.height
+        start = start_y * width + start_x
+        
+        self._reset_search_buffers()
+        parent = memoryview(self._path_parent)
+        passable = memoryview(self.get_passable(ignore_entities).ravel())
+        explored = memoryview(self.explored.ravel())
+        
+        parent[start] = start
+        queue = deque([start])
+        target = None
+        expansions = 0
+        
+        while queue and target is None:
+            current = queue.popleft()
+            expansions += 1
+            current_y, current_x = divmod(current, width)
             
+            for dx, dy, _ in PATH_DIRECTIONS:
+                next_x, next_y = current_x + dx, current_y + dy
+                if not (0 <= next_x < width and 0 <= next_y < height):
+                    continue
+                neighbor = next_y * width + next_x
+                if parent[neighbor] >= 0 or not passable[neighbor]:
+                    continue
+                
+                parent[neighbor] = current
+                if not explored[neighbor]:
+                    target = neighbor  # Nearest frontier tile
+                    break
+                queue.append(neighbor)
+        
+        self.last_path_expansions = expansions
+        
+        if target is None:
+            return []  # Nothing left to explore from here
+        return self._trace_path(start, target)
+    
+    def _reset_search_buffers(self):
+        """Clear the buffers shared by the path searches, allocating them on first use"""
+        if self._path_cost is None:
+            self._path_cost = np.empty(self.width * self.height, dtype=np.float64)
+            self._path_parent = np.empty(self.width * self.height, dtype=np.int32)
+            self._path_closed = np.empty(self.width * self.height, dtype=bool)
+        self._path_cost.fill(np.inf)
+        self._path_parent.fill(-1)
+        self._path_closed.fill(False)
+    
+    def _trace_path(self, start, target):
+        """Follow the parent buffer back from target to start, returning (x, y) steps"""
+        parent = memoryview(self._path_parent)
         path = []
-        current = (target_x, target_y)
-        while current != (start_x, start_y):
-            path.append(current)
-            current = came_from[current]
+        current = target
+        while current != start:
+            current_y, current_x = divmod(current, self.width)
+            path.append((current_x, current_y))
+            current = parent[current]
         
         # Reverse the path to get from start to end
         path.reverse()
         return path
     
-    def generate(self):
-        # Generate a dungeon map
+    def get_distance_field(self, x, y):
+        """Steps from (x, y) to every walkable tile, as a (height, width) array.
+        
+        Computed with a breadth-first search over 8-connected walkable tiles,
+        ignoring entities. All monsters chasing the player read the same field,
+        which is only rebuilt when the origin moves or the tile layout changes.
+        Tiles that cannot be reached hold UNREACHABLE.
+        """
+        field_key = (x, y, self.tile_generation)
+        if field_key == self.distance_field_key:
+            return self.distance_field
+        
+        width, height = self.width, self.height
+        self.distance_field.fill(UNREACHABLE)
+        distances = memoryview(self.distance_field.reshape(-1))
+        walkable = memoryview(self.walkable.reshape(-1))
+        
+        origin = y * width + x
+        distances[origin] = 0
+        queue = deque([origin])
+        while queue:
+            current = queue.popleft()
+            current_y, current_x = divmod(current, width)
+            next_distance = distances[current] + 1
+            for dx, dy, _ in PATH_DIRECTIONS:
+                next_x, next_y = current_x + dx, current_y + dy
+                if 0 <= next_x < width and 0 <= next_y < height:
+                    neighbor = next_y * width + next_x
+                    if walkable[neighbor] and distances[neighbor] == UNREACHABLE:
+                        distances[neighbor] = next_distance
+                        queue.append(neighbor)
+        
+        self.distance_field_key = field_key
+        return self.distance_field
+    
+    def generate(self, rng=random):
+        # Generate a dungeon map, drawing from rng (a random.Random or the random module)
         for r in range(MAX_ROOMS):
             # Random width and height
-            w = random.randint(MIN_ROOM_SIZE, MAX_ROOM_SIZE)
-            h = random.randint(MIN_ROOM_SIZE, MAX_ROOM_SIZE)
+            w = rng.randint(MIN_ROOM_SIZE, MAX_ROOM_SIZE)
+            h = rng.randint(MIN_ROOM_SIZE, MAX_ROOM_SIZE)
             # Random position without going out of the boundaries of the map
-            x = random.randint(0, self.width - w - 1)
-            y = random.randint(0, self.height - h - 1)
+            x = rng.randint(0, self.width - w - 1)
+            y = rng.randint(0, self.height - h - 1)
             
             new_room = Room(x, y, w, h)
             
@@ -163,7 +479,7 @@ class Map:
                 new_x, new_y = new_room.center_x, new_room.center_y
                 
                 # 50% chance of going horizontal first, then vertical
-                if random.random() < 0.5:
+                if rng.random() < 0.5:
                     self.create_h_tunnel(prev_x, new_x, prev_y)
                     self.create_v_tunnel(prev_y, new_y, new_x)
                 else:
@@ -56,10 +56,10 @@ class Building:
             self.y2 >= center_y - square_with_buffer
         )
 
-def generate_town_map(map_obj):
-    """Generate a town map with buildings and grass"""
+def generate_town_map(map_obj, rng=random):
+    """Generate a town map with buildings and grass, drawing from rng"""
     # Fill the map with grass
-    map_obj.tiles = np.full((map_obj.height, map_obj.width), TileType.GRASS, dtype=object)
+    map_obj.fill_rect(0, 0, map_obj.width - 1, map_obj.height - 1, TileType.GRASS)
     
     # Set the entire town map to explored
     map_obj.explored = np.full((map_obj.height, map_obj.width), True, dtype=bool)
@@ -82,15 +82,15 @@ def generate_town_map(map_obj):
     # Place buildings at random positions
     for building_type in building_types:
         # Random width and height for each building
-        width = random.randint(8, 12)
-        height = random.randint(6, 8)
+        width = rng.randint(8, 12)
+        height = rng.randint(6, 8)
         
         # Try to place the building without overlapping with existing buildings or town square
         max_attempts = 100  # Increased attempts for more flexibility
         for _ in range(max_attempts):
             # Random position
-            x = random.randint(5, map_obj.width - width - 5)
-            y = random.randint(5, map_obj.height - height - 5)
+            x = rng.randint(5, map_obj.width - width - 5)
+            y = rng.randint(5, map_obj.height - height - 5)
             
             new_building = Building(x, y, width, height, building_type)
             
@@ -105,39 +105,30 @@ def generate_town_map(map_obj):
             # Place the building
             buildings.append(new_building)
             
-            # Create the building walls
-            for build_y in range(new_building.y1, new_building.y2 + 1):
-                for build_x in range(new_building.x1, new_building.x2 + 1):
-                    # Check bounds
-                    if 0 <= build_x < map_obj.width and 0 <= build_y < map_obj.height:
-                        # Set walls around the perimeter
-                        if (build_x == new_building.x1 or build_x == new_building.x2 or 
-                            build_y == new_building.y1 or build_y == new_building.y2):
-                            map_obj.tiles[build_y][build_x] = TileType.TOWN_WALL
-                        # Set floor inside the building
-                        else:
-                            map_obj.tiles[build_y][build_x] = TileType.FLOOR
+            # Create the building walls, then hollow out the floor inside the perimeter
+            map_obj.fill_rect(new_building.x1, new_building.y1, new_building.x2, new_building.y2, TileType.TOWN_WALL)
+            map_obj.fill_rect(new_building.x1 + 1, new_building.y1 + 1, new_building.x2 - 1, new_building.y2 - 1, TileType.FLOOR)
             
             # Create a door on a random side of the building
             sides = ["north", "east", "south", "west"]
-            door_side = random.choice(sides)
+            door_side = rng.choice(sides)
             
             if door_side == "north":
-                door_x = random.randint(new_building.x1 + 1, new_building.x2 - 1)
+                door_x = rng.randint(new_building.x1 + 1, new_building.x2 - 1)
                 door_y = new_building.y1
             elif door_side == "east":
                 door_x = new_building.x2
-                door_y = random.randint(new_building.y1 + 1, new_building.y2 - 1)
+                door_y = rng.randint(new_building.y1 + 1, new_building.y2 - 1)
             elif door_side == "south":
-                door_x = random.randint(new_building.x1 + 1, new_building.x2 - 1)
+                door_x = rng.randint(new_building.x1 + 1, new_building.x2 - 1)
                 door_y = new_building.y2
             else:  # west
                 door_x = new_building.x1
-                door_y = random.randint(new_building.y1 + 1, new_building.y2 - 1)
+                door_y = rng.randint(new_building.y1 + 1, new_building.y2 - 1)
             
             # Set the door
             if 0 <= door_x < map_obj.width and 0 <= door_y < map_obj.height:
-                map_obj.tiles[door_y][door_x] = TileType.FLOOR
+                map_obj.set_tile(door_x, door_y, TileType.FLOOR)
                 new_building.door_x = door_x
                 new_building.door_y = door_y
             
@@ -147,13 +138,11 @@ def generate_town_map(map_obj):
     # Create a spot in the center of the town for the stairs down to the dungeon
     
     # Create a small stone platform around the stairs
-    for py in range(center_y - town_square_size, center_y + town_square_size + 1):
-        for px in range(center_x - town_square_size, center_x + town_square_size + 1):
-            if 0 <= px < map_obj.width and 0 <= py < map_obj.height:
-                map_obj.tiles[py][px] = TileType.FLOOR
+    map_obj.fill_rect(center_x - town_square_size, center_y - town_square_size,
+                      center_x + town_square_size, center_y + town_square_size, TileType.FLOOR)
     
     # Place the stairs in the center
-    map_obj.tiles[center_y][center_x] = TileType.STAIRS_DOWN
+    map_obj.set_tile(center_x, center_y, TileType.STAIRS_DOWN)
     map_obj.down_stairs_position = (center_x, center_y)
     
     # Save the buildings in the map object for interaction
@@ -193,7 +182,7 @@ def generate_town_map(map_obj):
             shop_area
         )
         
-        shopkeeper_fighter = Fighter(hp=20, armor=2, damage_dice=(1, 6))
+        shopkeeper_fighter = Fighter(hp=20, armor=2, damage_dice=(1, 6), rng=rng)
         # Set moderate dodge for shopkeeper
         shopkeeper_fighter.dodge = 15
         
@@ -215,7 +204,7 @@ def generate_town_map(map_obj):
         from data.items import create_item, ITEM_PRICES
         
         # Generate 3-6 random items appropriate for the shop type
-        num_items = random.randint(3, 6)
+        num_items = rng.randint(3, 6)
         
         # Available item types based on shop type
         if building.building_type == BuildingType.WEAPONSMITH:
@@ -237,12 +226,12 @@ def generate_town_map(map_obj):
                 break
                 
             # Choose random item from available items
-            item_name = random.choice(available_items)
+            item_name = rng.choice(available_items)
             available_items.remove(item_name)
             
             # Choose random position inside shop
-            item_x = random.randint(building.x1 + 1, building.x2 - 1)
-            item_y = random.randint(building.y1 + 1, building.y2 - 1)
+            item_x = rng.randint(building.x1 + 1, building.x2 - 1)
+            item_y = rng.randint(building.y1 + 1, building.y2 - 1)
             
             # Create the item
             item = create_item(item_name, item_x, item_y)
@@ -297,8 +286,7 @@ def force_shopkeeper_aside(shopkeeper, game_map):
         new_y = max(y1, min(y2, new_y))
         
         # Force the move
-        shopkeeper.x = new_x
-        shopkeeper.y = new_y
+        shopkeeper.force_move(new_x, new_y, game_map)
         shopkeeper.ai.is_in_doorway = False
         print(f"Moving shopkeeper to ({new_x}, {new_y})")
         return True
@@ -330,15 +318,13 @@ def force_shopkeeper_aside(shopkeeper, game_map):
         print(f"Trying position: ({new_x}, {new_y})")
         
         # Force shopkeeper to move
-        shopkeeper.x = new_x
-        shopkeeper.y = new_y
+        shopkeeper.force_move(new_x, new_y, game_map)
         shopkeeper.ai.is_in_doorway = False
         print(f"Moving shopkeeper to ({new_x}, {new_y})")
         return True
     
     # If no positions are valid (should never happen), move to center
     print(f"No valid positions found. Moving to center ({center_x}, {center_y})")
-    shopkeeper.x = center_x
-    shopkeeper.y = center_y
+    shopkeeper.force_move(center_x, center_y, game_map)
     shopkeeper.ai.is_in_doorway = False
     return True 
\ No newline at end of file
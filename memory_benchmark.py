@@ -0,0 +1,65 @@
+"""Memory benchmark for entities.
+
+Generates a dungeon level, then fills every walkable tile with an entity:
+monsters made the way place_entities makes them, alternating with weapons
+and potions. Reports the bytes allocated per entity, measured with
+tracemalloc. No display is needed.
+
+Run from the repository root, e.g.  python memory_benchmark.py --level 5
+"""
+import argparse
+import random
+import tracemalloc
+
+from config import MAP_WIDTH, MAP_HEIGHT, EntityType, WHITE
+from map.map import Map
+from entities.entity import Entity
+from entities.components.fighter import Fighter
+from entities.components.ai import BasicMonster
+from data.items import create_item
+from data.monsters import MONSTERS
+
+def populate(game_map, rng):
+    """Put a monster, weapon or potion on every walkable tile; returns the entities"""
+    monsters = list(MONSTERS.values())
+    entities = []
+    for index, (y, x) in enumerate(zip(*game_map.walkable.nonzero())):
+        x, y = int(x), int(y)
+        if index % 3 == 0:
+            monster_data = rng.choice(monsters)
+            fighter_component = Fighter(hp=8, armor=monster_data.armor, damage_dice=monster_data.damage_dice, rng=rng)
+            fighter_component.dodge = monster_data.dodge
+            entity = Entity(x, y, monster_data.char, WHITE, EntityType.ENEMY, monster_data.name, blocks=True,
+                            fighter=fighter_component, ai=BasicMonster(), monster_data=monster_data)
+        elif index % 3 == 1:
+            entity = create_item('short_sword', x, y)
+        else:
+            entity = create_item('healing_potion', x, y)
+        entities.append(entity)
+    return entities
+
+def measure(level, seed):
+    """Return (entity count, bytes allocated by populate)"""
+    rng = random.Random(seed)
+    game_map = Map(MAP_WIDTH, MAP_HEIGHT, level)
+    game_map.generate(rng)
+    
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entities = populate(game_map, rng)
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return len(entities), allocated
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure memory per entity on a fully populated level.")
+    parser.add_argument('--level', type=int, default=1, help="dungeon level to generate")
+    parser.add_argument('--seed', type=int, default=0, help="seed for the map and the entity choices")
+    args = parser.parse_args()
+    
+    count, allocated = measure(args.level, args.seed)
+    print(f"{count} entities on a {MAP_WIDTH}x{MAP_HEIGHT} level: {allocated / 1024:,.1f} KiB, "
+          f"{allocated / count:,.0f} bytes per entity")
+
+if __name__ == "__main__":
+    main()
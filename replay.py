@@ -0,0 +1,102 @@
+"""Deterministic input-log recording and replay.
+
+RecordingEnv records env episodes into InputLogs (game/input_log.py); main.py
+records interactive games the same way. Replayer re-simulates a log headless
+through CrimsonDepthsEnv, keeping a state keyframe every keyframe_interval
+turns so seek(turn) only replays the tail.
+
+Replay a saved log from the repository root:  python replay.py game.cdlog
+"""
+import argparse
+import bisect
+import time
+
+from env import CrimsonDepthsEnv
+from game.input_log import InputLog, NUM_ACTIONS
+
+class RecordingEnv(CrimsonDepthsEnv):
+    """CrimsonDepthsEnv that records every episode into self.log"""
+    def __init__(self, max_depth=20, max_turns=20000, buffers=None):
+        super().__init__(max_depth, max_turns, buffers)
+        self.log = None
+    
+    def reset(self, seed=None):
+        result = super().reset(seed)
+        # Record the seed the world actually used, so unseeded games replay too
+        self.log = InputLog(self.game_world.seed, self.max_depth, self.max_turns)
+        return result
+    
+    def step(self, action):
+        if not 0 <= action < NUM_ACTIONS:
+            raise ValueError(f"Invalid action: {action}")
+        self.log.actions.append(action)
+        return super().step(action)
+
+class Replayer:
+    """Re-simulates an InputLog with keyframes for seeking.
+    
+    Keyframe i holds the state after keyframe_times[i] actions. They are
+    taken while playing forward, so seeking backwards or to any turn already
+    passed costs at most keyframe_interval replayed actions.
+    """
+    def __init__(self, log, keyframe_interval=500):
+        self.log = log
+        self.keyframe_interval = keyframe_interval
+        self.env = CrimsonDepthsEnv(log.max_depth, log.max_turns)
+        self.env.reset(log.seed)
+        self.position = 0  # Number of logged actions applied so far
+        self.keyframe_times = [0]
+        self.keyframes = [self.env.get_state()]
+    
+    def step(self):
+        """Apply the next logged action; returns the env's step result"""
+        result = self.env.step(self.log.actions[self.position])
+        self.position += 1
+        if self.position % self.keyframe_interval == 0 and self.position > self.keyframe_times[-1]:
+            self.keyframe_times.append(self.position)
+            self.keyframes.append(self.env.get_state())
+        return result
+    
+    def fast_forward(self, position=None):
+        """Replay up to position (default: the end of the log) as fast as possible.
+        
+        Never replays past the first UNREPLAYABLE command.
+        """
+        end = self.log.replayable_length()
+        if position is not None:
+            end = min(position, end)
+        while self.position < end:
+            self.step()
+        return self.env.observation
+    
+    def seek(self, position):
+        """Jump to the state after position actions, starting from the nearest keyframe"""
+        index = bisect.bisect_right(self.keyframe_times, position) - 1
+        # Only restore if the keyframe is closer than where we already are
+        if not self.keyframe_times[index] <= self.position <= position:
+            self.env.set_state(self.keyframes[index])
+            self.position = self.keyframe_times[index]
+        return self.fast_forward(position)
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a Crimson Depths input log headless.")
+    parser.add_argument('log', help="input log file")
+    parser.add_argument('--keyframe-interval', type=int, default=500, help="actions between state keyframes")
+    args = parser.parse_args()
+    
+    log = InputLog.load(args.log)
+    start_time = time.perf_counter()
+    replayer = Replayer(log, args.keyframe_interval)
+    replayer.fast_forward()
+    elapsed = time.perf_counter() - start_time
+    
+    env = replayer.env
+    print(f"Seed {log.seed}: {replayer.position} actions replayed in {elapsed:.2f}s "
+          f"({replayer.position / max(elapsed, 1e-9):,.0f} turns/s)")
+    if replayer.position < len(log.actions):
+        print(f"Stopped at action {replayer.position} of {len(log.actions)}: the game has no action code for it")
+    print(f"Depth {env.depth}, HP {env.player.fighter.hp}/{env.player.fighter.max_hp}, XP {env.player.fighter.xp}")
+    env.close()
+
+if __name__ == "__main__":
+    main()
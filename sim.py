@@ -0,0 +1,243 @@
+"""Headless batch simulation of Crimson Depths.
+
+Plays seeded games with a scripted policy (auto-explore, shoot or bump-attack
+monsters and fight through any blocking the way, drink a potion when hurt,
+descend once a level is explored) and reports throughput, depth reached,
+cause of death and where the time went. No display is needed.
+
+Run from the repository root, e.g.  python sim.py --games 1000 --workers 8
+"""
+import argparse
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from config import ItemType
+from map.fov import calculate_fov
+from entities.components.ai import BasicMonster
+from game.world import GameWorld
+from game.player import create_player, pick_up_items
+from game.events import Death
+from ui.message_log import MessageLog
+
+# Subsystems timed separately in every game
+SUBSYSTEMS = ('levelgen', 'fov', 'policy', 'player', 'ai')
+
+# Drink a healing potion at or below this fraction of max HP
+HEAL_THRESHOLD = 1 / 3
+
+# End a game as 'stuck' after this many waits in a row
+STUCK_TURNS = 100
+
+class SimResult:
+    """Outcome of one simulated game"""
+    def __init__(self, seed, turns, depth, cause, player_level, xp, kills, elapsed, timings):
+        self.seed = seed
+        self.turns = turns
+        self.depth = depth                # Deepest dungeon level reached
+        self.cause = cause                # Name of the killer, or why the game stopped
+        self.player_level = player_level
+        self.xp = xp
+        self.kills = kills                # Monsters the player killed
+        self.elapsed = elapsed            # Wall time for the whole game in seconds
+        self.timings = timings            # Seconds spent per subsystem
+
+def is_hostile(entity):
+    """Monsters the policy fights (shopkeepers are left alone)"""
+    return entity.fighter is not None and isinstance(entity.ai, BasicMonster)
+
+def choose_action(player, game_map, path):
+    """Pick the player's next action.
+    
+    Returns ('attack' | 'move', dx, dy), ('shoot', target, ranged_weapon), ('heal', potion),
+    ('descend',) or ('wait',).
+    path is the auto-explore path being followed and is updated in place.
+    """
+    fighter = player.fighter
+    
+    # Drink a potion when badly hurt
+    if fighter.hp <= fighter.max_hp * HEAL_THRESHOLD:
+        potion = player.inventory.find_item_by_type(ItemType.CONSUMABLE)
+        if potion and potion.item and potion.item.use_function:
+            return ('heal', potion)
+    
+    # Shoot the closest visible monster in range, like Quick Fire
+    ranged_weapon = player.inventory.get_equipped_ranged_weapon()
+    if ranged_weapon and player.inventory.has_ammo_for_weapon():
+        targets = [entity for entity in game_map.entities if is_hostile(entity) and game_map.visible[entity.y, entity.x]]
+        if targets:
+            target = min(targets, key=lambda entity: max(abs(entity.x - player.x), abs(entity.y - player.y)))
+            if max(abs(target.x - player.x), abs(target.y - player.y)) <= ranged_weapon.item.weapon_data.range:
+                return ('shoot', target, ranged_weapon)
+    
+    # Otherwise bump-attack an adjacent monster
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            x, y = player.x + dx, player.y + dy
+            if (dx or dy) and 0 <= x < game_map.width and 0 <= y < game_map.height:
+                target = game_map.get_blocking_entity_at(x, y)
+                if target is not None and is_hostile(target):
+                    return ('attack', dx, dy)
+    
+    # Keep following the current path while its next step is free
+    if path and game_map.is_blocked(*path[0]):
+        path.clear()
+    
+    stairs = game_map.down_stairs_position
+    if stairs is not None and not game_map.explored[stairs[1], stairs[0]]:
+        stairs = None  # Not found yet
+    
+    if not path:
+        path.extend(game_map.get_explore_path(player.x, player.y))
+    
+    if not path and stairs is not None:
+        # Level explored (or the way is blocked): head for the stairs down
+        if (player.x, player.y) == stairs:
+            return ('descend',)
+        path.extend(game_map.get_path(player.x, player.y, stairs[0], stairs[1]))
+    
+    if not path:
+        # Monsters block every way on: plan through them and fight along the route
+        path.extend(game_map.get_explore_path(player.x, player.y, ignore_entities=True))
+        if not path and stairs is not None:
+            path.extend(game_map.get_path(player.x, player.y, stairs[0], stairs[1], ignore_entities=True))
+    
+    if not path or game_map.is_blocked(*path[0]):
+        # Nowhere left to go, or someone who can't be fought stands in the way
+        path.clear()
+        return ('wait',)
+    
+    next_x, next_y = path.pop(0)
+    return ('move', next_x - player.x, next_y - player.y)
+
+def simulate_game(seed, max_depth=20, max_turns=20000):
+    """Play one game with the scripted policy and return a SimResult"""
+    timings = dict.fromkeys(SUBSYSTEMS, 0.0)
+    start_time = time.perf_counter()
+    
+    message_log = MessageLog()
+    
+    clock = time.perf_counter()
+    game_world = GameWorld(max_levels=max_depth, seed=seed)
+    game_map, _ = game_world.get_current_level()
+    player = create_player(game_world, game_map, message_log)
+    game_world.attach_player(player)
+    timings['levelgen'] += time.perf_counter() - clock
+    
+    # Combat is only counted, never formatted into messages
+    kills = []
+    def count_kill(event):
+        if event.killer is player:
+            kills.append(event.name)
+    game_world.events.subscribe(Death, count_kill)
+    
+    fov_radius = 20  # Town
+    path = []
+    depth = 0
+    cause = 'turn limit'
+    turns = 0
+    waits = 0  # Waits in a row
+    
+    while turns < max_turns:
+        clock = time.perf_counter()
+        calculate_fov(game_map, player.x, player.y, fov_radius)
+        timings['fov'] += time.perf_counter() - clock
+        
+        clock = time.perf_counter()
+        action = choose_action(player, game_map, path)
+        timings['policy'] += time.perf_counter() - clock
+        
+        waits = waits + 1 if action[0] == 'wait' else 0
+        if waits > STUCK_TURNS:
+            cause = 'stuck'  # Nothing to do but wait, e.g. walled in by shopkeepers
+            break
+        
+        clock = time.perf_counter()
+        if action[0] == 'descend':
+            game_world.go_down_stairs(player)
+            game_map, _ = game_world.get_current_level()
+            depth = max(depth, game_world.current_level)
+            fov_radius = 10
+            path.clear()
+            timings['levelgen'] += time.perf_counter() - clock
+            if depth >= max_depth:
+                cause = 'max depth'  # The bottom level has no stairs down
+                break
+            continue  # Changing level doesn't cost a turn
+        elif action[0] == 'heal':
+            action[1].item.use(player, message_log, game_map)
+        elif action[0] == 'shoot':
+            player.inventory.use_ammo()
+            player.fighter.shoot(action[1], action[2].item.damage_dice, message_log, game_map)
+        elif action[0] in ('attack', 'move'):
+            player.move(action[1], action[2], game_map, message_log)
+            pick_up_items(player, game_map, message_log)
+        timings['player'] += time.perf_counter() - clock
+        
+        turns += 1
+        
+        # Enemy turns, stopping at the blow that kills the player
+        clock = time.perf_counter()
+        killer = game_world.advance_turn(player, message_log)
+        if killer is not None:
+            cause = killer.name
+        timings['ai'] += time.perf_counter() - clock
+        
+        if player.fighter.hp <= 0:
+            break
+    
+    game_world.close()
+    return SimResult(seed, turns, depth, cause, player.fighter.level, player.fighter.xp, len(kills),
+                     time.perf_counter() - start_time, timings)
+
+def run_batch(seeds, workers=None, max_depth=20, max_turns=20000):
+    """Play every seed on a process pool and return the SimResults in seed order"""
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(simulate_game, seed, max_depth, max_turns) for seed in seeds]
+        return [future.result() for future in futures]
+
+def format_report(results, wall_time):
+    """Summarize a batch: throughput, depth, causes of death and per-subsystem time"""
+    total_turns = sum(result.turns for result in results)
+    game_time = sum(result.elapsed for result in results)
+    lines = [
+        f"Games: {len(results)}  Turns: {total_turns}  Wall time: {wall_time:.2f}s",
+        f"Throughput: {total_turns / wall_time:,.0f} turns/s overall, "
+        f"{total_turns / game_time:,.0f} turns/s per worker, {len(results) / wall_time * 3600:,.0f} games/hour",
+        f"Kills: {sum(result.kills for result in results) / len(results):,.1f} per game",
+        "",
+        "Depth reached:",
+    ]
+    for depth, count in sorted(Counter(result.depth for result in results).items()):
+        lines.append(f"  {depth:>3}: {count}")
+    
+    lines.append("")
+    lines.append("Cause of death:")
+    for cause, count in Counter(result.cause for result in results).most_common():
+        lines.append(f"  {cause:<20} {count}")
+    
+    lines.append("")
+    lines.append("Time per subsystem:")
+    for subsystem in SUBSYSTEMS:
+        seconds = sum(result.timings[subsystem] for result in results)
+        lines.append(f"  {subsystem:<10} {seconds:8.2f}s  {seconds / game_time:6.1%}  "
+                     f"{seconds / max(1, total_turns) * 1e6:8.1f} us/turn")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Play seeded Crimson Depths games headless with a scripted policy.")
+    parser.add_argument('--games', type=int, default=100, help="number of games to play")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first game; game i uses seed + i")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument('--max-depth', type=int, default=20, help="stop a game on reaching this dungeon level")
+    parser.add_argument('--max-turns', type=int, default=20000, help="stop a game after this many turns")
+    args = parser.parse_args()
+    
+    seeds = range(args.seed, args.seed + args.games)
+    start_time = time.perf_counter()
+    results = run_batch(seeds, args.workers, args.max_depth, args.max_turns)
+    print(format_report(results, time.perf_counter() - start_time))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The game imports modules from the repository root and never needs a real display in tests
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
@@ -0,0 +1,10 @@
+import main
+from env import CrimsonDepthsEnv
+
+def test_character_sheet_draws():
+    env = CrimsonDepthsEnv(max_depth=3, max_turns=200)
+    env.reset(3)
+    player = env.player
+    player.fighter.xp = 250  # Past level 2, so the sheet shows progress to level 3
+    player.fighter.attr_points = 5
+    main.draw_character_sheet(player, 0, main.attributes, main.attribute_names)
@@ -0,0 +1,49 @@
+import random
+from collections import deque
+
+import numpy as np
+
+from config import MAP_WIDTH, MAP_HEIGHT, TileType
+from map.map import Map, UNREACHABLE
+
+def reference_field(game_map, x, y):
+    """Plain breadth-first search over 8-connected walkable tiles"""
+    field = np.full((game_map.height, game_map.width), UNREACHABLE, dtype=np.int64)
+    field[y, x] = 0
+    queue = deque([(x, y)])
+    while queue:
+        current_x, current_y = queue.popleft()
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                next_x, next_y = current_x + dx, current_y + dy
+                if (0 <= next_x < game_map.width and 0 <= next_y < game_map.height and
+                        game_map.walkable[next_y, next_x] and field[next_y, next_x] == UNREACHABLE):
+                    field[next_y, next_x] = field[current_y, current_x] + 1
+                    queue.append((next_x, next_y))
+    return field
+
+def test_field_matches_breadth_first_search():
+    for seed in range(4):
+        random.seed(seed)
+        game_map = Map(MAP_WIDTH, MAP_HEIGHT, 1)
+        game_map.generate()
+        ys, xs = np.nonzero(game_map.walkable)
+        for i in random.Random(seed).sample(range(len(xs)), 3):
+            x, y = int(xs[i]), int(ys[i])
+            assert (game_map.get_distance_field(x, y) == reference_field(game_map, x, y)).all()
+
+def test_walls_and_cut_off_tiles_are_unreachable():
+    # Two rooms split by a wall at x == 5
+    game_map = Map(11, 5, 1)
+    game_map.fill_rect(1, 1, 4, 3, TileType.FLOOR)
+    game_map.fill_rect(6, 1, 9, 3, TileType.FLOOR)
+    
+    field = game_map.get_distance_field(1, 1)
+    assert field[1, 1] == 0 and field[3, 4] == 3
+    assert field[0, 0] == UNREACHABLE  # Wall
+    assert field[2, 7] == UNREACHABLE  # Floor in the other room
+    
+    # Opening a door rebuilds the field even though the origin didn't move
+    game_map.set_tile(5, 2, TileType.FLOOR)
+    field = game_map.get_distance_field(1, 1)
+    assert field[2, 5] == 4 and field[2, 9] == 8
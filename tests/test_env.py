@@ -0,0 +1,36 @@
+import multiprocessing
+
+import pytest
+
+from data.items import create_item
+from env import CrimsonDepthsEnv, _env_worker
+from game.input_log import ACTION_PICK_UP, ACTION_FIRE, FIRE_RANGE, NUM_ACTIONS, use_action, fire_action, fire_offset
+
+def test_worker_setup_failure_keeps_its_error():
+    # Attaching a missing shared memory block fails before any env exists
+    parent_end, child_end = multiprocessing.Pipe()
+    with pytest.raises(FileNotFoundError):
+        _env_worker(child_end, ['cd_missing_block'], 1, 0, {})
+    assert child_end.closed
+    parent_end.close()
+
+def test_pick_up_and_use_take_no_turn():
+    env = CrimsonDepthsEnv(max_depth=3, max_turns=200)
+    env.reset(4)
+    player = env.player
+    assert env.step(ACTION_PICK_UP)[4]['turn'] == 0  # Nothing here: nothing happens
+    
+    env.game_map.add_entity(create_item('healing_potion', player.x, player.y))
+    env.step(ACTION_PICK_UP)
+    assert [item.name for item in player.inventory.items] == ['Healing Potion']
+    player.fighter.hp = 1
+    env.step(use_action(0))
+    assert player.fighter.hp > 1 and not player.inventory.items
+    assert env.turn == 0
+
+def test_fire_codes_round_trip():
+    for dx, dy in [(0, 1), (-FIRE_RANGE, FIRE_RANGE), (FIRE_RANGE, -3)]:
+        action = fire_action(dx, dy)
+        assert ACTION_FIRE <= action < NUM_ACTIONS
+        assert fire_offset(action) == (dx, dy)
+    assert fire_action(FIRE_RANGE + 1, 0) is None
@@ -0,0 +1,82 @@
+import random
+
+import numpy as np
+import pytest
+
+from config import MAP_WIDTH, MAP_HEIGHT
+from map.map import Map
+from map.town import generate_town_map
+from map.fov import calculate_fov, FOV_RAYCAST, FOV_SHADOWCAST
+
+SEEDS = range(6)
+ORIGINS_PER_MAP = 30
+
+def generate_map(seed):
+    """Every third seed is a town, the rest dungeon levels"""
+    game_map = Map(MAP_WIDTH, MAP_HEIGHT, 1)
+    if seed % 3 == 0:
+        generate_town_map(game_map, random.Random(seed))
+    else:
+        game_map.generate(random.Random(seed))
+    return game_map
+
+def sample_origins(game_map, seed, count):
+    ys, xs = np.nonzero(game_map.walkable)
+    rng = random.Random(seed)
+    return [(int(xs[i]), int(ys[i])) for i in rng.sample(range(len(xs)), count)]
+
+def visible_from(game_map, x, y, radius, algorithm):
+    calculate_fov(game_map, x, y, radius, algorithm)
+    return game_map.visible.copy()
+
+def grow(mask):
+    """mask plus its 8-way neighbours"""
+    grown = mask.copy()
+    grown[1:] |= mask[:-1]
+    grown[:-1] |= mask[1:]
+    rows = grown.copy()
+    grown[:, 1:] |= rows[:, :-1]
+    grown[:, :-1] |= rows[:, 1:]
+    return grown
+
+@pytest.mark.parametrize('radius', [4, 10, 20])
+def test_shadowcast_matches_raycast(radius):
+    # The algorithms only disagree on edge tiles: Bresenham rays are not
+    # symmetric and light floor tiles the shadowcaster's centre test rejects
+    differing = union = stray = 0
+    for seed in SEEDS:
+        game_map = generate_map(seed)
+        for x, y in sample_origins(game_map, seed, ORIGINS_PER_MAP):
+            rays = visible_from(game_map, x, y, radius, FOV_RAYCAST)
+            shadows = visible_from(game_map, x, y, radius, FOV_SHADOWCAST)
+            assert rays[y, x] and shadows[y, x]
+            
+            ys, xs = np.nonzero(shadows)
+            assert ((xs - x) ** 2 + (ys - y) ** 2 <= radius * radius).all()
+            
+            difference = rays ^ shadows
+            differing += difference.sum()
+            union += (rays | shadows).sum()
+            stray += (difference & ~grow(rays & shadows)).sum()
+    
+    assert differing / union < 0.05
+    # Nearly every disagreement borders a tile both algorithms see
+    assert stray / max(1, differing) < 0.05
+
+def test_shadowcast_is_symmetric():
+    radius = 10
+    for seed in SEEDS:
+        game_map = generate_map(seed)
+        for x, y in sample_origins(game_map, seed, 5):
+            seen = visible_from(game_map, x, y, radius, FOV_SHADOWCAST) & game_map.walkable
+            ys, xs = np.nonzero(seen)
+            for target_x, target_y in list(zip(xs.tolist(), ys.tolist()))[:20]:
+                assert visible_from(game_map, target_x, target_y, radius, FOV_SHADOWCAST)[y, x]
+
+def test_fov_cache_reports_changes():
+    game_map = generate_map(1)
+    x, y = sample_origins(game_map, 1, 1)[0]
+    assert calculate_fov(game_map, x, y, 10)
+    assert game_map.newly_visible == set(zip(*np.nonzero(game_map.visible)[::-1]))
+    assert not calculate_fov(game_map, x, y, 10)
+    assert game_map.newly_visible == set()
@@ -0,0 +1,39 @@
+import random
+
+import numpy as np
+
+from config import MAP_WIDTH, MAP_HEIGHT, TileType
+from map.map import Map
+from map.fov import calculate_fov
+
+def assert_frontier_matches_scan(game_map):
+    reference = set(game_map.get_unexplored_tiles(explored_only=True))
+    assert game_map.get_frontier() == reference
+    mask = np.zeros_like(game_map.frontier_mask)
+    for x, y in reference:
+        mask[y, x] = True
+    assert (game_map.frontier_mask == mask).all()
+
+def test_frontier_matches_full_scan_while_exploring():
+    for seed in range(3):
+        game_map = Map(MAP_WIDTH, MAP_HEIGHT, 1)
+        game_map.generate(random.Random(seed))
+        x, y = game_map.rooms[0].center_x, game_map.rooms[0].center_y
+        
+        for step in range(400):
+            calculate_fov(game_map, x, y, 6)
+            assert_frontier_matches_scan(game_map)
+            
+            if step == 50:
+                # Knock out a wall next to the player: the frontier must follow tile changes
+                wall = next(((x + dx, y + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                             if 0 < x + dx < MAP_WIDTH - 1 and 0 < y + dy < MAP_HEIGHT - 1 and
+                             game_map.tiles[y + dy, x + dx] == TileType.WALL), None)
+                if wall is not None:
+                    game_map.set_tile(*wall, TileType.FLOOR)
+                    assert_frontier_matches_scan(game_map)
+            
+            path = game_map.get_explore_path(x, y)
+            if not path:
+                break
+            x, y = path[0]
@@ -0,0 +1,134 @@
+import random
+
+import pygame
+import pytest
+
+import main
+from config import EquipmentSlot
+from game.input_log import (InputLog, ACTION_WAIT, ACTION_DESCEND, ACTION_ASCEND, ACTION_USE, ACTION_FIRE,
+                            NUM_ACTIONS, UNREPLAYABLE)
+from game.save import snapshot_game, restore_game
+from replay import RecordingEnv, Replayer
+from sim import choose_action
+
+def test_log_round_trips_through_bytes():
+    log = InputLog(1234, max_depth=5, max_turns=300, actions=[1, 2, ACTION_WAIT, UNREPLAYABLE, 3])
+    copy = InputLog.from_bytes(log.to_bytes())
+    assert (copy.seed, copy.max_depth, copy.max_turns, copy.actions) == (1234, 5, 300, log.actions)
+    assert copy.replayable_length() == 3
+
+def test_replay_matches_recording_and_stops_at_unreplayable():
+    env = RecordingEnv(max_depth=3, max_turns=200)
+    env.reset(7)
+    rng = random.Random(7)
+    for _ in range(150):
+        _, _, terminated, truncated, _ = env.step(rng.randrange(NUM_ACTIONS))
+        if terminated or truncated:
+            break
+    player = env.player
+    
+    replayer = Replayer(env.log)
+    replayer.fast_forward()
+    assert (replayer.env.player.x, replayer.env.player.y, replayer.env.player.fighter.hp) == \
+        (player.x, player.y, player.fighter.hp)
+    
+    env.log.actions[20] = UNREPLAYABLE
+    replayer = Replayer(env.log)
+    replayer.fast_forward()
+    assert replayer.position == 20
+
+def test_saves_keep_the_input_log():
+    env = RecordingEnv(max_depth=3, max_turns=200)
+    env.reset(11)
+    for _ in range(10):
+        env.step(ACTION_WAIT)
+    env.game_world.input_log = env.log
+    
+    game_world, _, _ = restore_game(snapshot_game(env.game_world, env.player, env.message_log))
+    assert game_world.input_log.seed == 11
+    assert game_world.input_log.actions == env.log.actions
+
+# Numpad keys for each step, as a player would press them in main.py
+STEP_KEYS = {(0, -1): pygame.K_KP8, (1, -1): pygame.K_KP9, (1, 0): pygame.K_KP6, (1, 1): pygame.K_KP3,
+             (0, 1): pygame.K_KP2, (-1, 1): pygame.K_KP1, (-1, 0): pygame.K_KP4, (-1, -1): pygame.K_KP7}
+
+class InstantClock:
+    def tick(self, framerate=0):
+        return 0
+
+def scripted_keys(game_world, player, turns):
+    """Keys for an interactive session: stairs both ways, auto-explore, then the sim policy"""
+    def current_map():
+        return game_world.levels[game_world.current_level][0]
+    
+    # Walk to the dungeon stairs, go down, back up and down again
+    stairs = current_map().down_stairs_position
+    for x, y in current_map().get_path(player.x, player.y, *stairs):
+        yield STEP_KEYS[(x - player.x, y - player.y)]
+    yield from (pygame.K_GREATER, pygame.K_LESS, pygame.K_GREATER)
+    # Auto-explore for a while
+    yield pygame.K_e
+    for _ in range(30):
+        yield None
+    
+    shots = 0
+    for _ in range(turns):
+        if player.fighter.hp <= 0:
+            break
+        action = choose_action(player, current_map(), [])
+        if action[0] in ('move', 'attack'):
+            yield STEP_KEYS[action[1:]]
+        elif action[0] == 'shoot':
+            # Alternate quick fire with targeted fire at the auto-selected monster
+            shots += 1
+            yield from ((pygame.K_f,) if shots % 2 else (pygame.K_t, pygame.K_t))
+        elif action[0] == 'heal':
+            yield pygame.K_h
+        elif action[0] == 'descend':
+            yield pygame.K_GREATER
+        else:
+            yield pygame.K_KP5
+
+def play_main_session(monkeypatch, seed, turns):
+    """Play main.play_game from a new game with scripted key presses, one per frame"""
+    game_world, player, message_log = main.new_game(seed)
+    game_map, entities = game_world.get_current_level()
+    keys = scripted_keys(game_world, player, turns)
+    
+    def next_events():
+        key = next(keys, pygame.K_ESCAPE)  # Escape returns to the title screen
+        return [] if key is None else [pygame.event.Event(pygame.KEYDOWN, key=key, mod=0)]
+    
+    monkeypatch.setattr(pygame.event, 'get', next_events)
+    monkeypatch.setattr(pygame.time, 'Clock', InstantClock)
+    monkeypatch.setattr(main, 'draw_arrow_path', lambda *args: None)
+    main.play_game(game_world, player, message_log, entities, game_map, 'playing', None, 0, 'items',
+                   EquipmentSlot.RIGHT_HAND, 20, True)
+    return game_world, player
+
+def game_summary(game_world, player):
+    game_map, entities = game_world.levels[game_world.current_level]
+    inventory = player.inventory
+    return (game_world.current_level, game_map.scheduler.time, player.x, player.y, player.fighter.hp,
+            player.fighter.xp, player.silver_pieces, [item.name for item in inventory.items],
+            [item.name if item else None for item in inventory.equipment.values()],
+            inventory.get_ammo().item.ammo_data.current if inventory.get_ammo() else 0,
+            sorted((entity.name, entity.x, entity.y, entity.fighter.hp if entity.fighter else None)
+                   for entity in entities))
+
+@pytest.mark.parametrize('seed', [13, 24])  # Picks up potions and silver; picks up a shield
+def test_main_session_replays_to_the_same_state(monkeypatch, seed):
+    game_world, player = play_main_session(monkeypatch, seed, 400)
+    log = game_world.input_log
+    assert UNREPLAYABLE not in log.actions
+    assert {ACTION_DESCEND, ACTION_ASCEND} <= set(log.actions)
+    assert any(action >= ACTION_FIRE for action in log.actions)
+    drank = any(ACTION_USE <= action < ACTION_FIRE for action in log.actions)
+    assert drank or any(item.name == 'Shield' for item in player.inventory.items)
+    
+    replayer = Replayer(log)
+    replayer.fast_forward()
+    assert replayer.position == len(log.actions)
+    assert game_summary(replayer.env.game_world, replayer.env.player) == game_summary(game_world, player)
+    replayer.env.close()
+    game_world.close()
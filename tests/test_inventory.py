@@ -0,0 +1,35 @@
+from config import EntityType, EquipmentSlot, WHITE
+from data.items import create_item
+from entities.entity import Entity
+from entities.components.fighter import Fighter
+from entities.inventory import Inventory
+from map.map import Map
+from ui.message_log import MessageLog
+
+def full_pack_player():
+    """A player holding a shortbow and arrows with no room left in the pack"""
+    message_log = MessageLog()
+    player = Entity(2, 2, '@', WHITE, EntityType.PLAYER, 'Player',
+                    fighter=Fighter(hp=10), inventory=Inventory(capacity=2))
+    for name, slot in (('shortbow', EquipmentSlot.RIGHT_HAND), ('arrows', EquipmentSlot.LEFT_HAND)):
+        item = create_item(name, 2, 2)
+        player.inventory.add_item(item, message_log)
+        player.inventory.equip_item(item, slot, message_log)
+    for name in ('great_sword', 'dagger'):
+        player.inventory.add_item(create_item(name, 2, 2), message_log)
+    return player, message_log
+
+def test_full_pack_without_a_map_keeps_the_gear_on():
+    player, message_log = full_pack_player()
+    great_sword = player.inventory.items[0]
+    assert not player.inventory.unequip_item(EquipmentSlot.RIGHT_HAND, message_log)
+    assert not player.inventory.equip_item(great_sword, EquipmentSlot.RIGHT_HAND, message_log)
+    assert player.inventory.get_equipped_item(EquipmentSlot.RIGHT_HAND).name == 'Shortbow'
+
+def test_full_pack_drops_unequipped_gear_on_the_map():
+    player, message_log = full_pack_player()
+    game_map = Map(5, 5, 1)
+    game_map.entities = [player]
+    bow = player.inventory.get_equipped_item(EquipmentSlot.RIGHT_HAND)
+    assert player.inventory.unequip_item(EquipmentSlot.RIGHT_HAND, message_log, game_map)
+    assert bow in game_map.get_entities_at(2, 2)
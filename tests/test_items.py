@@ -0,0 +1,19 @@
+import random
+
+from data.items import place_entities
+from data.monsters import MONSTERS
+from map.room import Room
+
+def test_fallback_spawns_keep_their_kind():
+    # No template is eligible this deep, so place_entities falls back to Orcs and Trolls
+    rng = random.Random(3)
+    monsters = []
+    for _ in range(40):
+        entities = []
+        place_entities(Room(0, 0, 12, 12), entities, 4, 0, dungeon_level=30, rng=rng)
+        monsters.extend(entity for entity in entities if entity.fighter)
+    
+    assert {monster.name for monster in monsters} == {'Orc', 'Troll'}
+    for monster in monsters:
+        assert monster.monster_data is MONSTERS[monster.char]
+        assert monster.monster_data.name == monster.name
@@ -0,0 +1,22 @@
+import random
+
+import pytest
+
+from data.monsters import MONSTERS
+from entities.monster_store import MonsterStore, MONSTER_CONSTANTS
+
+def test_stored_fighter_constants_are_read_only():
+    store = MonsterStore()
+    monster = store.spawn(MONSTERS['o'], 3, 4, 6, random.Random(1))
+    fighter = monster.fighter
+    for name, value in MONSTER_CONSTANTS.items():
+        assert getattr(fighter, name) == value
+    
+    with pytest.raises(AttributeError, match="can't change xp"):
+        fighter.gain_xp(10)
+    with pytest.raises(AttributeError, match="can't change int"):
+        fighter.int = 12
+    
+    # Row-backed stats stay writable
+    fighter.hp = 2
+    assert store.hp[monster.row] == 2
@@ -0,0 +1,116 @@
+import heapq
+import random
+
+import numpy as np
+import pytest
+
+from config import MAP_WIDTH, MAP_HEIGHT
+from map.map import Map
+
+SEEDS = range(8)
+PAIRS_PER_MAP = 25
+
+def baseline_path(game_map, start_x, start_y, target_x, target_y, heuristic_weight=1):
+    """The dict-based A* get_path used before the array rewrite.
+    
+    Its Manhattan heuristic overestimates once diagonals cost 1.4, so its
+    paths are not always the shortest; with heuristic_weight=0 it is a plain
+    Dijkstra search and they are.
+    """
+    def heuristic(x, y):
+        return heuristic_weight * (abs(x - target_x) + abs(y - target_y))
+    
+    directions = [(0, 1), (1, 0), (0, -1), (-1, 0), (1, 1), (-1, -1), (1, -1), (-1, 1)]
+    frontier = [(0, (start_x, start_y))]
+    came_from = {(start_x, start_y): None}
+    cost_so_far = {(start_x, start_y): 0}
+    while frontier:
+        _, current = heapq.heappop(frontier)
+        if current == (target_x, target_y):
+            break
+        for dx, dy in directions:
+            next_x, next_y = current[0] + dx, current[1] + dy
+            if not (0 <= next_x < game_map.width and 0 <= next_y < game_map.height):
+                continue
+            if game_map.is_blocked(next_x, next_y):
+                continue
+            new_cost = cost_so_far[current] + (1.0 if dx == 0 or dy == 0 else 1.4)
+            if (next_x, next_y) not in cost_so_far or new_cost < cost_so_far[(next_x, next_y)]:
+                cost_so_far[(next_x, next_y)] = new_cost
+                heapq.heappush(frontier, (new_cost + heuristic(next_x, next_y), (next_x, next_y)))
+                came_from[(next_x, next_y)] = current
+    
+    if (target_x, target_y) not in came_from:
+        return []
+    path = []
+    current = (target_x, target_y)
+    while current != (start_x, start_y):
+        path.append(current)
+        current = came_from[current]
+    path.reverse()
+    return path
+
+def path_cost(start, path):
+    total = 0.0
+    x, y = start
+    for next_x, next_y in path:
+        total += 1.0 if next_x == x or next_y == y else 1.4
+        x, y = next_x, next_y
+    return total
+
+def generate_map(seed):
+    game_map = Map(MAP_WIDTH, MAP_HEIGHT, 1)
+    game_map.generate(random.Random(seed))
+    return game_map
+
+def sample_pairs(game_map, seed, count):
+    ys, xs = np.nonzero(game_map.walkable)
+    rng = random.Random(seed)
+    pairs = []
+    for _ in range(count):
+        a, b = rng.sample(range(len(xs)), 2)
+        pairs.append(((int(xs[a]), int(ys[a])), (int(xs[b]), int(ys[b]))))
+    return pairs
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_paths_are_valid_and_shortest(seed):
+    game_map = generate_map(seed)
+    for start, target in sample_pairs(game_map, seed, PAIRS_PER_MAP):
+        path = game_map.get_path(*start, *target)
+        old_path = baseline_path(game_map, *start, *target)
+        shortest = baseline_path(game_map, *start, *target, heuristic_weight=0)
+        
+        # The same pairs are reachable as before
+        assert bool(path) == bool(old_path)
+        if not path:
+            continue
+        
+        # Every step is one 8-way move onto an enterable tile, ending at the target
+        x, y = start
+        for next_x, next_y in path:
+            assert max(abs(next_x - x), abs(next_y - y)) == 1
+            assert not game_map.is_blocked(next_x, next_y)
+            x, y = next_x, next_y
+        assert (x, y) == target
+        
+        # As short as an exhaustive search, and never longer than the old A*
+        assert path_cost(start, path) == pytest.approx(path_cost(start, shortest))
+        assert path_cost(start, path) <= path_cost(start, old_path) + 1e-9
+        assert game_map.last_path_expansions > 0
+
+def test_budgets_give_up_with_no_path():
+    game_map = generate_map(0)
+    # The pair with the longest path, so small budgets can't reach it
+    start, target = max(sample_pairs(game_map, 0, PAIRS_PER_MAP),
+                        key=lambda pair: len(game_map.get_path(*pair[0], *pair[1])))
+    path = game_map.get_path(*start, *target)
+    full_expansions = game_map.last_path_expansions
+    length = path_cost(start, path)
+    assert len(path) > 5
+    
+    assert game_map.get_path(*start, *target, max_nodes=5) == []
+    assert game_map.last_path_expansions == 6  # The budget plus the node that broke it
+    assert game_map.get_path(*start, *target, max_nodes=full_expansions) == path
+    
+    assert game_map.get_path(*start, *target, max_cost=length - 1) == []
+    assert game_map.get_path(*start, *target, max_cost=length + 0.01) == path
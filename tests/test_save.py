@@ -0,0 +1,40 @@
+import random
+
+from env import CrimsonDepthsEnv
+from game.input_log import ACTION_WAIT
+from game.rng import STREAM_COMBAT
+from game.save import snapshot_game, restore_game
+
+def test_restore_draws_no_random_numbers():
+    env = CrimsonDepthsEnv(max_depth=3, max_turns=200)
+    env.reset(5)
+    for _ in range(5):
+        env.step(ACTION_WAIT)
+    snapshot = snapshot_game(env.game_world, env.player, env.message_log)
+    
+    random.seed(99)
+    expected = random.random()
+    random.seed(99)
+    game_world, player, _ = restore_game(snapshot)
+    assert random.random() == expected
+    
+    fighter = env.player.fighter
+    restored = player.fighter
+    assert (restored.str, restored.int, restored.wis, restored.dex, restored.con, restored.cha) == \
+        (fighter.str, fighter.int, fighter.wis, fighter.dex, fighter.con, fighter.cha)
+    assert restored.rng is game_world.rng.get(STREAM_COMBAT)
+
+def test_restore_keeps_dormant_monsters_dormant():
+    env = CrimsonDepthsEnv(max_depth=3, max_turns=200)
+    env.reset(5)
+    env.game_world.current_level = 1
+    game_map, _ = env.game_world.get_current_level()
+    env.player.x, env.player.y = game_map.up_stairs_position
+    env.game_world.attach_player(env.player)
+    env.game_world.advance_turn(env.player, env.message_log)
+    
+    dormant = sorted((actor.x, actor.y) for actor in game_map.scheduler.sleeping)
+    assert dormant
+    game_world, _, _ = restore_game(snapshot_game(env.game_world, env.player, env.message_log))
+    restored_map, _ = game_world.get_current_level()
+    assert sorted((actor.x, actor.y) for actor in restored_map.scheduler.sleeping) == dormant
@@ -0,0 +1,96 @@
+from config import EntityType, TileType, WHITE, WAKE_RADIUS, NOISE_RADIUS, TRACK_RADIUS
+from data.monsters import get_monster_template
+from entities.entity import Entity
+from entities.components.ai import BasicMonster
+from entities.components.fighter import Fighter
+from game.scheduler import TURN_TIME
+from map.map import Map
+from ui.message_log import MessageLog
+
+class CountingAI:
+    """Records the game time of every turn its owner takes"""
+    def __init__(self, turns):
+        self.owner = None
+        self.turns = turns
+    
+    def take_turn(self, player, game_map, message_log):
+        self.turns.append((game_map.scheduler.time, self.owner.name))
+
+def open_level(names):
+    """A lit, empty level holding the player and one counting monster per name"""
+    game_map = Map(20, 5, 1)
+    game_map.visible[:] = True
+    player = Entity(0, 0, '@', WHITE, EntityType.PLAYER, 'Player', fighter=Fighter(hp=10))
+    turns = []
+    monsters = [Entity(x + 1, 0, 'm', WHITE, EntityType.ENEMY, name, ai=CountingAI(turns))
+                for x, name in enumerate(names)]
+    game_map.entities = [player] + monsters
+    return game_map, player, monsters, turns
+
+def play_turns(game_map, player, count):
+    message_log = MessageLog()
+    for _ in range(count):
+        game_map.scheduler.advance(player, game_map, message_log)
+
+def test_speed_sets_turns_per_player_turn():
+    game_map, player, (fast, normal, slow), turns = open_level(['fast', 'normal', 'slow'])
+    game_map.scheduler.set_speed(fast, 20)
+    game_map.scheduler.set_speed(slow, 5)
+    play_turns(game_map, player, 10)
+    names = [name for _, name in turns]
+    assert (names.count('fast'), names.count('normal'), names.count('slow')) == (20, 10, 5)
+    assert [time for time, name in turns if name == 'slow'] == [0, 200, 400, 600, 800]
+
+def test_ties_go_in_entity_order():
+    game_map, player, _, turns = open_level(['a', 'b', 'c'])
+    play_turns(game_map, player, 2)
+    assert turns == [(0, 'a'), (0, 'b'), (0, 'c'), (TURN_TIME, 'a'), (TURN_TIME, 'b'), (TURN_TIME, 'c')]
+
+def test_dead_and_removed_actors_drop_out():
+    game_map, player, (dead, removed, alive), turns = open_level(['dead', 'removed', 'alive'])
+    play_turns(game_map, player, 1)
+    dead.ai = None
+    game_map.remove_entity(removed)
+    del turns[:]
+    play_turns(game_map, player, 2)
+    assert [name for _, name in turns] == ['alive', 'alive']
+
+def test_delayed_action_fires_when_due():
+    game_map, player, _, _ = open_level([])
+    fired = []
+    scheduler = game_map.scheduler
+    scheduler.schedule(TURN_TIME * 3 + 50, lambda: fired.append(scheduler.time))
+    play_turns(game_map, player, 3)
+    assert fired == []
+    play_turns(game_map, player, 1)
+    assert fired == [TURN_TIME * 3 + 50]
+
+def corridor_level(monster_x):
+    """A dark corridor with the player at its west end and an orc further east"""
+    game_map = Map(TRACK_RADIUS + 10, 3, 1)
+    game_map.fill_rect(1, 1, TRACK_RADIUS + 8, 1, TileType.CORRIDOR)
+    player = Entity(1, 1, '@', WHITE, EntityType.PLAYER, 'Player', blocks=True,
+                    fighter=Fighter(hp=100))
+    orc = Entity(monster_x, 1, 'o', WHITE, EntityType.ENEMY, 'Orc', blocks=True,
+                 fighter=Fighter(hp=5), ai=BasicMonster(), monster_data=get_monster_template('o'))
+    game_map.entities = [player, orc]
+    return game_map, player, orc
+
+def test_unseen_monster_hunts_the_player():
+    game_map, player, orc = corridor_level(1 + WAKE_RADIUS + 4)
+    scheduler = game_map.scheduler
+    for _ in range(3):
+        scheduler.advance(player, game_map, MessageLog())
+    assert orc.x == 1 + WAKE_RADIUS + 1 and orc in scheduler.scheduled
+
+def test_noise_wakes_a_monster_that_then_hunts():
+    game_map, player, orc = corridor_level(1 + TRACK_RADIUS + 2)
+    scheduler = game_map.scheduler
+    scheduler.advance(player, game_map, MessageLog())
+    # One step is not enough to pick up the player's track
+    assert orc.x == 1 + TRACK_RADIUS + 1 and orc in scheduler.sleeping
+    
+    scheduler.wake_within(game_map, orc.x - NOISE_RADIUS, 1, NOISE_RADIUS)
+    for _ in range(3):
+        scheduler.advance(player, game_map, MessageLog())
+    assert orc.x == 1 + TRACK_RADIUS - 2 and orc in scheduler.scheduled
@@ -0,0 +1,26 @@
+import threading
+
+from env import CrimsonDepthsEnv
+from sim import simulate_game
+
+def levelgen_threads():
+    return [thread for thread in threading.enumerate() if thread.name.startswith('levelgen')]
+
+def test_blocked_corridor_is_fought_through():
+    # An unseen Orc blocks the only corridor on depth 1 of this seed
+    result = simulate_game(116, max_depth=20, max_turns=3000)
+    assert result.turns < 3000
+    assert result.cause not in ('turn limit', 'stuck')
+
+def test_finished_games_stop_their_generation_threads():
+    # Threads of worlds other tests left open may finish meanwhile, so only look for new ones
+    before = set(levelgen_threads())
+    simulate_game(3, max_depth=2, max_turns=200)
+    assert set(levelgen_threads()) <= before
+    
+    env = CrimsonDepthsEnv(max_depth=3, max_turns=200)
+    for seed in range(3):
+        env.reset(seed)
+        assert len(set(levelgen_threads()) - before) <= 1
+    env.close()
+    assert set(levelgen_threads()) <= before
@@ -0,0 +1,48 @@
+import numpy as np
+
+from config import EntityType
+from env import CrimsonDepthsEnv
+from game.input_log import ACTION_DIRECTIONS, ACTION_WAIT, ACTION_HEAL, ACTION_DESCEND, fire_action
+from sim import choose_action
+
+def assert_index_matches_entities(game_map):
+    """The per-tile index against a brute-force scan of the entity list"""
+    occupancy = np.zeros_like(game_map.blocking_occupancy)
+    buckets = {}
+    for entity in game_map.entities:
+        buckets.setdefault((entity.x, entity.y), []).append(entity)
+        if entity.blocks:
+            occupancy[entity.y, entity.x] += 1
+    assert (game_map.blocking_occupancy == occupancy).all()
+    assert {tile: sorted(map(id, bucket)) for tile, bucket in game_map.entity_buckets.items()} == \
+        {tile: sorted(map(id, bucket)) for tile, bucket in buckets.items()}
+
+def test_index_survives_kills_pickups_and_stairs():
+    env = CrimsonDepthsEnv(max_depth=4, max_turns=3000)
+    env.reset(21)
+    player = env.player
+    player.fighter.hp = player.fighter.max_hp = 10 ** 6
+    
+    path = []
+    for turn in range(3000):
+        action = choose_action(player, env.game_map, path)
+        if action[0] in ('move', 'attack'):
+            code = ACTION_DIRECTIONS.index((action[1], action[2]))
+        elif action[0] == 'shoot':
+            code = fire_action(action[1].x - player.x, action[1].y - player.y)
+        else:
+            code = {'heal': ACTION_HEAL, 'descend': ACTION_DESCEND}.get(action[0], ACTION_WAIT)
+        if code == ACTION_DESCEND:
+            path.clear()
+        _, _, terminated, truncated, _ = env.step(code)
+        if turn % 50 == 0:
+            assert_index_matches_entities(env.game_map)
+        if terminated or truncated:
+            break
+    
+    assert env.depth >= 2
+    corpses = [entity for game_map, entities in env.game_world.levels.values() for entity in entities
+               if entity.entity_type == EntityType.ENEMY and not entity.fighter]
+    assert corpses
+    for game_map, _ in env.game_world.levels.values():
+        assert_index_matches_entities(game_map)
@@ -0,0 +1,55 @@
+import pygame
+from config import TILE_SIZE, TILESET_PATH, INFO_PANEL_WIDTH, MESSAGE_LOG_HEIGHT
+
+# Display state created by init_display, keyed by the names in config.DISPLAY_NAMES
+_display = {}
+
+def init_display():
+    """Initialize pygame, open the game window and load the tileset.
+    
+    Only the first call does any work; later calls return the same values.
+    Nothing here runs on import, so game logic can be used without a screen
+    (run with SDL_VIDEODRIVER=dummy for headless rendering).
+    """
+    if _display:
+        return _display
+    
+    # Initialize Pygame
+    pygame.init()
+    
+    screen_width = pygame.display.Info().current_w
+    screen_height = pygame.display.Info().current_h
+    
+    # Screen-dependent layout
+    left_panel_width = (screen_width // TILE_SIZE) - INFO_PANEL_WIDTH
+    
+    # Set up the display
+    screen = pygame.display.set_mode((screen_width, screen_height), pygame.FULLSCREEN)
+    pygame.display.set_caption("Crimson Depths")
+    
+    # Load the CP437 tileset
+    tileset = pygame.image.load(TILESET_PATH).convert_alpha()
+    
+    _display.update(
+        SCREEN_WIDTH=screen_width,
+        SCREEN_HEIGHT=screen_height,
+        LEFT_PANEL_WIDTH=left_panel_width,
+        MAP_VIEW_WIDTH=left_panel_width - 2,  # -2 for borders
+        MAP_VIEW_HEIGHT=(screen_height // TILE_SIZE) - MESSAGE_LOG_HEIGHT - 2,  # -2 for borders
+        INFO_PANEL_X=left_panel_width * TILE_SIZE,
+        MESSAGE_LOG_Y=screen_height - MESSAGE_LOG_HEIGHT * TILE_SIZE,
+        screen=screen,
+        tileset=tileset,
+    )
+    return _display
+
+def get_tile_from_tileset(index):
+    """Cut a single TILE_SIZE glyph out of the CP437 tileset"""
+    # Calculate position in the tileset
+    x = index % 16
+    y = index // 16
+    # Extract the tile from the tileset
+    rect = pygame.Rect(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+    image = pygame.Surface((TILE_SIZE, TILE_SIZE), pygame.SRCALPHA)
+    image.blit(init_display()['tileset'], (0, 0), rect)
+    return image
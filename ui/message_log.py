@@ -1,5 +1,6 @@
 from collections import deque, namedtuple
-from config import MAX_MESSAGES
+from config import MAX_MESSAGES, RED, GREEN, LIGHT_BLUE
+from game.events import Miss, Hit, XPGained
 
 # Define a Message namedtuple to store text and color
 Message = namedtuple('Message', ['text', 'color'])
@@ -11,3 +12,40 @@ class MessageLog:
     def add_message(self, text, color=(255, 255, 255)):
         # Create a Message object and add it to the log
         self.messages.append(Message(str(text), color))
+    
+    def subscribe(self, events):
+        """Describe the combat published on an EventBus (see game/events.py) in the log"""
+        events.subscribe(Miss, self.log_miss)
+        events.subscribe(Hit, self.log_hit)
+        events.subscribe(XPGained, self.log_xp)
+    
+    def log_miss(self, event):
+        target = event.target.name
+        if event.ranged:
+            self.add_message(f"Your arrow misses the {target}! (They dodged the attack)", RED)
+        else:
+            self.add_message(f"{event.attacker.name} attacks {target} but misses! ({target} dodged)")
+    
+    def log_hit(self, event):
+        attacker, name, damage, taken = event.attacker.name, event.name, event.damage, event.taken
+        if event.ranged:
+            if taken < damage:
+                self.add_message(f"Your arrow hits the {name} for {damage} damage ({taken} after armor)!", GREEN)
+            else:
+                self.add_message(f"Your arrow hits the {name} for {taken} damage!", GREEN)
+            if event.fatal:
+                self.add_message(f"The {name} dies!", LIGHT_BLUE)
+        elif damage <= 0:
+            self.add_message(f"{attacker} attacks {name} but does no damage!")
+        elif event.fatal:
+            self.add_message(f"{attacker} attacks {name} for {damage} damage and kills it!")
+        elif taken < damage:
+            self.add_message(f"{attacker} attacks {name} for {damage} damage ({taken} after armor)!")
+        else:
+            self.add_message(f"{attacker} attacks {name} for {taken} damage!")
+    
+    def log_xp(self, event):
+        if event.source:
+            self.add_message(f"You killed a {event.source} and gained {event.amount} XP!", LIGHT_BLUE)
+        else:
+            self.add_message(f"You gain {event.amount} experience points.", LIGHT_BLUE)
@@ -9,14 +9,26 @@ from config import (
     BORDER_HORIZONTAL, BORDER_VERTICAL, BORDER_TOP_LEFT, BORDER_TOP_RIGHT,
     BORDER_BOTTOM_LEFT, BORDER_BOTTOM_RIGHT, BORDER_T_LEFT, BORDER_T_RIGHT,
     BORDER_T_UP, BORDER_T_DOWN, BORDER_CROSS, TileType, EntityType, EquipmentSlot,
-    get_tile_from_tileset, screen
+    screen
 )
+from ui.display import get_tile_from_tileset
 from ui.theme import ThemeManager
 from ui.panel import PanelManager
 
 # Create the panel manager
 panel_manager = PanelManager()
 
+# Tileset index and color for each tile code
+TILE_GLYPHS = {
+    TileType.WALL: (219, GRAY),              # Block character (█)
+    TileType.TOWN_WALL: (219, LIGHT_BLUE),   # Block character (█)
+    TileType.FLOOR: (250, WHITE),            # Dot character (·)
+    TileType.CORRIDOR: (250, WHITE),         # Dot character (·)
+    TileType.GRASS: (44, GREEN),             # Comma character (,)
+    TileType.STAIRS_DOWN: (62, WHITE),       # > character
+    TileType.STAIRS_UP: (60, WHITE),         # < character
+}
+
 def draw_game_ui(player, game_world, game_map, message_log, offset_x, offset_y, 
                    game_state=None, 
                    # Add inventory-related arguments
@@ -38,7 +50,7 @@ def draw_game_ui(player, game_world, game_map, message_log, offset_x, offset_y,
     # Draw the map and entities in the map area
     draw_map(game_map, offset_x, offset_y, map_area)
     draw_entities(game_map.entities, game_map, offset_x, offset_y, map_area)
-
+    
     # Draw any additional UI elements based on game state that should be within the map clip
     if game_state == 'targeting':
         draw_targeting_overlay(player, game_map, offset_x, offset_y, map_area)
@@ -95,27 +107,7 @@ def draw_map(game_map, offset_x, offset_y, map_area):
                 # Unexplored areas are completely black
                 continue
             
-            tile_index = 0
-            tile_color = WHITE
-            
-            if game_map.tiles[y][x] == TileType.WALL:
-                tile_index = 219  # Block character (█)
-                tile_color = GRAY
-            elif game_map.tiles[y][x] == TileType.TOWN_WALL:
-                tile_index = 219  # Block character (█)
-                tile_color = LIGHT_BLUE
-            elif game_map.tiles[y][x] == TileType.FLOOR or game_map.tiles[y][x] == TileType.CORRIDOR:
-                tile_index = 250  # Dot character (·)
-                tile_color = WHITE
-            elif game_map.tiles[y][x] == TileType.GRASS:
-                tile_index = 44  # Comma character (,)
-                tile_color = GREEN
-            elif game_map.tiles[y][x] == TileType.STAIRS_DOWN:
-                tile_index = 62  # > character
-                tile_color = WHITE
-            elif game_map.tiles[y][x] == TileType.STAIRS_UP:
-                tile_index = 60  # < character
-                tile_color = WHITE
+            tile_index, tile_color = TILE_GLYPHS[game_map.tiles[y, x]]
             
             # If it's not visible but explored, darken the color
             if not visible:
@@ -250,14 +242,12 @@ def draw_targeting_overlay(player, game_map, offset_x, offset_y, map_area):
     map_y = map_area["y"]
     map_width = map_area["width"]
     map_height = map_area["height"]
-
-    target_x, target_y = player.target_coords
+    
     # Check if target coordinates are valid
-    if not hasattr(player, 'targeting_x') or not hasattr(player, 'targeting_y'):
+    if player.target_coords is None:
         return
         
-    targeting_x = player.targeting_x
-    targeting_y = player.targeting_y
+    targeting_x, targeting_y = player.target_coords
     
     # Calculate screen position
     screen_x = map_x + (targeting_x - offset_x) * TILE_SIZE